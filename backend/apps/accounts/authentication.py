@@ -0,0 +1,121 @@
+"""
+Stateless JWT authentication.
+
+Access tokens carry the USER_CLAIMS (see tokens.py), so request.user is built
+from the signed claims instead of being loaded from the database, and
+ModulePermission can read role without a query. Other user fields are
+deferred and load on first access.
+
+A token is only as current as its claims, so each process keeps a short-lived
+cache of every user's stored USER_CLAIMS values (AUTH_STATE_TTL seconds) and
+rejects tokens whose claims no longer match them: a deactivated, deleted or
+re-roled user is locked out within AUTH_STATE_TTL, without a query on every
+request. Saving a user clears its entry in the process that saved it at once.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from .tokens import USER_CLAIMS
+
+DEFAULT_AUTH_STATE_TTL = 30
+DEFAULT_AUTH_STATE_CACHE_SIZE = 10000
+
+
+class UserStateCache:
+    """
+    Per-process LRU of user id -> the user's stored USER_CLAIMS values (None
+    for a missing user), each entry re-read after AUTH_STATE_TTL seconds
+    """
+
+    def __init__(self):
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        state = (
+            get_user_model()
+            .objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .values(*USER_CLAIMS)
+            .first()
+        )
+        ttl = getattr(settings, "AUTH_STATE_TTL", DEFAULT_AUTH_STATE_TTL)
+        size = getattr(settings, "AUTH_STATE_CACHE_SIZE", DEFAULT_AUTH_STATE_CACHE_SIZE)
+        with self._lock:
+            self._entries[user_id] = (now + ttl, state)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > size:
+                self._entries.popitem(last=False)
+        return state
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_states = UserStateCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the token's USER_CLAIMS, checked against
+    user_states, instead of loading the user on every request. Tokens issued
+    without the claims are authenticated the simplejwt way.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or any(
+            claim not in validated_token for claim in USER_CLAIMS
+        ):
+            return super().get_user(validated_token)
+
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError as e:
+            raise InvalidToken(
+                _("Token contained no recognizable user identification")
+            ) from e
+
+        claims = {claim: validated_token[claim] for claim in USER_CLAIMS}
+        state = user_states.get(user_id)
+        if state is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        if api_settings.CHECK_USER_IS_ACTIVE and not state["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if state != claims:
+            raise AuthenticationFailed(
+                _("The user's account has changed, refresh the token."),
+                code="token_not_current",
+            )
+        return self.user_from_claims(user_id, claims)
+
+    def user_from_claims(self, user_id, claims):
+        """User with the id and claim fields loaded and every other field deferred"""
+        model = self.user_model
+        row = {model._meta.pk.attname: model._meta.pk.to_python(user_id), **claims}
+        fields = [
+            field.attname
+            for field in model._meta.concrete_fields
+            if field.attname in row
+        ]
+        return model.from_db(
+            router.db_for_read(model), fields, [row[name] for name in fields]
+        )
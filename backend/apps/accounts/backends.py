@@ -0,0 +1,24 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+UserModel = get_user_model()
+
+
+class EmpCodeBackend(ModelBackend):
+    """
+    Authenticates emp_code and password with a single lookup on the indexed
+    emp_code column. An unknown emp_code still runs the password hasher once,
+    so a miss costs the same as a wrong password.
+    """
+
+    def authenticate(self, request, emp_code=None, password=None, **kwargs):
+        if emp_code is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get(emp_code=emp_code)
+        except UserModel.DoesNotExist:
+            UserModel().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+
+DEFAULT_SHOP_FLOOR_HASHER_ITERATIONS = 100_000
+
+
+class ShopFloorPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """
+    PBKDF2-SHA256 at SHOP_FLOOR_HASHER_ITERATIONS, for the "shop_floor"
+    PASSWORD_HASHER_PROFILE. Hashes carry their own algorithm name, so they
+    keep verifying, and are upgraded at the next login, when the profile is
+    switched back.
+    """
+
+    algorithm = "pbkdf2_sha256_shopfloor"
+
+    @property
+    def iterations(self):
+        return getattr(
+            settings,
+            "SHOP_FLOOR_HASHER_ITERATIONS",
+            DEFAULT_SHOP_FLOOR_HASHER_ITERATIONS,
+        )
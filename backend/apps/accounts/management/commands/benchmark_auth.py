@@ -0,0 +1,69 @@
+import uuid
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from apps.inventory.management.benchmark import timed, summarize
+from apps.inventory.views.utils import InventoryPermission
+from ...authentication import ClaimsJWTAuthentication, user_states
+from ...tokens import UserRefreshToken
+
+User = get_user_model()
+
+AUTHENTICATORS = {
+    "jwt": JWTAuthentication,
+    "claims": ClaimsJWTAuthentication,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Time authenticating a bearer token and running the inventory permission "
+        "check, loading the user per request (jwt) against reading it from the "
+        "token claims (claims). The benchmark user is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=2000, help="Timed requests")
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:8]
+        user = User.objects.create_user(
+            username=f"benchmark-{tag}",
+            email=f"benchmark-{tag}@example.com",
+            password=uuid.uuid4().hex,
+            role="warehouse_staff",
+        )
+        try:
+            access = str(UserRefreshToken.for_user(user).access_token)
+            request = Request(
+                APIRequestFactory().get(
+                    "/inventory/stocks", HTTP_AUTHORIZATION=f"Bearer {access}"
+                )
+            )
+            user_states.clear()
+
+            self.stdout.write(
+                f"{'auth':>7} {'queries':>8} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"
+            )
+            for name, authentication_class in AUTHENTICATORS.items():
+                authentication = authentication_class()
+                check = lambda: self.authorize(authentication, request)
+                check()  # warm up (fills the claims state cache)
+                with CaptureQueriesContext(connection) as queries:
+                    check()
+                stats = summarize([timed(check) for _ in range(options["runs"])])
+                self.stdout.write(
+                    f"{name:>7} {len(queries.captured_queries):>8} "
+                    f"{stats['mean']:>9.3f} {stats['p95']:>9.3f} {stats['max']:>9.3f}"
+                )
+        finally:
+            user.delete()
+
+    def authorize(self, authentication, request):
+        request.user, _ = authentication.authenticate(request)
+        if not InventoryPermission().has_permission(request, None):
+            raise AssertionError("benchmark user was denied")
@@ -0,0 +1,116 @@
+import random
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand
+from django.db import connection, connections
+from django.test.utils import CaptureQueriesContext
+from apps.inventory.management.benchmark import timed, summarize
+from ...tokens import UserRefreshToken
+
+User = get_user_model()
+
+
+def legacy_login(emp_code, password):
+    """emp_code lookup then username authentication, as LoginView used to do it"""
+    try:
+        user_obj = User.objects.get(emp_code=emp_code)
+    except User.DoesNotExist:
+        return None
+    return authenticate(username=user_obj.username, password=password)
+
+
+def backend_login(emp_code, password):
+    return authenticate(emp_code=emp_code, password=password)
+
+
+FLOWS = {
+    "legacy": legacy_login,
+    "backend": backend_login,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Simulate a shift change: --staff users log in with PINs from --threads "
+        "terminals at once, through the legacy two-lookup flow and the emp_code "
+        "backend, tokens included. Uses the active PASSWORD_HASHER_PROFILE; run "
+        "it once per profile to compare them. The benchmark users are deleted "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--staff", type=int, default=200)
+        parser.add_argument("--threads", type=int, default=8)
+
+    def handle(self, *args, **options):
+        tag = uuid.uuid4().hex[:6]
+        pins = {}
+        users = []
+        for i in range(options["staff"]):
+            pin = f"{random.randrange(10**6):06d}"
+            user = User(
+                username=f"benchmark-{tag}-{i}",
+                email=f"benchmark-{tag}-{i}@example.com",
+                emp_code=f"{tag[:3]}{i:04d}",
+                role="production_operator",
+                password=make_password(pin),
+            )
+            pins[user.emp_code] = pin
+            users.append(user)
+        User.objects.bulk_create(users)
+
+        try:
+            hasher = get_hasher()
+            self.stdout.write(
+                f"profile {settings.PASSWORD_HASHER_PROFILE}: {hasher.algorithm}, "
+                f"{getattr(hasher, 'iterations', '-')} iterations, "
+                f"{options['staff']} staff, {options['threads']} threads"
+            )
+            self.stdout.write(
+                f"{'flow':>8} {'queries':>8} {'logins/s':>9} {'mean ms':>9} "
+                f"{'p95 ms':>9} {'miss ms':>9}"
+            )
+            emp_codes = list(pins)
+            for name, flow in FLOWS.items():
+                login = lambda emp_code: self.login(flow, emp_code, pins[emp_code])
+                with CaptureQueriesContext(connection) as queries:
+                    login(emp_codes[0])
+                user_queries = [
+                    q for q in queries.captured_queries if "accounts_user" in q["sql"]
+                ]
+
+                start = time.perf_counter()
+                with ThreadPoolExecutor(options["threads"]) as pool:
+                    samples = list(pool.map(self.timed_login(login), emp_codes))
+                elapsed = time.perf_counter() - start
+                stats = summarize(samples)
+                miss = summarize(
+                    [timed(flow, f"NO{i:05d}", "000000") for i in range(20)]
+                )
+                self.stdout.write(
+                    f"{name:>8} {len(user_queries):>8} "
+                    f"{len(emp_codes) / elapsed:>9.1f} {stats['mean']:>9.3f} "
+                    f"{stats['p95']:>9.3f} {miss['mean']:>9.3f}"
+                )
+        finally:
+            User.objects.filter(username__startswith=f"benchmark-{tag}-").delete()
+
+    def login(self, flow, emp_code, pin):
+        user = flow(emp_code, pin)
+        if user is None:
+            raise AssertionError(f"benchmark login failed for {emp_code}")
+        refresh = UserRefreshToken.for_user(user)
+        return str(refresh), str(refresh.access_token)
+
+    def timed_login(self, login):
+        def run(emp_code):
+            try:
+                return timed(login, emp_code)
+            finally:
+                connections.close_all()
+
+        return run
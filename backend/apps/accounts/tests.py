@@ -1,8 +1,25 @@
-from django.test import TestCase
+import io
+from unittest import mock
+from datetime import timedelta
+from django.conf import settings
+from django.core.management import call_command
+from django.utils import timezone
+from django.contrib.auth import base_user
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
 from django.contrib.auth import get_user_model
 from rest_framework.test import APIClient
 from rest_framework import status
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+from apps.accounts.authentication import ClaimsJWTAuthentication, user_states
+from apps.accounts.tokens import UserRefreshToken, blacklisted_jtis
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from apps.inventory.views.utils import InventoryPermission
 
 User = get_user_model()
 
@@ -10,6 +27,8 @@ login_url = "/account/login/"
 logout_url = "/accounts/logout/"
 register_url = "/api/accounts/register/"
 accounts_url = "/api/accounts/"
+token_refresh_url = "/api/token/refresh/"
+stocks_url = "/inventory/stocks"
 
 
 class UserCreationTestCase(TestCase):
@@ -405,3 +424,254 @@ class LoginLogoutFlowTestCase(TestCase):
         self.assertEqual(login_response.status_code, status.HTTP_200_OK)
         self.assertIn("access", login_response.data)
         self.assertIn("refresh", login_response.data)
+
+
+class ClaimsAuthenticationTestCase(TestCase):
+    """Test authenticating requests from access token claims"""
+
+    def setUp(self):
+        user_states.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="storeman",
+            email="storeman@example.com",
+            password="SecurePassword123!",
+            role="warehouse_staff",
+        )
+        response = self.client.post(
+            "/account/login",
+            {"emp_code": self.user.emp_code, "password": "SecurePassword123!"},
+            format="json",
+        )
+        self.tokens = response.data
+
+    def use_token(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_login_token_carries_claims(self):
+        """Test that login issues access tokens with the user claims"""
+        token = AccessToken(self.tokens["access"])
+        self.assertEqual(token["role"], "warehouse_staff")
+        self.assertEqual(token["emp_code"], self.user.emp_code)
+        self.assertTrue(token["is_active"])
+
+    def test_permission_check_needs_no_queries(self):
+        """Test that authentication and permission checks run without queries"""
+        request = APIRequestFactory().get(
+            stocks_url, HTTP_AUTHORIZATION=f"Bearer {self.tokens['access']}"
+        )
+        authentication = ClaimsJWTAuthentication()
+        authentication.authenticate(request)  # fills the per-process cache
+
+        with CaptureQueriesContext(connection) as queries:
+            user, _ = authentication.authenticate(request)
+            request.user = user
+            allowed = InventoryPermission().has_permission(request, None)
+        self.assertTrue(allowed)
+        self.assertEqual(user.pk, self.user.pk)
+        self.assertEqual(user.role, "warehouse_staff")
+        self.assertEqual(
+            [q["sql"] for q in queries.captured_queries if "silk_" not in q["sql"]],
+            [],
+        )
+
+    def test_deactivated_user_is_rejected(self):
+        """Test that tokens of a deactivated user stop working"""
+        self.use_token(self.tokens["access"])
+        self.assertEqual(self.client.get(stocks_url).status_code, status.HTTP_200_OK)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(stocks_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_role_change_requires_refresh(self):
+        """Test that a role change invalidates old claims until refreshed"""
+        self.user.role = "sales_rep"
+        self.user.save()
+        self.use_token(self.tokens["access"])
+        response = self.client.get(stocks_url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.client.credentials()
+        response = self.client.post(
+            token_refresh_url, {"refresh": self.tokens["refresh"]}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(AccessToken(response.data["access"])["role"], "sales_rep")
+
+        self.use_token(response.data["access"])
+        self.assertEqual(self.client.get(stocks_url).status_code, status.HTTP_200_OK)
+        response = self.client.post(stocks_url, {}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_token_without_claims_still_works(self):
+        """Test that tokens issued without claims fall back to loading the user"""
+        self.use_token(str(RefreshToken.for_user(self.user).access_token))
+        self.assertEqual(self.client.get(stocks_url).status_code, status.HTTP_200_OK)
+
+    def test_me_returns_full_user(self):
+        """Test that the me endpoint returns fields not carried in the token"""
+        self.user.role = "manager"
+        self.user.save()
+        self.use_token(str(UserRefreshToken.for_user(self.user).access_token))
+        response = self.client.get("/account/users/me")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["email"], "storeman@example.com")
+
+
+class EmpCodeLoginTestCase(TestCase):
+    """Test logging in through the emp_code authentication backend"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="baker",
+            email="baker@example.com",
+            password="482913",
+            role="production_operator",
+        )
+
+    def login(self, emp_code, password):
+        return self.client.post(
+            "/account/login",
+            {"emp_code": emp_code, "password": password},
+            format="json",
+        )
+
+    def test_login_looks_up_user_once(self):
+        """Test that a login reads the user row with a single query"""
+        with CaptureQueriesContext(connection) as queries:
+            response = self.login(self.user.emp_code, "482913")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user_reads = [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith("SELECT") and '"accounts_user"' in q["sql"]
+        ]
+        self.assertEqual(len(user_reads), 1)
+        self.assertIn('"emp_code" =', user_reads[0])
+
+    def test_unknown_emp_code_still_hashes(self):
+        """Test that an unknown emp_code costs a password hash like a wrong one"""
+        with mock.patch.object(
+            base_user, "make_password", wraps=base_user.make_password
+        ) as make_password:
+            response = self.login("NOP-E00", "482913")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        make_password.assert_called_once_with("482913")
+
+    def test_wrong_password_and_inactive_user_rejected(self):
+        """Test that wrong passwords and inactive users cannot log in"""
+        response = self.login(self.user.emp_code, "000000")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.login(self.user.emp_code, "482913")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_shop_floor_hasher_profile(self):
+        """Test that the shop floor profile re-hashes passwords at login"""
+        self.assertTrue(self.user.password.startswith("pbkdf2_sha256$"))
+        with override_settings(
+            PASSWORD_HASHERS=settings.PASSWORD_HASHER_PROFILES["shop_floor"],
+            SHOP_FLOOR_HASHER_ITERATIONS=1000,
+        ):
+            response = self.login(self.user.emp_code, "482913")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.user.refresh_from_db()
+            self.assertTrue(
+                self.user.password.startswith("pbkdf2_sha256_shopfloor$1000$")
+            )
+            response = self.login(self.user.emp_code, "482913")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class TokenBlacklistTestCase(TestCase):
+    """Test cached blacklist checks and pruning of expired tokens"""
+
+    def setUp(self):
+        blacklisted_jtis.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            username="storeman",
+            email="storeman@example.com",
+            password="SecurePassword123!",
+            role="warehouse_staff",
+        )
+        self.refresh = UserRefreshToken.for_user(self.user)
+        self.client.credentials(
+            HTTP_AUTHORIZATION=f"Bearer {self.refresh.access_token}"
+        )
+
+    def blacklist_reads(self, queries):
+        return [
+            q["sql"]
+            for q in queries.captured_queries
+            if q["sql"].startswith("SELECT")
+            and "token_blacklist_blacklistedtoken" in q["sql"]
+        ]
+
+    def test_spent_token_rejected_from_cache(self):
+        """Test that a logged out token is rejected without a blacklist query"""
+        body = {"refresh": str(self.refresh)}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post("/account/logout", body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(BlacklistedToken.objects.count(), 1)
+
+        with CaptureQueriesContext(connection) as queries:
+            logout = self.client.post("/account/logout", body, format="json")
+            refresh = self.client.post(token_refresh_url, body, format="json")
+        self.assertEqual(logout.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(refresh.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.blacklist_reads(queries), [])
+
+    def test_blacklist_checked_in_database_on_cache_miss(self):
+        """Test that tokens blacklisted by another process are still rejected"""
+        body = {"refresh": str(self.refresh)}
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(token_refresh_url, body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        blacklisted_jtis.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(token_refresh_url, body, format="json")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(len(self.blacklist_reads(queries)), 1)
+        self.assertIn(self.refresh["jti"], blacklisted_jtis)
+
+    def test_blacklist_returns_simplejwt_shape(self):
+        """Test that blacklist() returns (BlacklistedToken, created) on both paths"""
+        blacklisted, created = self.refresh.blacklist()
+        self.assertIsInstance(blacklisted, BlacklistedToken)
+        self.assertTrue(created)
+        self.assertFalse(self.refresh.blacklist()[1])
+
+        unrecorded = UserRefreshToken.for_user(self.user)
+        OutstandingToken.objects.filter(jti=unrecorded["jti"]).delete()
+        missing, created = unrecorded.blacklist()
+        self.assertIsInstance(missing, BlacklistedToken)
+        self.assertTrue(created)
+        self.assertEqual(missing.token.jti, unrecorded["jti"])
+
+    def test_prune_deletes_expired_tokens_only(self):
+        """Test that prune_tokens deletes expired tokens and their blacklist rows"""
+        expired = [UserRefreshToken.for_user(self.user) for _ in range(3)]
+        expired[0].blacklist()
+        self.refresh.blacklist()
+        OutstandingToken.objects.filter(
+            jti__in=[token["jti"] for token in expired]
+        ).update(expires_at=timezone.now() - timedelta(days=1))
+
+        call_command("prune_tokens", chunk_size=2, stdout=io.StringIO())
+
+        self.assertEqual(
+            list(OutstandingToken.objects.values_list("jti", flat=True)),
+            [self.refresh["jti"]],
+        )
+        self.assertEqual(
+            list(BlacklistedToken.objects.values_list("token__jti", flat=True)),
+            [self.refresh["jti"]],
+        )
@@ -0,0 +1,106 @@
+"""
+JWTs that carry the account fields the API authorizes on, so requests can be
+authenticated and permission checked without loading the user row, and whose
+blacklist checks skip the database for JTIs this process already knows are
+blacklisted.
+"""
+
+import threading
+from collections import OrderedDict
+from django.conf import settings
+from django.db import transaction
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import (
+    BlacklistedToken,
+    OutstandingToken,
+)
+from rest_framework_simplejwt.tokens import RefreshToken
+
+DEFAULT_BLACKLIST_CACHE_SIZE = 50000
+
+# User fields copied into every token (and from the refresh into the access token)
+USER_CLAIMS = ("username", "emp_code", "role", "is_active", "is_staff")
+
+
+def user_claims(user):
+    """The USER_CLAIMS values of a user, as they appear in a token"""
+    return {claim: getattr(user, claim) for claim in USER_CLAIMS}
+
+
+def set_user_claims(token, user):
+    for claim, value in user_claims(user).items():
+        token[claim] = value
+
+
+class BlacklistedJtiCache:
+    """
+    Per-process LRU of JTIs known to be blacklisted, so replayed refresh or
+    logout requests with a spent token are turned away without a query. Only
+    blacklisted JTIs are remembered: a token blacklisted by another process is
+    not in this one's cache, so a miss still has to ask the database.
+    """
+
+    def __init__(self):
+        self._jtis = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, jti):
+        with self._lock:
+            if jti in self._jtis:
+                self._jtis.move_to_end(jti)
+                return True
+        return False
+
+    def add(self, jti):
+        size = getattr(
+            settings, "BLACKLIST_CACHE_SIZE", DEFAULT_BLACKLIST_CACHE_SIZE
+        )
+        with self._lock:
+            self._jtis[jti] = None
+            self._jtis.move_to_end(jti)
+            while len(self._jtis) > size:
+                self._jtis.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._jtis.clear()
+
+
+blacklisted_jtis = BlacklistedJtiCache()
+
+
+class UserRefreshToken(RefreshToken):
+    """
+    Refresh token (and access token) carrying USER_CLAIMS, with blacklist
+    checks answered from blacklisted_jtis first
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        set_user_claims(token, user)
+        return token
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if jti in blacklisted_jtis:
+            raise TokenError(_("Token is blacklisted"))
+        try:
+            super().check_blacklist()
+        except TokenError:
+            blacklisted_jtis.add(jti)
+            raise
+
+    def blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        token = OutstandingToken.objects.filter(jti=jti).first()
+        if token is None:
+            # Not recorded as outstanding yet; simplejwt creates the row
+            result = super().blacklist()
+        else:
+            result = BlacklistedToken.objects.get_or_create(token=token)
+        transaction.on_commit(lambda: blacklisted_jtis.add(jti))
+        # (BlacklistedToken, created), as simplejwt returns it
+        return result
@@ -9,7 +9,7 @@ from rest_framework.permissions import (
     IsAdminUser,
 )
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import UserRefreshToken
 from rest_framework_simplejwt.exceptions import TokenError
 from .serializers import (
     UserSerializer,
@@ -83,7 +83,8 @@ class UserViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def me(self, request):
         """Retrieve details of the currently authenticated user"""
-        serializer = self.get_serializer(request.user)
+        # request.user may be built from token claims with the rest deferred
+        serializer = self.get_serializer(User.objects.get(pk=request.user.pk))
         return Response(serializer.data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=["post"])
@@ -92,7 +93,7 @@ class UserViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             return Response(
                 {
                     "user": UserSerializer(user).data,
@@ -137,13 +138,8 @@ class LoginView(generics.GenericAPIView):
         emp_code = serializer.validated_data.get("emp_code")
         password = serializer.validated_data.get("password")
 
-        try:
-            user_obj = User.objects.get(emp_code=emp_code)
-            user = authenticate(username=user_obj.username, password=password)
-        except User.DoesNotExist:
-            logger.warning(f"Login attempt with non-existent emp_code: {emp_code}")
-            user = None
-
+        # One emp_code lookup (EmpCodeBackend); misses cost a hash like failures
+        user = authenticate(request, emp_code=emp_code, password=password)
         if user is None:
             logger.warning(f"Failed login attempt for emp_code: {emp_code}")
             return Response(
@@ -151,7 +147,7 @@ class LoginView(generics.GenericAPIView):
                 status=status.HTTP_401_UNAUTHORIZED,
             )
 
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response(
             {
                 "refresh": str(refresh),
@@ -190,7 +186,7 @@ class LogoutView(generics.GenericAPIView):
         refresh_token = serializer.validated_data.get("refresh")
 
         try:
-            token = RefreshToken(refresh_token)
+            token = UserRefreshToken(refresh_token)
             token.blacklist()
             logger.info(f"User {request.user.username} logged out successfully")
             return Response(
@@ -0,0 +1,21 @@
+from django.db import transaction
+from core.cache import get_generation, bump_generation
+
+# Bumped whenever stock levels, batches or alerts change, so summaries and
+# other derived inventory responses can be cached until the next write. Saved
+# and deleted alerts are covered by signals/cache_invalidation.py; bulk alert
+# writes in services/ call invalidate_stock_caches themselves
+STOCK_GENERATION = "inventory:stock"
+
+
+def get_stock_generation():
+    return get_generation(STOCK_GENERATION)
+
+
+def bump_stock_generation():
+    bump_generation(STOCK_GENERATION)
+
+
+def invalidate_stock_caches():
+    """Drop derived inventory responses once the current transaction commits"""
+    transaction.on_commit(bump_stock_generation)
@@ -0,0 +1,43 @@
+"""Shared helpers for the inventory benchmark commands"""
+
+import statistics
+import time
+import uuid
+from central.models import Company, Warehouse, Product
+
+
+def create_benchmark_catalog(warehouses=1):
+    """Create a throwaway company, product and warehouse(s) for a benchmark run"""
+    tag = uuid.uuid4().hex[:8]
+    company = Company.objects.create(name=f"Benchmark {tag}")
+    product = Product.objects.create(
+        name=f"Benchmark flour {tag}",
+        company=company,
+        category="flour",
+        unit_of_measure="kg",
+    )
+    warehouse_list = [
+        Warehouse.objects.create(company=company, name=f"Benchmark WH {tag}-{i}")
+        for i in range(warehouses)
+    ]
+    if warehouses == 1:
+        return company, product, warehouse_list[0]
+    return company, product, warehouse_list
+
+
+def timed(func, *args, **kwargs):
+    """Run func and return the elapsed wall time in milliseconds"""
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return (time.perf_counter() - start) * 1000
+
+
+def summarize(samples):
+    """Return mean, p95 and max of a list of millisecond timings"""
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return {
+        "mean": statistics.fmean(ordered),
+        "p95": p95,
+        "max": ordered[-1],
+    }
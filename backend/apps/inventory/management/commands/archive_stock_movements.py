@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...services.partitions import PartitioningError, archive_partitions
+
+
+class Command(BaseCommand):
+    help = (
+        "Export monthly stock movement partitions older than the retention window "
+        "to gzipped CSV files and detach them from the movement table"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("output_dir", help="Directory the archives are written to")
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            help="Months kept attached (default STOCK_MOVEMENT_RETENTION_MONTHS)",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop the detached partitions once exported",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            archived = archive_partitions(
+                options["output_dir"],
+                retention_months=options["retention_months"],
+                drop=options["drop"],
+            )
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+        for name, rows, path in archived:
+            self.stdout.write(f"{name}: {rows} rows -> {path}")
+        self.stdout.write(self.style.SUCCESS(f"{len(archived)} partitions archived"))
@@ -0,0 +1,102 @@
+import threading
+import time
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction, DatabaseError, IntegrityError
+from django.db.models import F
+from ...models import Batch
+from ...utils import decrement_batch_quantity, get_current_batch_quantity
+from ..benchmark import create_benchmark_catalog
+
+
+def legacy_decrement(batch_id, quantity):
+    """Read-then-check-then-write decrement as validate_stock_movement used to do it"""
+    with transaction.atomic():
+        batch = Batch.objects.get(id=batch_id)
+        total = get_current_batch_quantity(batch.product_id, batch.warehouse_id)
+        if total < quantity or batch.quantity < quantity:
+            return False
+        Batch.objects.filter(id=batch_id).update(quantity=F("quantity") - quantity)
+        return True
+
+
+STRATEGIES = {
+    "legacy": legacy_decrement,
+    "guarded": decrement_batch_quantity,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Hammer one batch with concurrent OUT decrements and compare throughput of "
+        "the read-check-write path against the guarded UPDATE. Intended for "
+        "PostgreSQL; the benchmark data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument(
+            "--attempts", type=int, default=250, help="Decrements per thread"
+        )
+        parser.add_argument(
+            "--stock",
+            type=int,
+            default=1000,
+            help="Starting batch quantity, below threads x attempts to force contention at zero",
+        )
+
+    def handle(self, *args, **options):
+        company, product, warehouse = create_benchmark_catalog()
+        try:
+            self.stdout.write(
+                f"{'strategy':>9} {'ops/s':>9} {'ok':>6} {'rejected':>9} "
+                f"{'violations':>11} {'errors':>7} {'final qty':>10}"
+            )
+            for name, strategy in STRATEGIES.items():
+                batch = Batch.objects.create(
+                    product=product, warehouse=warehouse, quantity=options["stock"]
+                )
+                result = self.run(strategy, batch.id, options)
+                batch.refresh_from_db()
+                self.stdout.write(
+                    f"{name:>9} {result['ops']:>9.0f} {result['ok']:>6} "
+                    f"{result['rejected']:>9} {result['violations']:>11} "
+                    f"{result['errors']:>7} {batch.quantity:>10}"
+                )
+                if batch.quantity < 0:
+                    self.stderr.write(self.style.ERROR(f"{name}: stock went negative"))
+        finally:
+            company.delete()
+
+    def run(self, strategy, batch_id, options):
+        counts = {"ok": 0, "rejected": 0, "violations": 0, "errors": 0}
+        lock = threading.Lock()
+        start_barrier = threading.Barrier(options["threads"])
+
+        def worker():
+            local = dict.fromkeys(counts, 0)
+            start_barrier.wait()
+            try:
+                for _ in range(options["attempts"]):
+                    try:
+                        local["ok" if strategy(batch_id, 1) else "rejected"] += 1
+                    except IntegrityError:
+                        # The check constraint caught an oversell
+                        local["violations"] += 1
+                    except DatabaseError:
+                        local["errors"] += 1
+            finally:
+                connection.close()
+            with lock:
+                for key, value in local.items():
+                    counts[key] += value
+
+        threads = [threading.Thread(target=worker) for _ in range(options["threads"])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        attempts = options["threads"] * options["attempts"]
+        return {**counts, "ops": attempts / elapsed}
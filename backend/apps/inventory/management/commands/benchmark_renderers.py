@@ -0,0 +1,62 @@
+import uuid
+from decimal import Decimal
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from core.renderers import ORJSONRenderer, MessagePackRenderer
+from ...models import StockMovement
+from ...serializers import StockMovementSerializer
+from ..benchmark import timed, summarize
+
+RENDERERS = {
+    "drf-json": JSONRenderer,
+    "orjson": ORJSONRenderer,
+    "msgpack": MessagePackRenderer,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare render time and payload size of DRF's JSONRenderer, the orjson "
+        "renderer and the MessagePack renderer for one page of serialized stock "
+        "movements. Nothing is written to the database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=1000, help="Movements per page")
+        parser.add_argument("--runs", type=int, default=200, help="Timed renders")
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        movements = [
+            StockMovement(
+                id=uuid.uuid4(),
+                batch_id=uuid.uuid4(),
+                movement_type="OUT" if i % 3 else "IN",
+                quantity=Decimal(i % 250) + Decimal("0.25"),
+                reference_number=f"SO-{i:07d}",
+                notes="Dispatched to retail outlet",
+                created_at=now,
+            )
+            for i in range(options["rows"])
+        ]
+        page = {
+            "count": options["rows"],
+            "next": "http://localhost/inventory/stock_movements?page=2",
+            "previous": None,
+            "results": StockMovementSerializer(movements, many=True).data,
+        }
+
+        self.stdout.write(
+            f"{'renderer':>9} {'bytes':>9} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        )
+        for name, renderer_class in RENDERERS.items():
+            renderer = renderer_class()
+            size = len(renderer.render(page))
+            stats = summarize(
+                [timed(renderer.render, page) for _ in range(options["runs"])]
+            )
+            self.stdout.write(
+                f"{name:>9} {size:>9} {stats['mean']:>9.3f} "
+                f"{stats['p95']:>9.3f} {stats['max']:>9.3f}"
+            )
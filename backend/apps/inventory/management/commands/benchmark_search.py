@@ -0,0 +1,109 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from rest_framework import filters
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from ...models import Batch, StockMovement
+from ...services.search import search_inventory, search_mode
+from ...views.stock_movement_views import StockMovementViewSet
+from ..benchmark import create_benchmark_catalog, timed, summarize
+
+PAGE_SIZE = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the ranked inventory search against the SearchFilter path of the "
+        "stock movement list on a large movement table. Movements are bulk "
+        "inserted with generated reference numbers; the benchmark data is deleted "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movements", type=int, default=1_000_000)
+        parser.add_argument(
+            "--batches",
+            type=int,
+            default=1000,
+            help="Batches the movements spread over",
+        )
+        parser.add_argument("--runs", type=int, default=20, help="Timed runs per query")
+
+    def handle(self, *args, **options):
+        company, product, warehouse = create_benchmark_catalog()
+        batch_ids = []
+        try:
+            batches = Batch.objects.bulk_create(
+                Batch(product=product, warehouse=warehouse, quantity=10)
+                for _ in range(options["batches"])
+            )
+            batch_ids = [batch.id for batch in batches]
+            self.load_movements(batch_ids, options["movements"])
+
+            queries = {
+                "exact": f"SO-{options['movements'] // 2:07d}",
+                "prefix": "SO-00012",
+                "substring": "4242",
+                "miss": "ZZ-NOPE",
+            }
+            self.stdout.write(f"mode: {search_mode()}")
+            self.stdout.write(
+                f"{'query':>10} {'path':>13} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"
+            )
+            for label, query in queries.items():
+                for path, func in (
+                    ("search_filter", self.search_filter),
+                    ("search", self.search),
+                ):
+                    stats = summarize(
+                        [timed(func, query) for _ in range(options["runs"])]
+                    )
+                    self.stdout.write(
+                        f"{label:>10} {path:>13} {stats['mean']:>9.3f} "
+                        f"{stats['p95']:>9.3f} {stats['max']:>9.3f}"
+                    )
+        finally:
+            self.delete_movements(batch_ids)
+            company.delete()
+
+    def load_movements(self, batch_ids, total):
+        chunk = 10_000
+        for start in range(0, total, chunk):
+            StockMovement.objects.bulk_create(
+                StockMovement(
+                    batch_id=batch_ids[i % len(batch_ids)],
+                    movement_type="OUT",
+                    quantity=1,
+                    reference_number=f"SO-{i:07d}",
+                    notes="Benchmark movement",
+                )
+                for i in range(start, min(start + chunk, total))
+            )
+        self.stdout.write(f"loaded {total} movements")
+
+    def delete_movements(self, batch_ids):
+        # Bypass the ORM so a million rows are not loaded for the delete signals
+        if not batch_ids:
+            return
+        table = connection.ops.quote_name(StockMovement._meta.db_table)
+        batch_field = StockMovement._meta.get_field("batch").target_field
+        with connection.cursor() as cursor:
+            for start in range(0, len(batch_ids), 500):
+                chunk = batch_ids[start : start + 500]
+                placeholders = ", ".join(["%s"] * len(chunk))
+                cursor.execute(
+                    f"DELETE FROM {table} WHERE batch_id IN ({placeholders})",
+                    [batch_field.get_db_prep_value(pk, connection) for pk in chunk],
+                )
+
+    def search_filter(self, query):
+        """What GET /inventory/stock_movements?search=<query> does: count plus one page"""
+        request = Request(APIRequestFactory().get("/", {"search": query}))
+        queryset = filters.SearchFilter().filter_queryset(
+            request, StockMovement.objects.all(), StockMovementViewSet()
+        )
+        queryset.count()
+        list(queryset.order_by("-created_at")[:PAGE_SIZE])
+
+    def search(self, query):
+        search_inventory(query, types=["movement"], limit=PAGE_SIZE)
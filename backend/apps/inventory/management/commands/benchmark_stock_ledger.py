@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from ...models import Batch, StockMovement
+from ...utils import reconcile_stock
+from ..benchmark import create_benchmark_catalog, timed, summarize
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare stock movement write latency between the delta ledger and full "
+        "re-aggregation at different batch counts per product/warehouse. "
+        "Each movement commits on its own so the commit hooks are timed too; "
+        "the benchmark data is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batches",
+            default="10,100,1000",
+            help="Comma separated batch counts per product/warehouse",
+        )
+        parser.add_argument(
+            "--movements", type=int, default=200, help="Movements timed per run"
+        )
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options["batches"].split(",") if size]
+        movements = options["movements"]
+
+        self.stdout.write(
+            f"{'batches':>8} {'mode':>10} {'mean ms':>9} {'p95 ms':>9} {'max ms':>9}"
+        )
+        for size in sizes:
+            for mode in ("aggregate", "delta"):
+                stats = self.run(size, mode, movements)
+                self.stdout.write(
+                    f"{size:>8} {mode:>10} {stats['mean']:>9.3f} "
+                    f"{stats['p95']:>9.3f} {stats['max']:>9.3f}"
+                )
+
+    def run(self, size, mode, movements):
+        samples = []
+        with override_settings(STOCK_LEDGER_MODE=mode):
+            company, product, warehouse = create_benchmark_catalog()
+            try:
+                batches = Batch.objects.bulk_create(
+                    Batch(product=product, warehouse=warehouse, quantity=50)
+                    for _ in range(size)
+                )
+                reconcile_stock(product_id=product.id, warehouse_id=warehouse.id)
+
+                for i in range(movements):
+                    samples.append(
+                        timed(
+                            StockMovement.objects.create,
+                            batch=batches[i % size],
+                            movement_type="IN" if i % 2 else "OUT",
+                            quantity=1,
+                        )
+                    )
+            finally:
+                company.delete()
+        return summarize(samples)
@@ -0,0 +1,26 @@
+import time
+from django.core.management.base import BaseCommand
+from ...services.expiry import check_expiring_batches, EXPIRY_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Raise EXPIRY alerts for batches expiring within the horizon configured "
+        "for their product category (INVENTORY_EXPIRY_HORIZON_DAYS)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPIRY_CHUNK_SIZE,
+            help="Rows fetched and alerts inserted per round trip",
+        )
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        created = check_expiring_batches(chunk_size=options["chunk_size"])
+        elapsed = (time.perf_counter() - start) * 1000
+        self.stdout.write(
+            self.style.SUCCESS(f"{created} expiry alerts created in {elapsed:.0f} ms")
+        )
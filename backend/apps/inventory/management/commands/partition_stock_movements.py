@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand, CommandError
+from ...services.partitions import (
+    PartitioningError,
+    is_partitioned,
+    partition_movement_table,
+    ensure_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Store stock movements in monthly PostgreSQL partitions on created_at. "
+        "The first run converts the table; later runs (e.g. monthly from cron) "
+        "create the partitions for the coming months."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--ahead",
+            type=int,
+            help="Months to create ahead (default STOCK_MOVEMENT_PARTITIONS_AHEAD)",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            if not is_partitioned():
+                moved = partition_movement_table(ahead=options["ahead"])
+                self.stdout.write(
+                    f"Converted stock movements to partitions, {moved} rows moved"
+                )
+            created = ensure_partitions(ahead=options["ahead"])
+        except PartitioningError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{len(created)} partitions created: {', '.join(created) or '-'}"
+            )
+        )
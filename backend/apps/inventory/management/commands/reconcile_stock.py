@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from ...cache import invalidate_stock_caches
+from ...utils import reconcile_stock
+
+
+class Command(BaseCommand):
+    help = "Rebuild stock totals from batch quantities and fix rows that drifted"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--product", help="Only reconcile this product ID")
+        parser.add_argument("--warehouse", help="Only reconcile this warehouse ID")
+
+    def handle(self, *args, **options):
+        result = reconcile_stock(
+            product_id=options["product"], warehouse_id=options["warehouse"]
+        )
+        if result["created"] or result["updated"]:
+            invalidate_stock_caches()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {result['checked']} stock rows: "
+                f"{result['created']} created, {result['updated']} updated"
+            )
+        )
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from ...services.alerts import sweep_alerts, PAIR_CHUNK_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Evaluate low and out of stock alerts for every stock row against the "
+        "active reorder policies, creating missing alerts and resolving stale ones"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=PAIR_CHUNK_SIZE,
+            help="Rows fetched and alerts written per round trip",
+        )
+
+    def handle(self, *args, **options):
+        result = sweep_alerts(chunk_size=options["chunk_size"])
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Checked {result['checked']} stock rows: "
+                f"{result['created']} alerts created, {result['resolved']} resolved "
+                f"in {result['total_ms']:.0f} ms ({result['write_ms']:.0f} ms writing)"
+            )
+        )
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:47
+
+from django.db import migrations, models
+from django.db.models import Sum
+from apps.inventory.utils import calculate_stock_status
+
+
+def clamp_negative_batches(apps, schema_editor):
+    """
+    Older code never guarded RETURN decrements, so batches may already be below
+    zero, which would make the constraint fail to apply. Set them to zero,
+    recount the stock rows of their product/warehouse, and report each one.
+    """
+    Batch = apps.get_model("inventory", "Batch")
+    Stock = apps.get_model("inventory", "Stock")
+
+    negative = list(
+        Batch.objects.filter(quantity__lt=0).values_list(
+            "id", "batch_number", "quantity", "product_id", "warehouse_id"
+        )
+    )
+    if not negative:
+        return
+
+    Batch.objects.filter(id__in=[row[0] for row in negative]).update(quantity=0)
+    for batch_id, batch_number, quantity, _, _ in negative:
+        print(f"\n  Batch {batch_number or batch_id} was at {quantity}, set to 0")
+
+    for product_id, warehouse_id in {(row[3], row[4]) for row in negative}:
+        total = (
+            Batch.objects.filter(
+                product_id=product_id, warehouse_id=warehouse_id
+            ).aggregate(total=Sum("quantity"))["total"]
+            or 0
+        )
+        Stock.objects.filter(product_id=product_id, warehouse_id=warehouse_id).update(
+            quantity_on_hand=total, status=calculate_stock_status(total)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0006_company_company_status_idx_and_more"),
+        ("inventory", "0007_rename_product_reorder_policy_productreorderpolicy"),
+    ]
+
+    operations = [
+        migrations.RunPython(clamp_negative_batches, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="batch",
+            constraint=models.CheckConstraint(
+                condition=models.Q(("quantity__gte", 0)),
+                name="batch_quantity_non_negative",
+            ),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0006_company_company_status_idx_and_more"),
+        ("inventory", "0008_batch_quantity_non_negative"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="batch",
+            index=models.Index(
+                condition=models.Q(("quantity__gt", 0)),
+                fields=["expiry_date"],
+                name="batch_expiry_in_stock_idx",
+            ),
+        ),
+    ]
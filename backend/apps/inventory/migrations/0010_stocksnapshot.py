@@ -0,0 +1,75 @@
+# Generated by Django 5.2.7 on 2026-10-17 00:58
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0006_company_company_status_idx_and_more"),
+        ("inventory", "0009_batch_expiry_in_stock_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StockSnapshot",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                    ),
+                ),
+                ("snapshot_date", models.DateField()),
+                ("taken_at", models.DateTimeField()),
+                (
+                    "quantity_on_hand",
+                    models.DecimalField(decimal_places=2, max_digits=10),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("EMPTY", "Empty"),
+                            ("ALMOST_OUT", "Almost Out"),
+                            ("GOOD", "Good"),
+                            ("FULL", "Full"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="central.product",
+                    ),
+                ),
+                (
+                    "warehouse",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="stock_snapshots",
+                        to="central.warehouse",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Stock Snapshot",
+                "verbose_name_plural": "Stock Snapshots",
+                "indexes": [
+                    models.Index(
+                        fields=["product", "warehouse", "taken_at"],
+                        name="snapshot_pair_taken_idx",
+                    )
+                ],
+                "unique_together": {("snapshot_date", "product", "warehouse")},
+            },
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0006_company_company_status_idx_and_more"),
+        ("inventory", "0010_stocksnapshot"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="batch",
+            index=models.Index(
+                fields=["created_at", "id"], name="batch_created_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="stockmovement",
+            index=models.Index(
+                fields=["created_at", "id"], name="movement_created_id_idx"
+            ),
+        ),
+    ]
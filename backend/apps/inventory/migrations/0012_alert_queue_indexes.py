@@ -0,0 +1,39 @@
+# Generated by Django 5.2.7 on 2026-10-17 01:04
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0006_company_company_status_idx_and_more"),
+        ("inventory", "0011_keyset_pagination_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventoryalert",
+            index=models.Index(
+                fields=["status", "alert_type", "warehouse", "created_at"],
+                name="inv_alert_queue_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventoryalert",
+            index=models.Index(
+                condition=models.Q(("status__in", ["OPEN", "ACKNOWLEDGED"])),
+                fields=["alert_type", "warehouse", "created_at"],
+                name="inv_alert_unresolved_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="inventoryalert",
+            index=models.Index(
+                condition=models.Q(("status__in", ["OPEN", "ACKNOWLEDGED"])),
+                fields=["product", "warehouse", "alert_type"],
+                name="inv_alert_unresolved_pair_idx",
+            ),
+        ),
+    ]
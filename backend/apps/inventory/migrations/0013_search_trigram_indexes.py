@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Django compiles icontains on PostgreSQL to UPPER("col"::text) LIKE UPPER(...),
+# so the trigram indexes are built on that expression to serve those lookups.
+TRIGRAM_INDEXES = [
+    ("batch_number_trgm_idx", "inventory_batch", "batch_number"),
+    ("movement_ref_trgm_idx", "inventory_stockmovement", "reference_number"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for name, table, column in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {name} ON {table} "
+            f"USING gin ((UPPER({column}::text)) gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name, _, _ in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {name}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("inventory", "0012_alert_queue_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
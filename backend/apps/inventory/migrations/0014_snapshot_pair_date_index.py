@@ -0,0 +1,25 @@
+# Generated by Django 5.2.7 on 2026-10-17 02:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("central", "0008_product_warehouse_updated_at"),
+        ("inventory", "0013_search_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name="stocksnapshot",
+            name="snapshot_pair_taken_idx",
+        ),
+        migrations.AddIndex(
+            model_name="stocksnapshot",
+            index=models.Index(
+                fields=["product", "warehouse", "snapshot_date"],
+                name="snapshot_pair_date_idx",
+            ),
+        ),
+    ]
@@ -1,7 +1,7 @@
-from django.db import models
+from django.db import models, transaction
 import uuid
 from central.models import Product, Warehouse
-from django.db.models import F
+from django.db.models import F, Q
 from apps.accounts.models import User
 
 
@@ -56,6 +56,36 @@ class Stock(models.Model):
         return f"{self.product.name} - {self.quantity_on_hand}{self.product.unit_of_measure} in {self.warehouse.name}"
 
 
+class StockSnapshot(models.Model):
+    """Copy of a Stock row taken at the end of a day, for point-in-time queries"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    snapshot_date = models.DateField()
+    taken_at = models.DateTimeField()
+    product = models.ForeignKey(
+        Product, on_delete=models.CASCADE, related_name="stock_snapshots"
+    )
+    warehouse = models.ForeignKey(
+        Warehouse, on_delete=models.CASCADE, related_name="stock_snapshots"
+    )
+    quantity_on_hand = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=20, choices=Stock.STATUS_CHOICES)
+
+    class Meta:
+        verbose_name = "Stock Snapshot"
+        verbose_name_plural = "Stock Snapshots"
+        unique_together = ("snapshot_date", "product", "warehouse")
+        indexes = [
+            models.Index(
+                fields=["product", "warehouse", "snapshot_date"],
+                name="snapshot_pair_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.product.name} in {self.warehouse.name} on {self.snapshot_date}"
+
+
 class Batch(models.Model):
     """Represents a specific lot of a product in a warehouse"""
 
@@ -90,6 +120,17 @@ class Batch(models.Model):
                 fields=["product", "expiry_date"], name="batch_product_expiry_idx"
             ),
             models.Index(fields=["batch_number"], name="batch_number_idx"),
+            models.Index(fields=["created_at", "id"], name="batch_created_id_idx"),
+            models.Index(
+                fields=["expiry_date"],
+                name="batch_expiry_in_stock_idx",
+                condition=Q(quantity__gt=0),
+            ),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(quantity__gte=0), name="batch_quantity_non_negative"
+            ),
         ]
 
     def __str__(self):
@@ -130,8 +171,14 @@ class StockMovement(models.Model):
                 fields=["movement_type", "created_at"], name="movement_type_date_idx"
             ),
             models.Index(fields=["reference_number"], name="movement_ref_idx"),
+            models.Index(fields=["created_at", "id"], name="movement_created_id_idx"),
         ]
 
+    def save(self, *args, **kwargs):
+        # The guarded batch decrement in pre_save must roll back if the insert fails
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return f"{self.movement_type}: {self.quantity} of {self.batch.product.name} on {self.created_at}"
 
@@ -270,6 +317,22 @@ class InventoryAlert(models.Model):
                 fields=["created_at"],
                 name="inv_alert_created_at_idx",
             ),
+            # Alert queue endpoints filter on status/type/warehouse, newest first
+            models.Index(
+                fields=["status", "alert_type", "warehouse", "created_at"],
+                name="inv_alert_queue_idx",
+            ),
+            # Open and acknowledged alerts are a small, hot slice of the table
+            models.Index(
+                fields=["alert_type", "warehouse", "created_at"],
+                name="inv_alert_unresolved_idx",
+                condition=Q(status__in=["OPEN", "ACKNOWLEDGED"]),
+            ),
+            models.Index(
+                fields=["product", "warehouse", "alert_type"],
+                name="inv_alert_unresolved_pair_idx",
+                condition=Q(status__in=["OPEN", "ACKNOWLEDGED"]),
+            ),
         ]
 
     def __str__(self):
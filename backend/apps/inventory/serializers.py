@@ -1,8 +1,61 @@
+from decimal import Decimal
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
+from central.models import Product, Warehouse
 from .models import Stock, StockMovement, Batch, ProductReorderPolicy, InventoryAlert
 
 
-class StockSerializer(serializers.ModelSerializer):
+class ProductSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Product
+        fields = ["id", "name", "sku", "category", "unit_of_measure"]
+
+
+class WarehouseSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Warehouse
+        fields = ["id", "name"]
+
+
+class BatchSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Batch
+        fields = ["id", "batch_number", "quantity", "expiry_date"]
+
+
+class ExpandableSerializerMixin:
+    """
+    Replaces FK ids with nested summaries for the names listed in the
+    "expand" serializer context (set by ExpandMixin on read requests).
+
+    expandable_fields maps each name to (serializer class, source, the
+    select_related path the view joins so no extra queries are made).
+    """
+
+    expandable_fields = {}
+
+    def get_fields(self):
+        fields = super().get_fields()
+        for name in self.context.get("expand", ()):
+            serializer_class, source, _ = self.expandable_fields[name]
+            if source == name:
+                fields[name] = serializer_class(read_only=True)
+            else:
+                fields[name] = serializer_class(source=source, read_only=True)
+        return fields
+
+
+PRODUCT_WAREHOUSE_EXPANSIONS = {
+    "product": (ProductSummarySerializer, "product", "product"),
+    "warehouse": (WarehouseSummarySerializer, "warehouse", "warehouse"),
+}
+
+
+class StockSerializer(
+    SparseFieldsetSerializerMixin, ExpandableSerializerMixin, serializers.ModelSerializer
+):
+    expandable_fields = PRODUCT_WAREHOUSE_EXPANSIONS
+
     class Meta:
         model = Stock
         fields = [
@@ -17,7 +70,11 @@ class StockSerializer(serializers.ModelSerializer):
         
         read_only_fields = ["id", "status", "last_updated", "created_at"]
 
-class BatchSerializer(serializers.ModelSerializer):
+class BatchSerializer(
+    SparseFieldsetSerializerMixin, ExpandableSerializerMixin, serializers.ModelSerializer
+):
+    expandable_fields = PRODUCT_WAREHOUSE_EXPANSIONS
+
     class Meta:
         model = Batch
         fields = [
@@ -33,7 +90,15 @@ class BatchSerializer(serializers.ModelSerializer):
         
         read_only_fields = ["id", "created_at", "batch_number"]
         
-class StockMovementSerializer(serializers.ModelSerializer):
+class StockMovementSerializer(
+    SparseFieldsetSerializerMixin, ExpandableSerializerMixin, serializers.ModelSerializer
+):
+    expandable_fields = {
+        "batch": (BatchSummarySerializer, "batch", "batch"),
+        "product": (ProductSummarySerializer, "batch.product", "batch__product"),
+        "warehouse": (WarehouseSummarySerializer, "batch.warehouse", "batch__warehouse"),
+    }
+
     class Meta:
         model = StockMovement
         fields = [
@@ -49,7 +114,11 @@ class StockMovementSerializer(serializers.ModelSerializer):
         read_only_fields = ["id", "created_at"]
         
         
-class ProductReorderPolicySerializer(serializers.ModelSerializer):
+class ProductReorderPolicySerializer(
+    SparseFieldsetSerializerMixin, ExpandableSerializerMixin, serializers.ModelSerializer
+):
+    expandable_fields = PRODUCT_WAREHOUSE_EXPANSIONS
+
     class Meta:
         model = ProductReorderPolicy
         fields = [
@@ -65,7 +134,11 @@ class ProductReorderPolicySerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at"]
         
-class InventoryAlertSerializer(serializers.ModelSerializer):
+class InventoryAlertSerializer(
+    SparseFieldsetSerializerMixin, ExpandableSerializerMixin, serializers.ModelSerializer
+):
+    expandable_fields = PRODUCT_WAREHOUSE_EXPANSIONS
+
     class Meta:
         model = InventoryAlert
         fields = [
@@ -84,4 +157,48 @@ class InventoryAlertSerializer(serializers.ModelSerializer):
             "resolved_at",
             "resolved_by",
         ]
-        read_only_fields = ["id", "created_at", "message", "triggered_by", "current_quantity"]
\ No newline at end of file
+        read_only_fields = ["id", "created_at", "message", "triggered_by", "current_quantity"]
+
+
+class StockMovementBulkRowSerializer(serializers.ModelSerializer):
+    """Validates one row of a bulk movement upload without loading its batch"""
+
+    batch = serializers.UUIDField()
+
+    class Meta:
+        model = StockMovement
+        fields = [
+            "batch",
+            "movement_type",
+            "quantity",
+            "reference_number",
+            "notes",
+        ]
+
+
+class StockMovementBulkSerializer(serializers.Serializer):
+    """Envelope for bulk movement uploads"""
+
+    MODE_CHOICES = [
+        ("all_or_nothing", "All or nothing"),
+        ("best_effort", "Best effort"),
+    ]
+
+    movements = serializers.ListField(
+        child=serializers.DictField(), allow_empty=False, max_length=5000
+    )
+    mode = serializers.ChoiceField(choices=MODE_CHOICES, default="all_or_nothing")
+
+
+class StockAllocationSerializer(serializers.Serializer):
+    """Request body for first-expired-first-out stock allocation"""
+
+    product = serializers.UUIDField()
+    warehouse = serializers.UUIDField()
+    quantity = serializers.DecimalField(
+        max_digits=10, decimal_places=2, min_value=Decimal("0.01")
+    )
+    reference_number = serializers.CharField(
+        max_length=100, required=False, allow_null=True, allow_blank=True
+    )
+    notes = serializers.CharField(required=False, allow_null=True, allow_blank=True)
@@ -0,0 +1,333 @@
+import time
+from functools import reduce
+from operator import or_
+from core.cache import get_generation, bump_generation
+from django.db import transaction
+from django.db.models import Q, Exists, OuterRef, Subquery
+from django.utils import timezone
+from ..cache import invalidate_stock_caches
+from ..models import Stock, ProductReorderPolicy, InventoryAlert
+
+# Reorder policies change rarely, so each process keeps the active ones in memory.
+# Saves and deletes bump a generation in the Django cache; the TTL bounds staleness
+# when the cache is not shared between processes.
+POLICY_CACHE_TTL = 300
+POLICY_GENERATION = "inventory:reorder_policies"
+PAIR_CHUNK_SIZE = 500
+
+STOCK_ALERT_TYPES = ["LOW_STOCK", "OUT_OF_STOCK"]
+UNRESOLVED_STATUSES = ["OPEN", "ACKNOWLEDGED"]
+
+_policy_cache = {"policies": None, "loaded_at": 0, "version": None}
+
+
+def invalidate_policy_cache():
+    """
+    Drop this process's policy cache and tell other processes to do the same.
+
+    Done straight away so reads later in the same transaction miss, and again
+    after the commit so a policy set cached by a concurrent read of the old
+    rows is dropped too.
+    """
+
+    def drop():
+        _policy_cache["policies"] = None
+        bump_generation(POLICY_GENERATION)
+
+    drop()
+    transaction.on_commit(drop)
+
+
+def get_active_policies():
+    """Active reorder policies as {(product_id, warehouse_id): (policy_id, min_stock_level)}"""
+    version = get_generation(POLICY_GENERATION)
+    if (
+        _policy_cache["policies"] is None
+        or _policy_cache["version"] != version
+        or time.monotonic() - _policy_cache["loaded_at"] > POLICY_CACHE_TTL
+    ):
+        _policy_cache["policies"] = {
+            (product_id, warehouse_id): (policy_id, min_stock_level)
+            for policy_id, product_id, warehouse_id, min_stock_level in (
+                ProductReorderPolicy.objects.filter(is_active=True).values_list(
+                    "id", "product_id", "warehouse_id", "min_stock_level"
+                )
+            )
+        }
+        _policy_cache["loaded_at"] = time.monotonic()
+        _policy_cache["version"] = version
+    return _policy_cache["policies"]
+
+
+def classify_stock_level(quantity, min_stock_level=None):
+    """Return the stock alert type a quantity calls for, or None"""
+    if quantity <= 0:
+        return "OUT_OF_STOCK"
+    if min_stock_level is not None and quantity <= min_stock_level:
+        return "LOW_STOCK"
+    return None
+
+
+def build_alert_message(
+    alert_type, quantity, product_name, warehouse_name, unit, min_stock_level
+):
+    """Human readable message for a stock alert"""
+    unit = unit or ""
+    if alert_type == "OUT_OF_STOCK":
+        return f"{product_name} is out of stock in {warehouse_name}"
+    return f"{product_name} in {warehouse_name} has reached minimum stock level ({quantity}{unit} <= {min_stock_level}{unit})"
+
+
+def pairs_q(pairs):
+    """Q matching any of the given (product_id, warehouse_id) pairs"""
+    return reduce(
+        or_,
+        (
+            Q(product_id=product_id, warehouse_id=warehouse_id)
+            for product_id, warehouse_id in pairs
+        ),
+    )
+
+
+def evaluate_alerts(pairs, triggered_by="STOCK_MOVEMENT"):
+    """
+    Create or resolve LOW_STOCK / OUT_OF_STOCK alerts for a set of
+    (product_id, warehouse_id) pairs.
+
+    Per chunk of pairs this reads the stock rows (joined to product and warehouse)
+    and the unresolved alerts once each, then writes with one bulk insert and one
+    bulk update. Policies come from the per-process cache; when new alerts
+    reference policies, write_alerts adds one query checking those still exist.
+    Pairs without a stock row are skipped. Returns (created, resolved) counts.
+    """
+    pairs = list(pairs)
+    created = resolved = 0
+
+    for start in range(0, len(pairs), PAIR_CHUNK_SIZE):
+        chunk = pairs[start : start + PAIR_CHUNK_SIZE]
+        condition = pairs_q(chunk)
+
+        stocks = Stock.objects.filter(condition).values_list(
+            "product_id",
+            "warehouse_id",
+            "quantity_on_hand",
+            "product__name",
+            "product__unit_of_measure",
+            "warehouse__name",
+        )
+        open_alerts = {}
+        for (
+            alert_id,
+            product_id,
+            warehouse_id,
+            alert_type,
+            status,
+        ) in InventoryAlert.objects.filter(
+            condition,
+            status__in=UNRESOLVED_STATUSES,
+            alert_type__in=STOCK_ALERT_TYPES,
+        ).values_list(
+            "id", "product_id", "warehouse_id", "alert_type", "status"
+        ):
+            open_alerts.setdefault((product_id, warehouse_id), []).append(
+                (alert_id, alert_type, status)
+            )
+
+        to_create, to_resolve = decide_alerts(stocks, open_alerts, triggered_by)
+        write_alerts(to_create, to_resolve)
+        created += len(to_create)
+        resolved += len(to_resolve)
+
+    return created, resolved
+
+
+def decide_alerts(stock_rows, open_alerts, triggered_by):
+    """
+    Apply the stock alert rules to rows of (product_id, warehouse_id, quantity,
+    product_name, unit, warehouse_name) given the unresolved alerts per pair.
+
+    A pair that needs an alert gets a new one unless an OPEN alert of that type
+    exists; a pair that needs none has all its unresolved stock alerts resolved.
+    Returns (alerts to create, alert ids to resolve).
+    """
+    policies = get_active_policies()
+    to_create = []
+    to_resolve = []
+
+    for (
+        product_id,
+        warehouse_id,
+        quantity,
+        product_name,
+        unit,
+        warehouse_name,
+    ) in stock_rows:
+        policy_id, min_stock_level = policies.get(
+            (product_id, warehouse_id), (None, None)
+        )
+        alert_type = classify_stock_level(quantity, min_stock_level)
+        existing = open_alerts.get((product_id, warehouse_id), [])
+
+        if alert_type is None:
+            to_resolve.extend(alert_id for alert_id, _, _ in existing)
+        elif not any(
+            existing_type == alert_type and status == "OPEN"
+            for _, existing_type, status in existing
+        ):
+            to_create.append(
+                InventoryAlert(
+                    product_id=product_id,
+                    warehouse_id=warehouse_id,
+                    reorder_policy_id=policy_id,
+                    alert_type=alert_type,
+                    message=build_alert_message(
+                        alert_type,
+                        quantity,
+                        product_name,
+                        warehouse_name,
+                        unit,
+                        min_stock_level,
+                    ),
+                    current_quantity=quantity,
+                    triggered_by=triggered_by,
+                )
+            )
+
+    return to_create, to_resolve
+
+
+def write_alerts(to_create, to_resolve):
+    """Insert new alerts and resolve stale ones in bulk"""
+    # Another process may have deleted a policy this process still has cached
+    policy_ids = {alert.reorder_policy_id for alert in to_create} - {None}
+    if policy_ids:
+        existing = set(
+            ProductReorderPolicy.objects.filter(id__in=policy_ids).values_list(
+                "id", flat=True
+            )
+        )
+        for alert in to_create:
+            if alert.reorder_policy_id not in existing:
+                alert.reorder_policy_id = None
+
+    InventoryAlert.objects.bulk_create(to_create, batch_size=1000)
+    if to_resolve:
+        InventoryAlert.objects.filter(id__in=to_resolve).update(
+            status="RESOLVED", resolved_at=timezone.now()
+        )
+    if to_create or to_resolve:
+        invalidate_stock_caches()
+
+
+def sweep_alerts(chunk_size=PAIR_CHUNK_SIZE):
+    """
+    Evaluate every stock row as a scheduled check.
+
+    One query joins each stock row to its active reorder policy and flags the
+    open LOW_STOCK / OUT_OF_STOCK and unresolved alerts of the pair. Rows are
+    streamed (a server-side cursor on PostgreSQL) and the resulting inserts and
+    resolutions are flushed every chunk_size pairs, so memory stays flat.
+    The rules are the same as evaluate_alerts. Returns a dict of counts and
+    timings in milliseconds.
+    """
+    started = time.perf_counter()
+    result = {"checked": 0, "created": 0, "resolved": 0, "write_ms": 0.0}
+
+    pair = {
+        "product_id": OuterRef("product_id"),
+        "warehouse_id": OuterRef("warehouse_id"),
+    }
+    policy = ProductReorderPolicy.objects.filter(**pair, is_active=True)
+    stock_alerts = InventoryAlert.objects.filter(
+        **pair, alert_type__in=STOCK_ALERT_TYPES
+    )
+    open_alerts = stock_alerts.filter(status="OPEN")
+
+    rows = (
+        Stock.objects.order_by()
+        .annotate(
+            policy_id=Subquery(policy.values("id")[:1]),
+            min_stock_level=Subquery(policy.values("min_stock_level")[:1]),
+            open_low=Exists(open_alerts.filter(alert_type="LOW_STOCK")),
+            open_out=Exists(open_alerts.filter(alert_type="OUT_OF_STOCK")),
+            unresolved=Exists(stock_alerts.filter(status__in=UNRESOLVED_STATUSES)),
+        )
+        .values_list(
+            "product_id",
+            "warehouse_id",
+            "quantity_on_hand",
+            "product__name",
+            "product__unit_of_measure",
+            "warehouse__name",
+            "policy_id",
+            "min_stock_level",
+            "open_low",
+            "open_out",
+            "unresolved",
+        )
+    )
+
+    to_create = []
+    to_resolve = []
+
+    def flush():
+        write_started = time.perf_counter()
+        InventoryAlert.objects.bulk_create(to_create, batch_size=1000)
+        if to_resolve:
+            result["resolved"] += InventoryAlert.objects.filter(
+                pairs_q(to_resolve),
+                status__in=UNRESOLVED_STATUSES,
+                alert_type__in=STOCK_ALERT_TYPES,
+            ).update(status="RESOLVED", resolved_at=timezone.now())
+        result["created"] += len(to_create)
+        if to_create or to_resolve:
+            invalidate_stock_caches()
+        result["write_ms"] += (time.perf_counter() - write_started) * 1000
+        to_create.clear()
+        to_resolve.clear()
+
+    for (
+        product_id,
+        warehouse_id,
+        quantity,
+        product_name,
+        unit,
+        warehouse_name,
+        policy_id,
+        min_stock_level,
+        open_low,
+        open_out,
+        unresolved,
+    ) in rows.iterator(chunk_size=chunk_size):
+        result["checked"] += 1
+        alert_type = classify_stock_level(quantity, min_stock_level)
+
+        if alert_type is None:
+            if unresolved:
+                to_resolve.append((product_id, warehouse_id))
+        elif not (open_low if alert_type == "LOW_STOCK" else open_out):
+            to_create.append(
+                InventoryAlert(
+                    product_id=product_id,
+                    warehouse_id=warehouse_id,
+                    reorder_policy_id=policy_id,
+                    alert_type=alert_type,
+                    message=build_alert_message(
+                        alert_type,
+                        quantity,
+                        product_name,
+                        warehouse_name,
+                        unit,
+                        min_stock_level,
+                    ),
+                    current_quantity=quantity,
+                    triggered_by="SCHEDULED_CHECK",
+                )
+            )
+
+        if len(to_create) + len(to_resolve) >= chunk_size:
+            flush()
+    flush()
+
+    result["total_ms"] = (time.perf_counter() - started) * 1000
+    return result
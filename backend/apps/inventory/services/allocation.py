@@ -0,0 +1,53 @@
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F
+from ..models import Batch, StockMovement
+from .stock_movements import write_stock_movements
+
+
+def allocate_fefo(
+    product_id, warehouse_id, quantity, reference_number=None, notes=None
+):
+    """
+    Take quantity of a product out of a warehouse, earliest expiry first.
+
+    Non-empty batches are read and locked in one query ordered like the
+    batch_product_expiry_idx index (undated batches last, then oldest first).
+    Rows are streamed so only the batches actually needed are fetched and locked.
+    One OUT movement is written per batch used, all in one transaction.
+
+    Returns the list of created movements. Raises ValidationError, without
+    writing anything, when the warehouse does not hold enough stock.
+    """
+    with transaction.atomic():
+        batches = (
+            Batch.objects.select_for_update()
+            .filter(product_id=product_id, warehouse_id=warehouse_id, quantity__gt=0)
+            .order_by(F("expiry_date").asc(nulls_last=True), "created_at", "id")
+        )
+
+        movements = []
+        remaining = quantity
+        for batch in batches.iterator(chunk_size=50):
+            take = min(batch.quantity, remaining)
+            movements.append(
+                StockMovement(
+                    batch=batch,
+                    movement_type="OUT",
+                    quantity=take,
+                    reference_number=reference_number,
+                    notes=notes,
+                )
+            )
+            remaining -= take
+            if remaining <= 0:
+                break
+
+        if remaining > 0:
+            raise ValidationError(
+                f"Insufficient stock: {quantity - remaining} available, {quantity} requested"
+            )
+
+        write_stock_movements(movements)
+
+    return movements
@@ -0,0 +1,113 @@
+from datetime import timedelta
+from django.conf import settings
+from django.db.models import Case, When, Value, DateField, Exists, OuterRef, F
+from django.utils import timezone
+from ..cache import invalidate_stock_caches
+from ..models import Batch, InventoryAlert
+
+EXPIRY_CHUNK_SIZE = 1000
+DEFAULT_EXPIRY_HORIZON_DAYS = 7
+
+
+def get_expiry_horizons():
+    """Return (default horizon, {category: horizon}) in days from settings"""
+    horizons = dict(getattr(settings, "INVENTORY_EXPIRY_HORIZON_DAYS", {}))
+    default = horizons.pop("default", DEFAULT_EXPIRY_HORIZON_DAYS)
+    return default, horizons
+
+
+def expiry_threshold(today, default, horizons):
+    """Per-row expiry cut-off date depending on the product category"""
+    return Case(
+        *[
+            When(
+                product__category__iexact=category,
+                then=Value(today + timedelta(days=days)),
+            )
+            for category, days in horizons.items()
+        ],
+        default=Value(today + timedelta(days=default)),
+        output_field=DateField(),
+    )
+
+
+def check_expiring_batches(today=None, chunk_size=EXPIRY_CHUNK_SIZE):
+    """
+    Create EXPIRY alerts for stocked batches that expire within their category's
+    horizon, one alert per product/warehouse without an OPEN expiry alert.
+
+    Candidates come from one query: a range scan on expiry_date bounded by the
+    longest horizon, filtered by the per-category cut-off and anti-joined to the
+    open EXPIRY alerts. Rows are streamed and alerts inserted in chunks.
+    Returns the number of alerts created.
+    """
+    today = today or timezone.now().date()
+    default, horizons = get_expiry_horizons()
+    longest = max([default, *horizons.values()])
+
+    open_alerts = InventoryAlert.objects.filter(
+        product_id=OuterRef("product_id"),
+        warehouse_id=OuterRef("warehouse_id"),
+        alert_type="EXPIRY",
+        status="OPEN",
+    )
+    batches = (
+        Batch.objects.filter(
+            expiry_date__gte=today,
+            expiry_date__lte=today + timedelta(days=longest),
+            quantity__gt=0,
+        )
+        .alias(
+            threshold=expiry_threshold(today, default, horizons),
+            alerted=Exists(open_alerts),
+        )
+        .filter(expiry_date__lte=F("threshold"), alerted=False)
+        .order_by("product_id", "warehouse_id", "expiry_date")
+        .values_list(
+            "product_id",
+            "warehouse_id",
+            "batch_number",
+            "expiry_date",
+            "quantity",
+            "product__name",
+        )
+    )
+
+    created = 0
+    alerts = []
+    previous = None
+    for (
+        product_id,
+        warehouse_id,
+        batch_number,
+        expiry_date,
+        quantity,
+        product_name,
+    ) in batches.iterator(chunk_size=chunk_size):
+        # Rows are ordered by pair, so the first one is the earliest to expire
+        if (product_id, warehouse_id) == previous:
+            continue
+        previous = (product_id, warehouse_id)
+
+        alerts.append(
+            InventoryAlert(
+                product_id=product_id,
+                warehouse_id=warehouse_id,
+                alert_type="EXPIRY",
+                message=f"Batch {batch_number} of {product_name} expires on {expiry_date}",
+                current_quantity=quantity,
+                triggered_by="SCHEDULED_CHECK",
+            )
+        )
+        if len(alerts) >= chunk_size:
+            InventoryAlert.objects.bulk_create(alerts)
+            created += len(alerts)
+            alerts = []
+
+    if alerts:
+        InventoryAlert.objects.bulk_create(alerts)
+        created += len(alerts)
+
+    if created:
+        invalidate_stock_caches()
+    return created
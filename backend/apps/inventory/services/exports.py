@@ -0,0 +1,76 @@
+import csv
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+
+# Stock movement ledger export. Rows are read as tuples through a server-side
+# cursor (queryset.iterator) with batch, product and warehouse joined in the same
+# query, and encoded one at a time, so memory stays flat at any export size.
+
+EXPORT_CHUNK_SIZE = 2000
+
+MOVEMENT_EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("movement_type", "movement_type"),
+    ("quantity", "quantity"),
+    ("reference_number", "reference_number"),
+    ("notes", "notes"),
+    ("batch_id", "batch_id"),
+    ("batch_number", "batch__batch_number"),
+    ("expiry_date", "batch__expiry_date"),
+    ("product_id", "batch__product_id"),
+    ("product_sku", "batch__product__sku"),
+    ("product_name", "batch__product__name"),
+    ("unit_of_measure", "batch__product__unit_of_measure"),
+    ("warehouse_id", "batch__warehouse_id"),
+    ("warehouse_name", "batch__warehouse__name"),
+]
+
+EXPORT_FORMATS = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """File-like object whose write returns the value, for csv.writer"""
+
+    def write(self, value):
+        return value
+
+
+def movement_export_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream (column values...) tuples for the movements in queryset"""
+    return queryset.values_list(
+        *(path for _, path in MOVEMENT_EXPORT_COLUMNS)
+    ).iterator(chunk_size=chunk_size)
+
+
+def iter_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([name for name, _ in MOVEMENT_EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def iter_ndjson(rows):
+    names = [name for name, _ in MOVEMENT_EXPORT_COLUMNS]
+    for row in rows:
+        yield json.dumps(dict(zip(names, row)), cls=DjangoJSONEncoder) + "\n"
+
+
+def export_movements(queryset, file_format, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Generator of encoded chunks for a CSV or NDJSON movement export. Lines are
+    joined into one chunk per chunk_size rows to keep the write calls few.
+    """
+    rows = movement_export_rows(queryset, chunk_size)
+    lines = iter_ndjson(rows) if file_format == "ndjson" else iter_csv(rows)
+    buffer = []
+    for line in lines:
+        buffer.append(line)
+        if len(buffer) >= chunk_size:
+            yield "".join(buffer)
+            buffer.clear()
+    if buffer:
+        yield "".join(buffer)
@@ -0,0 +1,95 @@
+from urllib.parse import quote
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Sum
+from django.utils import timezone
+from ..cache import get_stock_generation
+from ..models import Stock
+
+DEFAULT_MATRIX_CACHE_TTL = 300
+MATRIX_LAYOUTS = ["sparse", "dense"]
+
+
+def build_stock_matrix(category=None, company_id=None, layout="sparse"):
+    """
+    Pivot of quantity on hand with products as rows and warehouses as columns.
+
+    One GROUP BY query over Stock joined to product and warehouse. The payload
+    is columnar: products and warehouses are parallel id/sku/name arrays, and
+    the quantities are either sparse (parallel product index, warehouse index
+    and quantity arrays, non-empty cells only) or dense (one row of
+    quantities per product, 0 where there is no stock row).
+    """
+    stocks = Stock.objects.order_by()
+    if category:
+        stocks = stocks.filter(product__category__iexact=category)
+    if company_id:
+        stocks = stocks.filter(product__company_id=company_id)
+
+    rows = (
+        stocks.values_list(
+            "product_id",
+            "product__sku",
+            "product__name",
+            "warehouse_id",
+            "warehouse__name",
+        )
+        .annotate(quantity=Sum("quantity_on_hand"))
+        .order_by("product__name", "warehouse__name")
+    )
+
+    products = {"id": [], "sku": [], "name": []}
+    warehouses = {"id": [], "name": []}
+    product_index = {}
+    warehouse_index = {}
+    cells = []
+    for product_id, sku, product_name, warehouse_id, warehouse_name, quantity in rows:
+        if product_id not in product_index:
+            product_index[product_id] = len(products["id"])
+            products["id"].append(product_id)
+            products["sku"].append(sku)
+            products["name"].append(product_name)
+        if warehouse_id not in warehouse_index:
+            warehouse_index[warehouse_id] = len(warehouses["id"])
+            warehouses["id"].append(warehouse_id)
+            warehouses["name"].append(warehouse_name)
+        cells.append(
+            (product_index[product_id], warehouse_index[warehouse_id], float(quantity))
+        )
+
+    matrix = {
+        "generated_at": timezone.now(),
+        "layout": layout,
+        "products": products,
+        "warehouses": warehouses,
+    }
+    if layout == "dense":
+        quantities = [[0] * len(warehouses["id"]) for _ in products["id"]]
+        for row, column, quantity in cells:
+            quantities[row][column] = quantity
+        matrix["quantities"] = quantities
+    else:
+        matrix["cells"] = {
+            "product": [row for row, _, _ in cells],
+            "warehouse": [column for _, column, _ in cells],
+            "quantity": [quantity for _, _, quantity in cells],
+        }
+    return matrix
+
+
+def get_stock_matrix(category=None, company_id=None, layout="sparse"):
+    """
+    build_stock_matrix() cached until the next stock write, or at most
+    INVENTORY_MATRIX_CACHE_TTL seconds (which also bounds stale product and
+    warehouse names after a rename)
+    """
+    key = (
+        f"inventory:stock_matrix:{get_stock_generation()}:"
+        f"{quote((category or '').lower())}:{company_id or 'all'}:{layout}"
+    )
+    matrix = cache.get(key)
+    if matrix is None:
+        matrix = build_stock_matrix(category, company_id, layout)
+        ttl = getattr(settings, "INVENTORY_MATRIX_CACHE_TTL", DEFAULT_MATRIX_CACHE_TTL)
+        cache.set(key, matrix, timeout=ttl)
+    return matrix
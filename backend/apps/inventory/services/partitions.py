@@ -0,0 +1,236 @@
+import gzip
+import os
+from datetime import date
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from ..models import StockMovement
+
+# Optional PostgreSQL layout: StockMovement stored as monthly range partitions on
+# created_at, named <table>_pYYYY_MM, plus a default partition that catches rows
+# outside the created ranges. Other backends raise PartitioningError.
+
+DEFAULT_PARTITIONS_AHEAD = 3
+DEFAULT_RETENTION_MONTHS = 24
+
+
+class PartitioningError(Exception):
+    """Raised when movement partitioning is not possible on this database"""
+
+
+def movement_table():
+    return StockMovement._meta.db_table
+
+
+def month_start(day):
+    return date(day.year, day.month, 1)
+
+
+def add_months(day, months):
+    """First day of the month `months` after the month of day"""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    return f"{movement_table()}_p{month.year:04d}_{month.month:02d}"
+
+
+def month_of_partition(name):
+    """Month a partition name covers, or None for the default partition"""
+    suffix = name[len(movement_table()) + 2 :]
+    try:
+        year, month = suffix.split("_")
+        return date(int(year), int(month), 1)
+    except ValueError:
+        return None
+
+
+def require_postgresql():
+    if connection.vendor != "postgresql":
+        raise PartitioningError(
+            "Stock movement partitioning requires PostgreSQL, "
+            f"the default database is {connection.vendor}"
+        )
+
+
+def is_partitioned():
+    """True when the movement table is already a partitioned table"""
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_partitioned_table WHERE partrelid = %s::regclass",
+            [movement_table()],
+        )
+        return cursor.fetchone() is not None
+
+
+def list_partitions():
+    """Names of the monthly partitions currently attached, oldest first"""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = %s::regclass
+            ORDER BY child.relname
+            """,
+            [movement_table()],
+        )
+        names = [row[0] for row in cursor.fetchall()]
+    return [name for name in names if month_of_partition(name) is not None]
+
+
+def create_partition(cursor, month):
+    """Create the partition for one month if it does not exist yet"""
+    cursor.execute(
+        f"""
+        CREATE TABLE IF NOT EXISTS {connection.ops.quote_name(partition_name(month))}
+        PARTITION OF {connection.ops.quote_name(movement_table())}
+        FOR VALUES FROM (%s) TO (%s)
+        """,
+        [month, add_months(month, 1)],
+    )
+
+
+def ensure_partitions(ahead=None):
+    """
+    Create monthly partitions from the current month up to `ahead` months in
+    the future. Returns the names of the partitions that were missing.
+    """
+    require_postgresql()
+    if ahead is None:
+        ahead = getattr(
+            settings, "STOCK_MOVEMENT_PARTITIONS_AHEAD", DEFAULT_PARTITIONS_AHEAD
+        )
+
+    existing = set(list_partitions())
+    current = month_start(timezone.localdate())
+    created = []
+    with transaction.atomic(), connection.cursor() as cursor:
+        for offset in range(ahead + 1):
+            month = add_months(current, offset)
+            if partition_name(month) not in existing:
+                create_partition(cursor, month)
+                created.append(partition_name(month))
+    return created
+
+
+def partition_movement_table(ahead=None):
+    """
+    Convert the movement table into a table partitioned by month on created_at.
+
+    The existing table is renamed, an empty partitioned copy takes its place
+    with a primary key of (id, created_at), partitions are created for every
+    month that holds data and the rows are copied over. Non-unique indexes and
+    foreign keys of the old table are recreated on the new one. Runs in one
+    transaction; returns the number of rows moved.
+    """
+    require_postgresql()
+    if is_partitioned():
+        return 0
+
+    quote = connection.ops.quote_name
+    table = movement_table()
+    old_table = f"{table}_unpartitioned"
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(
+            """
+            SELECT indexdef FROM pg_indexes
+            WHERE tablename = %s AND indexdef NOT LIKE 'CREATE UNIQUE%%'
+            """,
+            [table],
+        )
+        index_definitions = [row[0] for row in cursor.fetchall()]
+        cursor.execute(
+            """
+            SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint
+            WHERE conrelid = %s::regclass AND contype = 'f'
+            """,
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+
+        cursor.execute(f"ALTER TABLE {quote(table)} RENAME TO {quote(old_table)}")
+        cursor.execute(
+            f"""
+            CREATE TABLE {quote(table)}
+                (LIKE {quote(old_table)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)
+            PARTITION BY RANGE (created_at)
+            """
+        )
+        cursor.execute(
+            f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + '_id_created_pk')} "
+            "PRIMARY KEY (id, created_at)"
+        )
+
+        cursor.execute(f"SELECT min(created_at) FROM {quote(old_table)}")
+        oldest = cursor.fetchone()[0]
+        month = month_start(
+            timezone.localtime(oldest).date() if oldest else timezone.localdate()
+        )
+        last = add_months(month_start(timezone.localdate()), ahead or 0)
+        while month <= last:
+            create_partition(cursor, month)
+            month = add_months(month, 1)
+        cursor.execute(
+            f"CREATE TABLE {quote(table + '_default')} "
+            f"PARTITION OF {quote(table)} DEFAULT"
+        )
+
+        cursor.execute(f"INSERT INTO {quote(table)} SELECT * FROM {quote(old_table)}")
+        moved = cursor.rowcount
+        cursor.execute(f"DROP TABLE {quote(old_table)}")
+
+        # The definitions were read before the rename, so they name the new table
+        for definition in index_definitions:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(
+                f"ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}"
+            )
+
+    ensure_partitions(ahead)
+    return moved
+
+
+def archive_partitions(output_dir, retention_months=None, drop=False):
+    """
+    Export every monthly partition older than the retention window to
+    <output_dir>/<partition>.csv.gz, then detach it (and drop it when asked).
+    Returns a list of (partition, rows, path).
+    """
+    require_postgresql()
+    if retention_months is None:
+        retention_months = getattr(
+            settings, "STOCK_MOVEMENT_RETENTION_MONTHS", DEFAULT_RETENTION_MONTHS
+        )
+
+    quote = connection.ops.quote_name
+    cutoff = add_months(month_start(timezone.localdate()), -retention_months)
+    os.makedirs(output_dir, exist_ok=True)
+
+    archived = []
+    for name in list_partitions():
+        if month_of_partition(name) >= cutoff:
+            continue
+
+        path = os.path.join(output_dir, f"{name}.csv.gz")
+        with transaction.atomic(), connection.cursor() as cursor:
+            with gzip.open(path, "wt", encoding="utf-8") as archive:
+                cursor.copy_expert(
+                    f"COPY {quote(name)} TO STDOUT WITH (FORMAT csv, HEADER)", archive
+                )
+            cursor.execute(f"SELECT count(*) FROM {quote(name)}")
+            rows = cursor.fetchone()[0]
+            cursor.execute(
+                f"ALTER TABLE {quote(movement_table())} DETACH PARTITION {quote(name)}"
+            )
+            if drop:
+                cursor.execute(f"DROP TABLE {quote(name)}")
+        archived.append((name, rows, path))
+
+    return archived
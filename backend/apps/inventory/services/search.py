@@ -0,0 +1,137 @@
+from django.db import connection
+from django.db.models import (
+    Case,
+    When,
+    Value,
+    F,
+    Q,
+    Func,
+    FloatField,
+    CharField,
+)
+from django.db.models.functions import Coalesce, Greatest
+from central.models import Product
+from ..models import Batch, StockMovement
+
+# Global inventory search. Every target is matched with icontains, which the
+# pg_trgm GIN indexes on UPPER(column) serve on PostgreSQL, and ranked with
+# word_similarity there. Other backends fall back to a plain LIKE scan ranked
+# exact > prefix > substring.
+
+MIN_QUERY_LENGTH = 2
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+SEARCH_TARGETS = {
+    "product": {
+        "queryset": lambda: Product.objects.all(),
+        "fields": ["name", "sku", "category"],
+        "values": ["id", "name", "sku", "category"],
+        "label": lambda row: row["name"],
+        "detail": lambda row: {"sku": row["sku"], "category": row["category"]},
+    },
+    "batch": {
+        "queryset": lambda: Batch.objects.all(),
+        "fields": ["batch_number"],
+        "values": [
+            "id",
+            "batch_number",
+            "quantity",
+            "expiry_date",
+            "product__name",
+            "warehouse__name",
+        ],
+        "label": lambda row: row["batch_number"],
+        "detail": lambda row: {
+            "product": row["product__name"],
+            "warehouse": row["warehouse__name"],
+            "quantity": row["quantity"],
+            "expiry_date": row["expiry_date"],
+        },
+    },
+    "movement": {
+        "queryset": lambda: StockMovement.objects.all(),
+        "fields": ["reference_number"],
+        "values": [
+            "id",
+            "reference_number",
+            "movement_type",
+            "quantity",
+            "created_at",
+            "batch__batch_number",
+        ],
+        "label": lambda row: row["reference_number"],
+        "detail": lambda row: {
+            "movement_type": row["movement_type"],
+            "quantity": row["quantity"],
+            "batch_number": row["batch__batch_number"],
+            "created_at": row["created_at"],
+        },
+    },
+}
+
+
+def search_mode():
+    return "trigram" if connection.vendor == "postgresql" else "simple"
+
+
+def field_score(query, field):
+    """Relevance of one field to the query, between 0 and 1"""
+    if search_mode() == "trigram":
+        return Func(
+            Value(query, output_field=CharField()),
+            Coalesce(F(field), Value("")),
+            function="word_similarity",
+            output_field=FloatField(),
+        )
+    return Case(
+        When(**{f"{field}__iexact": query}, then=Value(1.0)),
+        When(**{f"{field}__istartswith": query}, then=Value(0.8)),
+        When(**{f"{field}__icontains": query}, then=Value(0.5)),
+        default=Value(0.0),
+        output_field=FloatField(),
+    )
+
+
+def search_target(name, query, limit):
+    """Top `limit` hits of one target as result dicts, best first"""
+    target = SEARCH_TARGETS[name]
+    fields = target["fields"]
+
+    condition = Q()
+    for field in fields:
+        condition |= Q(**{f"{field}__icontains": query})
+    scores = [field_score(query, field) for field in fields]
+    score = scores[0] if len(scores) == 1 else Greatest(*scores)
+
+    rows = (
+        target["queryset"]()
+        .filter(condition)
+        .annotate(search_score=score)
+        .order_by("-search_score", target["values"][1])
+        .values(*target["values"], "search_score")[:limit]
+    )
+    return [
+        {
+            "type": name,
+            "id": row["id"],
+            "label": target["label"](row),
+            "detail": target["detail"](row),
+            "score": round(row["search_score"], 4),
+        }
+        for row in rows
+    ]
+
+
+def search_inventory(query, types=None, limit=DEFAULT_LIMIT):
+    """
+    Search products, batches and movements for query.
+
+    Runs one query per requested type, each returning at most `limit` ranked
+    hits, then merges them by score. Returns the merged, typed result list.
+    """
+    results = []
+    for name in types or SEARCH_TARGETS:
+        results.extend(search_target(name, query, limit))
+    results.sort(key=lambda result: -result["score"])
+    return results[:limit]
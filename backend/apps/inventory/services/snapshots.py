@@ -0,0 +1,165 @@
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+from decimal import Decimal
+from django.db import connection, transaction
+from django.db.models import (
+    Case,
+    When,
+    F,
+    Sum,
+    Value,
+    OuterRef,
+    Subquery,
+    DecimalField,
+    DateTimeField,
+)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..models import Stock, StockSnapshot, Batch, StockMovement
+
+SNAPSHOT_CHUNK_SIZE = 5000
+EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+QUANTITY_FIELD = DecimalField(max_digits=12, decimal_places=2)
+
+
+def take_stock_snapshot(snapshot_date=None, chunk_size=SNAPSHOT_CHUNK_SIZE):
+    """
+    Copy every Stock row into StockSnapshot for snapshot_date (default today),
+    replacing an earlier snapshot of the same date. Returns the rows copied.
+
+    PostgreSQL copies with one INSERT ... SELECT inside the database; other
+    backends stream the rows and insert them in chunks.
+    """
+    taken_at = timezone.now()
+    snapshot_date = snapshot_date or timezone.localdate(taken_at)
+
+    with transaction.atomic():
+        StockSnapshot.objects.filter(snapshot_date=snapshot_date).delete()
+
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {StockSnapshot._meta.db_table}
+                        (id, snapshot_date, taken_at, product_id, warehouse_id,
+                         quantity_on_hand, status)
+                    SELECT gen_random_uuid(), %s, %s, product_id, warehouse_id,
+                           quantity_on_hand, status
+                    FROM {Stock._meta.db_table}
+                    """,
+                    [snapshot_date, taken_at],
+                )
+                return cursor.rowcount
+
+        rows = Stock.objects.order_by().values_list(
+            "product_id", "warehouse_id", "quantity_on_hand", "status"
+        )
+        copied = 0
+        snapshots = []
+        for product_id, warehouse_id, quantity, status in rows.iterator(
+            chunk_size=chunk_size
+        ):
+            snapshots.append(
+                StockSnapshot(
+                    snapshot_date=snapshot_date,
+                    taken_at=taken_at,
+                    product_id=product_id,
+                    warehouse_id=warehouse_id,
+                    quantity_on_hand=quantity,
+                    status=status,
+                )
+            )
+            if len(snapshots) >= chunk_size:
+                StockSnapshot.objects.bulk_create(snapshots)
+                copied += len(snapshots)
+                snapshots = []
+        StockSnapshot.objects.bulk_create(snapshots)
+        return copied + len(snapshots)
+
+
+def signed_quantity():
+    """Movement quantity with the sign it applies to stock"""
+    return Case(
+        When(movement_type__in=["OUT", "RETURN"], then=-F("quantity")),
+        default=F("quantity"),
+        output_field=QUANTITY_FIELD,
+    )
+
+
+def annotate_stock_as_of(queryset, as_of):
+    """
+    Annotate stock rows with as_of_quantity, the quantity held at the end of
+    the as_of date.
+
+    Each row starts from its latest snapshot dated as_of or earlier (or from
+    nothing when there is none). A snapshot holds the stock at its taken_at, so
+    movements and new batches (at their opening quantity) between taken_at and
+    the end of the day are added, or subtracted when the snapshot was taken
+    after the day ended (after midnight, or backfilled with --date).
+    Everything is computed in correlated subqueries of the stock query itself.
+    """
+    cutoff = timezone.make_aware(datetime.combine(as_of + timedelta(days=1), time.min))
+    zero = Value(Decimal("0"), output_field=QUANTITY_FIELD)
+    taken_at = OuterRef("snapshot_taken_at")
+
+    snapshot = StockSnapshot.objects.filter(
+        product_id=OuterRef("product_id"),
+        warehouse_id=OuterRef("warehouse_id"),
+        snapshot_date__lte=as_of,
+    ).order_by("-snapshot_date")
+
+    def pair_movements(**created_at):
+        return (
+            StockMovement.objects.filter(
+                batch__product_id=OuterRef("product_id"),
+                batch__warehouse_id=OuterRef("warehouse_id"),
+                **created_at,
+            )
+            .order_by()
+            .values("batch__product_id")
+            .annotate(total=Sum(signed_quantity()))
+            .values("total")
+        )
+
+    # A batch's opening quantity is its current quantity minus every movement on it
+    batch_movements = (
+        StockMovement.objects.filter(batch_id=OuterRef("pk"))
+        .order_by()
+        .values("batch_id")
+        .annotate(total=Sum(signed_quantity()))
+        .values("total")
+    )
+
+    def pair_new_batches(**created_at):
+        return (
+            Batch.objects.filter(
+                product_id=OuterRef("product_id"),
+                warehouse_id=OuterRef("warehouse_id"),
+                **created_at,
+            )
+            .order_by()
+            .values("product_id")
+            .annotate(
+                total=Sum(
+                    F("quantity") - Coalesce(Subquery(batch_movements), zero),
+                    output_field=QUANTITY_FIELD,
+                )
+            )
+            .values("total")
+        )
+
+    # (taken_at, cutoff) is added; [cutoff, taken_at] is taken back out
+    later = {"created_at__gt": taken_at, "created_at__lt": cutoff}
+    earlier = {"created_at__gte": cutoff, "created_at__lte": taken_at}
+
+    return queryset.annotate(
+        snapshot_taken_at=Coalesce(
+            Subquery(snapshot.values("taken_at")[:1]),
+            Value(EPOCH),
+            output_field=DateTimeField(),
+        ),
+        as_of_quantity=Coalesce(Subquery(snapshot.values("quantity_on_hand")[:1]), zero)
+        + Coalesce(Subquery(pair_movements(**later)), zero)
+        + Coalesce(Subquery(pair_new_batches(**later)), zero)
+        - Coalesce(Subquery(pair_movements(**earlier)), zero)
+        - Coalesce(Subquery(pair_new_batches(**earlier)), zero),
+    )
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import F, Case, When, Value, DecimalField
+from ..models import Batch, StockMovement
+from ..utils import get_movement_delta, get_stock_ledger_mode, apply_stock_delta
+from .stock_sync import mark_stock_dirty
+
+BATCH_UPDATE_CHUNK_SIZE = 500
+
+
+def apply_batch_deltas(deltas):
+    """Apply {batch_id: delta} to batch quantities with one UPDATE per chunk"""
+    batch_ids = [batch_id for batch_id, delta in deltas.items() if delta]
+
+    for start in range(0, len(batch_ids), BATCH_UPDATE_CHUNK_SIZE):
+        chunk = batch_ids[start : start + BATCH_UPDATE_CHUNK_SIZE]
+        Batch.objects.filter(id__in=chunk).update(
+            quantity=F("quantity")
+            + Case(
+                *[When(id=batch_id, then=Value(deltas[batch_id])) for batch_id in chunk],
+                output_field=DecimalField(max_digits=10, decimal_places=2),
+            )
+        )
+
+
+def sync_stock_pairs(pair_deltas):
+    """
+    Apply the net stock change of every touched (product_id, warehouse_id) pair
+    once, and queue each pair for the commit-time recount and alert check.
+    """
+    for (product_id, warehouse_id), delta in pair_deltas.items():
+        if get_stock_ledger_mode() == "delta":
+            apply_stock_delta(product_id, warehouse_id, delta)
+        mark_stock_dirty(product_id, warehouse_id)
+
+
+def apply_stock_movements(entries, best_effort=False):
+    """
+    Validate and write many stock movements as one set-based operation.
+
+    entries is a list of (index, data) where data holds batch (an id),
+    movement_type, quantity, reference_number and notes. Movements are inserted
+    with bulk_create, batch quantities are updated once per batch, and each
+    touched product/warehouse has its stock and alerts refreshed once.
+
+    Returns (created, errors): created is a list of (index, StockMovement) and
+    errors maps index to field errors. Without best_effort nothing is written
+    when any row fails.
+    """
+    with transaction.atomic():
+        batch_ids = {data["batch"] for _, data in entries}
+        batches = {
+            batch.id: batch
+            for batch in Batch.objects.select_for_update()
+            .filter(id__in=batch_ids)
+            .order_by("id")
+        }
+
+        balances = {batch_id: batch.quantity for batch_id, batch in batches.items()}
+        accepted = []
+        errors = {}
+
+        for index, data in entries:
+            batch = batches.get(data["batch"])
+            if batch is None:
+                errors[index] = {
+                    "batch": [f'Invalid pk "{data["batch"]}" - object does not exist.']
+                }
+                continue
+
+            delta = get_movement_delta(data["movement_type"], data["quantity"])
+            # Batches are locked above, so the running balance is authoritative;
+            # the batch_quantity_non_negative constraint backs this check up
+            if delta < 0 and balances[batch.id] + delta < 0:
+                errors[index] = {
+                    "quantity": [
+                        f"Movement quantity {data['quantity']} exceeds batch quantity {balances[batch.id]}"
+                    ]
+                }
+                continue
+
+            balances[batch.id] += delta
+            accepted.append(
+                (
+                    index,
+                    StockMovement(
+                        batch=batch,
+                        movement_type=data["movement_type"],
+                        quantity=data["quantity"],
+                        reference_number=data.get("reference_number"),
+                        notes=data.get("notes"),
+                    ),
+                )
+            )
+
+        if errors and not best_effort:
+            return [], errors
+
+        write_stock_movements([movement for _, movement in accepted])
+
+    return accepted, errors
+
+
+def write_stock_movements(movements):
+    """
+    Insert already validated movements and apply their effects set-wise.
+
+    Each movement must have its batch loaded. Callers are responsible for
+    locking the batches and checking quantities inside the same transaction.
+    """
+    StockMovement.objects.bulk_create(movements, batch_size=1000)
+
+    batch_deltas = defaultdict(Decimal)
+    pair_deltas = defaultdict(Decimal)
+    for movement in movements:
+        delta = get_movement_delta(movement.movement_type, movement.quantity)
+        batch_deltas[movement.batch_id] += delta
+        pair_deltas[(movement.batch.product_id, movement.batch.warehouse_id)] += delta
+
+    apply_batch_deltas(batch_deltas)
+    sync_stock_pairs(pair_deltas)
@@ -0,0 +1,67 @@
+import threading
+from django.db import transaction
+from central.models import Product, Warehouse
+from ..utils import get_stock_ledger_mode, recalculate_stock_for_product_warehouse
+from ..cache import bump_stock_generation
+from .alerts import evaluate_alerts
+
+_local = threading.local()
+
+
+def mark_stock_dirty(product_id, warehouse_id):
+    """
+    Queue a product/warehouse pair for a stock refresh and alert check.
+
+    Pairs touched in one transaction are collected into a single set and handled
+    once per pair by a transaction.on_commit hook, whichever code path (API,
+    admin, management command) did the writes. Outside a transaction the hook
+    runs straight away.
+    """
+    connection = transaction.get_connection()
+    pending = getattr(_local, "pending", None)
+
+    # A rolled back transaction or savepoint discards its hook, so only reuse
+    # the pending set while its hook is still registered
+    if (
+        pending is not None
+        and connection.in_atomic_block
+        and any(func is _local.callback for _, func, _ in connection.run_on_commit)
+    ):
+        pending.add((product_id, warehouse_id))
+        return
+
+    pairs = {(product_id, warehouse_id)}
+
+    def flush_dirty_stock():
+        if getattr(_local, "pending", None) is pairs:
+            _local.pending = None
+        refresh_stock_pairs(pairs)
+
+    _local.pending = pairs
+    _local.callback = flush_dirty_stock
+    transaction.on_commit(flush_dirty_stock)
+
+
+def refresh_stock_pairs(pairs, triggered_by="STOCK_MOVEMENT"):
+    """
+    Recompute stock (in aggregate ledger mode) for each (product_id, warehouse_id)
+    pair, evaluate alerts for the whole set in one pass and drop cached
+    inventory responses.
+    """
+    if not pairs:
+        return
+
+    if get_stock_ledger_mode() != "delta":
+        products = Product.objects.in_bulk({product_id for product_id, _ in pairs})
+        warehouses = Warehouse.objects.in_bulk(
+            {warehouse_id for _, warehouse_id in pairs}
+        )
+        for product_id, warehouse_id in pairs:
+            product = products.get(product_id)
+            warehouse = warehouses.get(warehouse_id)
+            if product is not None and warehouse is not None:
+                recalculate_stock_for_product_warehouse(product, warehouse)
+
+    evaluate_alerts(pairs, triggered_by=triggered_by)
+    # Already running after the commit, so no need to wait for another one
+    bump_stock_generation()
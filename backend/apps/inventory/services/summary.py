@@ -0,0 +1,111 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import timezone
+from central.models import Warehouse
+from ..cache import get_stock_generation
+from ..models import Stock, Batch, InventoryAlert
+from .alerts import UNRESOLVED_STATUSES
+
+DEFAULT_SUMMARY_CACHE_TTL = 30
+DEFAULT_EXPIRY_DAYS = 7
+
+
+def empty_counts():
+    return {
+        "stock_status": {value: 0 for value, _ in Stock.STATUS_CHOICES},
+        "alerts": {
+            alert_status: {value: 0 for value, _ in InventoryAlert.ALERT_TYPE_CHOICES}
+            for alert_status in UNRESOLVED_STATUSES
+        },
+        "expiring_batches": 0,
+        "expired_batches": 0,
+    }
+
+
+def add_counts(total, counts):
+    for value, count in counts["stock_status"].items():
+        total["stock_status"][value] += count
+    for alert_status, by_type in counts["alerts"].items():
+        for alert_type, count in by_type.items():
+            total["alerts"][alert_status][alert_type] += count
+    total["expiring_batches"] += counts["expiring_batches"]
+    total["expired_batches"] += counts["expired_batches"]
+
+
+def build_summary(warehouse_id=None, expiry_days=DEFAULT_EXPIRY_DAYS):
+    """
+    Dashboard counts per warehouse: stock rows per status, unresolved alerts
+    per status and type, and stocked batches expiring within expiry_days or
+    already expired. Each count comes from one GROUP BY query.
+    """
+    today = timezone.localdate()
+    warehouses = Warehouse.objects.order_by("name")
+    stocks = Stock.objects.order_by()
+    alerts = InventoryAlert.objects.filter(status__in=UNRESOLVED_STATUSES).order_by()
+    batches = Batch.objects.filter(
+        quantity__gt=0,
+        expiry_date__lte=today + timedelta(days=expiry_days),
+    ).order_by()
+    if warehouse_id is not None:
+        warehouses = warehouses.filter(id=warehouse_id)
+        stocks = stocks.filter(warehouse_id=warehouse_id)
+        alerts = alerts.filter(warehouse_id=warehouse_id)
+        batches = batches.filter(warehouse_id=warehouse_id)
+
+    rows = {
+        pk: {"warehouse": pk, "warehouse_name": name, **empty_counts()}
+        for pk, name in warehouses.values_list("id", "name")
+    }
+
+    for pk, stock_status, count in stocks.values_list(
+        "warehouse_id", "status"
+    ).annotate(count=Count("*")):
+        rows[pk]["stock_status"][stock_status] = count
+
+    for pk, alert_status, alert_type, count in alerts.values_list(
+        "warehouse_id", "status", "alert_type"
+    ).annotate(count=Count("*")):
+        rows[pk]["alerts"][alert_status][alert_type] = count
+
+    for pk, expiring, expired in (
+        batches.values_list("warehouse_id")
+        .annotate(
+            expiring=Count("id", filter=Q(expiry_date__gte=today)),
+            expired=Count("id", filter=Q(expiry_date__lt=today)),
+        )
+        .values_list("warehouse_id", "expiring", "expired")
+    ):
+        rows[pk]["expiring_batches"] = expiring
+        rows[pk]["expired_batches"] = expired
+
+    totals = empty_counts()
+    for row in rows.values():
+        add_counts(totals, row)
+
+    return {
+        "generated_at": timezone.now(),
+        "expiry_days": expiry_days,
+        "totals": totals,
+        "warehouses": list(rows.values()),
+    }
+
+
+def get_summary(warehouse_id=None, expiry_days=DEFAULT_EXPIRY_DAYS):
+    """
+    build_summary() cached for INVENTORY_SUMMARY_CACHE_TTL seconds, or until
+    the next stock, batch or alert write
+    """
+    key = (
+        f"inventory:summary:{get_stock_generation()}:"
+        f"{warehouse_id or 'all'}:{expiry_days}"
+    )
+    summary = cache.get(key)
+    if summary is None:
+        summary = build_summary(warehouse_id, expiry_days)
+        ttl = getattr(
+            settings, "INVENTORY_SUMMARY_CACHE_TTL", DEFAULT_SUMMARY_CACHE_TTL
+        )
+        cache.set(key, summary, timeout=ttl)
+    return summary
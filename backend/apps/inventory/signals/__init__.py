@@ -1,2 +1,3 @@
 from . import stock_update
-from . import stock_alerts
\ No newline at end of file
+from . import reorder_policy
+from . import cache_invalidation
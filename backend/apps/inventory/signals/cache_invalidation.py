@@ -0,0 +1,15 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..cache import invalidate_stock_caches
+from ..models import InventoryAlert
+
+
+@receiver(post_save, sender=InventoryAlert)
+@receiver(post_delete, sender=InventoryAlert)
+def alert_changed(sender, **kwargs):
+    """
+    Alert counts are part of the cached inventory summary and of the open_alerts
+    on cached company and warehouse responses, so acknowledging or resolving an
+    alert has to drop them too
+    """
+    invalidate_stock_caches()
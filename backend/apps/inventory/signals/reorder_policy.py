@@ -0,0 +1,11 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from ..models import ProductReorderPolicy
+from ..services.alerts import invalidate_policy_cache
+
+
+@receiver(post_save, sender=ProductReorderPolicy)
+@receiver(post_delete, sender=ProductReorderPolicy)
+def reset_policy_cache(sender, **kwargs):
+    """Reload active reorder policies after any policy change"""
+    invalidate_policy_cache()
@@ -4,38 +4,76 @@ from django.db import transaction
 from django.db.models import F
 from ..models import StockMovement, Stock, Batch
 from django.core.exceptions import ValidationError
-from ..utils import recalculate_stock_for_product_warehouse, get_current_batch_quantity
+from ..utils import (
+    decrement_batch_quantity,
+    get_stock_ledger_mode,
+    get_movement_delta,
+    apply_stock_delta,
+    reconcile_stock,
+)
+from ..services.stock_sync import mark_stock_dirty
+
+# In "delta" ledger mode the Stock row is adjusted in place as part of each write.
+# In "aggregate" mode the recount is left to the commit hook queued by
+# mark_stock_dirty, which also evaluates alerts for every product/warehouse touched.
+
+
+def deleted_directly(sender, origin):
+    """
+    True when a delete started at sender itself. Rows removed by a cascade from a
+    product, warehouse or batch delete must not touch stock, which is going away
+    or being recounted by the parent's own handler.
+    """
+    return getattr(origin, "model", type(origin)) is sender
 
 
 @receiver(post_save, sender=Batch)
 def update_stock_on_batch_create(sender, instance, created, **kwargs):
     """Update stock totals when batch is created or updated"""
-    recalculate_stock_for_product_warehouse(instance.product, instance.warehouse)
+    if get_stock_ledger_mode() == "delta":
+        if created:
+            apply_stock_delta(
+                instance.product_id, instance.warehouse_id, instance.quantity
+            )
+        else:
+            # The previous quantity is unknown here, so re-aggregate just this pair
+            reconcile_stock(
+                product_id=instance.product_id, warehouse_id=instance.warehouse_id
+            )
+
+    mark_stock_dirty(instance.product_id, instance.warehouse_id)
 
 
 @receiver(post_delete, sender=Batch)
-def update_stock_on_batch_delete(sender, instance, **kwargs):
+def update_stock_on_batch_delete(sender, instance, origin=None, **kwargs):
     """Update stock totals when batch is deleted"""
-    recalculate_stock_for_product_warehouse(instance.product, instance.warehouse)
+    if not deleted_directly(sender, origin):
+        return
+
+    if get_stock_ledger_mode() == "delta":
+        # The previous quantity may be stale, so re-aggregate just this pair
+        reconcile_stock(
+            product_id=instance.product_id, warehouse_id=instance.warehouse_id
+        )
+
+    mark_stock_dirty(instance.product_id, instance.warehouse_id)
 
 
 @receiver(pre_save, sender=StockMovement)
 def validate_stock_movement(sender, instance, **kwargs):
-    """Validate stock movement before saving"""
-    # For OUT movements, ensure sufficient stock using batch data
-    if instance.movement_type == "OUT":
-        current_quantity = get_current_batch_quantity(
-            instance.batch.product, instance.batch.warehouse
-        )
-
-        if current_quantity < instance.quantity:
-            raise ValidationError("Insufficient stock for this movement")
+    """Take stock out of the batch before saving, refusing to oversell"""
+    if not instance._state.adding:
+        return
 
-    # Validate batch has sufficient quantity for OUT movements
-    if instance.movement_type == "OUT" and instance.quantity > instance.batch.quantity:
-        raise ValidationError(
-            f"Movement quantity {instance.quantity} exceeds batch quantity {instance.batch.quantity}"
-        )
+    # OUT, RETURN and negative ADJUSTMENT movements are decremented here with a
+    # guarded UPDATE, so the check and the write cannot race each other
+    delta = get_movement_delta(instance.movement_type, instance.quantity)
+    if delta < 0:
+        if not decrement_batch_quantity(instance.batch_id, -delta):
+            raise ValidationError(
+                f"Insufficient stock in batch for movement quantity {instance.quantity}"
+            )
+        instance._batch_decremented = True
 
 
 @receiver(post_save, sender=StockMovement)
@@ -44,32 +82,29 @@ def update_stock_and_batch(sender, instance, created, **kwargs):
     if not created:
         return
 
-    with transaction.atomic():
-        # Update batch quantity for OUT movements
-        if instance.movement_type == "OUT" or instance.movement_type == "RETURN":
-            Batch.objects.filter(id=instance.batch.id).update(
-                quantity=F("quantity") - instance.quantity
-            )
+    delta = get_movement_delta(instance.movement_type, instance.quantity)
 
-        if instance.movement_type == "IN":
-            Batch.objects.filter(id=instance.batch.id).update(
-                quantity=F("quantity") + instance.quantity
+    with transaction.atomic():
+        # Decrements were already applied by validate_stock_movement
+        if not getattr(instance, "_batch_decremented", False):
+            Batch.objects.filter(id=instance.batch_id).update(
+                quantity=F("quantity") + delta
             )
 
-        if instance.movement_type == "ADJUSTMENT":
-            Batch.objects.filter(id=instance.batch.id).update(
-                quantity=F("quantity") + instance.quantity
+        if get_stock_ledger_mode() == "delta":
+            apply_stock_delta(
+                instance.batch.product_id, instance.batch.warehouse_id, delta
             )
 
-        # Recalculate stock totals
-        recalculate_stock_for_product_warehouse(
-            instance.batch.product, instance.batch.warehouse
-        )
+    mark_stock_dirty(instance.batch.product_id, instance.batch.warehouse_id)
 
 
 @receiver(post_delete, sender=StockMovement)
-def reverse_stock_movement(sender, instance, **kwargs):
+def reverse_stock_movement(sender, instance, origin=None, **kwargs):
     """Reverse stock changes when movement is deleted"""
+    if not deleted_directly(sender, origin):
+        return
+
     with transaction.atomic():
         # Check if batch still exists before updating
         try:
@@ -80,7 +115,10 @@ def reverse_stock_movement(sender, instance, **kwargs):
         except Batch.DoesNotExist:
             pass  # Batch was already deleted, skip reversal
 
-        # Recalculate stock totals
-        recalculate_stock_for_product_warehouse(
-            instance.batch.product, instance.batch.warehouse
-        )
+        if get_stock_ledger_mode() == "delta" and instance.movement_type == "OUT":
+            apply_stock_delta(
+                instance.batch.product_id, instance.batch.warehouse_id, instance.quantity
+            )
+
+    mark_stock_dirty(instance.batch.product_id, instance.batch.warehouse_id)
+
@@ -1,3 +1,1388 @@
-from django.test import TestCase
+import csv
+import io
+import json
+import msgpack
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, transaction, connection
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+from core.cache import get_generation
+from central.models import Company, Warehouse, Product
+from .models import (
+    Stock,
+    Batch,
+    StockMovement,
+    InventoryAlert,
+    ProductReorderPolicy,
+    StockSnapshot,
+)
+from .services.alerts import (
+    evaluate_alerts,
+    get_active_policies,
+    invalidate_policy_cache,
+    sweep_alerts,
+    _policy_cache,
+    POLICY_GENERATION,
+)
+from .services.expiry import check_expiring_batches
+from .services.snapshots import take_stock_snapshot
+from .services.partitions import (
+    PartitioningError,
+    add_months,
+    partition_name,
+    month_of_partition,
+    ensure_partitions,
+)
+from .utils import reconcile_stock
 
-# Create your tests here.
+User = get_user_model()
+
+stocks_url = "/inventory/stocks"
+movements_url = "/inventory/stock_movements"
+batches_url = "/inventory/batches"
+alerts_url = "/inventory/alerts"
+reorder_policies_url = "/reorder_policies"
+summary_url = "/inventory/summary"
+search_url = "/inventory/search"
+matrix_url = "/inventory/stocks/matrix"
+bulk_movements_url = "/inventory/stock_movements/bulk"
+allocate_url = "/inventory/stock_movements/allocate"
+export_movements_url = "/inventory/stock_movements/export"
+
+
+def count_app_queries(queries):
+    """Captured queries minus savepoints and the profiling queries made by silk"""
+    return len(
+        [
+            query
+            for query in queries
+            if "silk_" not in query["sql"]
+            and not query["sql"].startswith(("EXPLAIN", "SAVEPOINT", "RELEASE"))
+        ]
+    )
+
+
+class InventoryTestMixin:
+    """Shared catalog fixtures for inventory tests"""
+
+    def setUp(self):
+        self.company = Company.objects.create(name="Test Bakery")
+        self.warehouse = Warehouse.objects.create(
+            company=self.company, name="Main Store"
+        )
+        self.product = Product.objects.create(
+            name="Bread Flour",
+            company=self.company,
+            category="flour",
+            unit_of_measure="kg",
+        )
+
+    def authenticate(self, role="warehouse_staff"):
+        self.user = User.objects.create_user(
+            username="storeman",
+            email="storeman@example.com",
+            password="SecurePassword123!",
+            role=role,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def create_batch(self, quantity, expiry_date=None):
+        return Batch.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            quantity=quantity,
+            expiry_date=expiry_date,
+        )
+
+    def get_stock(self):
+        return Stock.objects.get(product=self.product, warehouse=self.warehouse)
+
+
+class StockLedgerTestCase(InventoryTestMixin, TestCase):
+    """Test the delta stock ledger"""
+
+    def test_batch_create_seeds_stock(self):
+        """Test that creating a batch adds its quantity to stock"""
+        self.create_batch(50)
+        self.create_batch(70)
+        stock = self.get_stock()
+        self.assertEqual(stock.quantity_on_hand, Decimal("120"))
+        self.assertEqual(stock.status, "FULL")
+
+    def test_movements_apply_delta_and_status(self):
+        """Test that movements update quantity and status in place"""
+        batch = self.create_batch(50)
+        StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=45)
+        stock = self.get_stock()
+        self.assertEqual(stock.quantity_on_hand, Decimal("5"))
+        self.assertEqual(stock.status, "ALMOST_OUT")
+
+        StockMovement.objects.create(batch=batch, movement_type="IN", quantity=100)
+        stock = self.get_stock()
+        self.assertEqual(stock.quantity_on_hand, Decimal("105"))
+        self.assertEqual(stock.status, "FULL")
+
+    def test_stock_row_kept_when_empty(self):
+        """Test that stock at zero stays as an EMPTY row"""
+        batch = self.create_batch(20)
+        StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=20)
+        stock = self.get_stock()
+        self.assertEqual(stock.quantity_on_hand, Decimal("0"))
+        self.assertEqual(stock.status, "EMPTY")
+
+    def test_reconcile_fixes_drift(self):
+        """Test that reconciliation rebuilds stock from batch totals"""
+        self.create_batch(30)
+        Stock.objects.filter(product=self.product).update(
+            quantity_on_hand=999, status="FULL"
+        )
+        result = reconcile_stock(warehouse_id=self.warehouse.id)
+        self.assertEqual(result["updated"], 1)
+        stock = self.get_stock()
+        self.assertEqual(stock.quantity_on_hand, Decimal("30"))
+        self.assertEqual(stock.status, "GOOD")
+
+    @override_settings(STOCK_LEDGER_MODE="aggregate")
+    def test_aggregate_mode_matches_delta(self):
+        """Test that the legacy aggregate mode yields the same totals"""
+        with self.captureOnCommitCallbacks(execute=True):
+            batch = self.create_batch(50)
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=10)
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("40"))
+
+
+class CommitCoalescingTestCase(InventoryTestMixin, TestCase):
+    """Test that stock refreshes and alert checks run once per pair on commit"""
+
+    def create_batch(self, quantity, expiry_date=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return super().create_batch(quantity, expiry_date)
+
+    def create_movements(self, batch, count):
+        with self.captureOnCommitCallbacks() as callbacks:
+            for _ in range(count):
+                StockMovement.objects.create(
+                    batch=batch, movement_type="OUT", quantity=1
+                )
+        return callbacks
+
+    def run_callbacks(self, callbacks):
+        with CaptureQueriesContext(connection) as queries:
+            for callback in callbacks:
+                callback()
+        return count_app_queries(queries)
+
+    def test_commit_work_is_constant_per_pair(self):
+        """Test that N movements on one pair queue one hook with constant queries"""
+        batch = self.create_batch(500)
+        single = self.create_movements(batch, 1)
+        self.assertEqual(len(single), 1)
+        single_queries = self.run_callbacks(single)
+
+        many = self.create_movements(batch, 25)
+        self.assertEqual(len(many), 1)
+        self.assertEqual(self.run_callbacks(many), single_queries)
+
+    @override_settings(STOCK_LEDGER_MODE="aggregate")
+    def test_aggregate_recount_is_constant_per_pair(self):
+        """Test that aggregate mode recounts stock once per pair at commit"""
+        batch = self.create_batch(500)
+        single = self.run_callbacks(self.create_movements(batch, 1))
+        many = self.run_callbacks(self.create_movements(batch, 25))
+        self.assertEqual(single, many)
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("474"))
+
+    def test_alert_raised_on_commit(self):
+        """Test that emptying a batch raises one out of stock alert at commit"""
+        batch = self.create_batch(2)
+        with self.captureOnCommitCallbacks(execute=True):
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=1)
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=1)
+        self.assertEqual(
+            InventoryAlert.objects.filter(
+                alert_type="OUT_OF_STOCK", status="OPEN"
+            ).count(),
+            1,
+        )
+
+
+class AlertEngineTestCase(InventoryTestMixin, TestCase):
+    """Test the batched stock alert evaluator"""
+
+    def setUp(self):
+        super().setUp()
+        invalidate_policy_cache()
+
+    def add_warehouses(self, prefix, count):
+        pairs = []
+        for i in range(count):
+            warehouse = Warehouse.objects.create(
+                company=self.company, name=f"{prefix} {i}"
+            )
+            Stock.objects.create(
+                product=self.product, warehouse=warehouse, quantity_on_hand=0
+            )
+            pairs.append((self.product.id, warehouse.id))
+        return pairs
+
+    def test_query_count_is_independent_of_pair_count(self):
+        """Test that evaluating many pairs costs the same queries as one"""
+        one_pair = self.add_warehouses("Depot", 1)
+        many_pairs = self.add_warehouses("Outlet", 20)
+        get_active_policies()
+        with CaptureQueriesContext(connection) as single:
+            evaluate_alerts(one_pair)
+        with CaptureQueriesContext(connection) as many:
+            evaluate_alerts(many_pairs)
+        self.assertEqual(count_app_queries(single), count_app_queries(many))
+        self.assertEqual(
+            InventoryAlert.objects.filter(alert_type="OUT_OF_STOCK").count(), 21
+        )
+
+    def test_low_stock_raised_and_resolved(self):
+        """Test that a policy raises low stock and replenishing resolves it"""
+        policy = ProductReorderPolicy.objects.create(
+            product=self.product, warehouse=self.warehouse, min_stock_level=20
+        )
+        batch = self.create_batch(15)
+        pair = [(self.product.id, self.warehouse.id)]
+
+        self.assertEqual(evaluate_alerts(pair), (1, 0))
+        alert = InventoryAlert.objects.get()
+        self.assertEqual(alert.alert_type, "LOW_STOCK")
+        self.assertEqual(alert.reorder_policy, policy)
+        self.assertEqual(evaluate_alerts(pair), (0, 0))
+
+        StockMovement.objects.create(batch=batch, movement_type="IN", quantity=50)
+        self.assertEqual(evaluate_alerts(pair), (0, 1))
+        alert.refresh_from_db()
+        self.assertEqual(alert.status, "RESOLVED")
+
+    def test_policy_change_invalidates_cache(self):
+        """Test that saving a policy is picked up by the next evaluation"""
+        self.create_batch(15)
+        pair = [(self.product.id, self.warehouse.id)]
+        self.assertEqual(evaluate_alerts(pair), (0, 0))
+
+        ProductReorderPolicy.objects.create(
+            product=self.product, warehouse=self.warehouse, min_stock_level=20
+        )
+        self.assertEqual(evaluate_alerts(pair), (1, 0))
+
+    def test_policy_cache_dropped_again_on_commit(self):
+        """Test that a policy set cached before the commit is not kept"""
+        pair = (self.product.id, self.warehouse.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProductReorderPolicy.objects.create(
+                product=self.product, warehouse=self.warehouse, min_stock_level=20
+            )
+            # A concurrent read of the pre-commit rows caches the old set
+            _policy_cache.update(
+                policies={},
+                loaded_at=time.monotonic(),
+                version=get_generation(POLICY_GENERATION),
+            )
+        self.assertIn(pair, get_active_policies())
+
+
+class AlertSweepTestCase(InventoryTestMixin, TestCase):
+    """Test the scheduled stock alert sweep"""
+
+    def setUp(self):
+        super().setUp()
+        self.create_batch(15)
+        self.policy = ProductReorderPolicy.objects.create(
+            product=self.product, warehouse=self.warehouse, min_stock_level=20
+        )
+
+    def test_sweep_raises_missing_alerts_once(self):
+        """Test that the sweep creates a missed low stock alert only once"""
+        result = sweep_alerts()
+        self.assertEqual((result["checked"], result["created"]), (1, 1))
+        alert = InventoryAlert.objects.get()
+        self.assertEqual(alert.alert_type, "LOW_STOCK")
+        self.assertEqual(alert.triggered_by, "SCHEDULED_CHECK")
+        self.assertEqual(alert.reorder_policy, self.policy)
+        self.assertEqual(sweep_alerts()["created"], 0)
+
+    def test_sweep_resolves_stale_alerts(self):
+        """Test that alerts are resolved once a policy no longer applies"""
+        sweep_alerts()
+        self.policy.min_stock_level = 10
+        self.policy.save()
+        self.assertEqual(sweep_alerts()["resolved"], 1)
+        self.assertEqual(InventoryAlert.objects.get().status, "RESOLVED")
+
+    def test_sweep_reads_in_one_query(self):
+        """Test that the sweep reads all stock rows with a single query"""
+        for i in range(5):
+            warehouse = Warehouse.objects.create(
+                company=self.company, name=f"Depot {i}"
+            )
+            Stock.objects.create(
+                product=self.product, warehouse=warehouse, quantity_on_hand=100
+            )
+        with CaptureQueriesContext(connection) as queries:
+            result = sweep_alerts()
+        self.assertEqual(result["checked"], 6)
+        # One read plus one bulk insert for the low stock alert
+        self.assertEqual(count_app_queries(queries), 2)
+
+
+def at(day, hour=12):
+    return timezone.make_aware(datetime(2025, 1, day, hour))
+
+
+class StockSnapshotTestCase(InventoryTestMixin, TestCase):
+    """Test stock snapshots and point-in-time stock queries"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        first = self.create_batch(100)
+        Batch.objects.filter(id=first.id).update(created_at=at(1, 9))
+        take_stock_snapshot(snapshot_date=date(2025, 1, 1))
+        StockSnapshot.objects.update(taken_at=at(1, 23))
+
+        self.move(first, "OUT", 30, at(2))
+        self.move(first, "IN", 50, at(5))
+        second = self.create_batch(20)
+        Batch.objects.filter(id=second.id).update(created_at=at(3))
+        self.move(second, "OUT", 5, at(4))
+
+    def move(self, batch, movement_type, quantity, created_at):
+        movement = StockMovement.objects.create(
+            batch=batch, movement_type=movement_type, quantity=quantity
+        )
+        StockMovement.objects.filter(id=movement.id).update(created_at=created_at)
+
+    def quantity_as_of(self, as_of):
+        response = self.client.get(stocks_url, {"as_of": as_of})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data["results"][0]["quantity_on_hand"]
+
+    def test_snapshot_copies_stock_rows(self):
+        """Test that a snapshot holds one row per stock row"""
+        snapshot = StockSnapshot.objects.get()
+        self.assertEqual(snapshot.quantity_on_hand, Decimal("100"))
+        self.assertEqual(take_stock_snapshot(snapshot_date=date(2025, 1, 1)), 1)
+        self.assertEqual(StockSnapshot.objects.count(), 1)
+
+    def test_as_of_replays_movements_since_snapshot(self):
+        """Test that as_of adds movements and new batches to the snapshot"""
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("135"))
+        self.assertEqual(self.quantity_as_of("2025-01-01"), "100.00")
+        self.assertEqual(self.quantity_as_of("2025-01-03"), "90.00")
+        self.assertEqual(self.quantity_as_of("2025-01-04"), "85.00")
+
+    def test_as_of_without_snapshot_replays_history(self):
+        """Test that as_of works from batch history when no snapshot exists"""
+        StockSnapshot.objects.all().delete()
+        self.assertEqual(self.quantity_as_of("2025-01-03"), "90.00")
+
+    def test_backfilled_snapshot_used_for_its_date(self):
+        """Test that a snapshot dated as_of but taken later is used and rolled back"""
+        take_stock_snapshot(snapshot_date=date(2025, 1, 3))
+        self.assertEqual(self.quantity_as_of("2025-01-03"), "90.00")
+        self.assertEqual(self.quantity_as_of("2025-01-04"), "85.00")
+
+        # The snapshot, not the movement history, is the starting point
+        StockSnapshot.objects.filter(snapshot_date=date(2025, 1, 3)).update(
+            quantity_on_hand=235
+        )
+        self.assertEqual(self.quantity_as_of("2025-01-03"), "190.00")
+        self.assertEqual(self.quantity_as_of("2025-01-01"), "100.00")
+
+    def test_invalid_as_of_rejected(self):
+        """Test that a malformed as_of date returns 400"""
+        response = self.client.get(stocks_url, {"as_of": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovementPartitionTestCase(InventoryTestMixin, TestCase):
+    """Test movement date filtering and partition helpers"""
+
+    def test_date_filters_include_whole_end_day(self):
+        """Test that end_date covers movements made later that day"""
+        self.authenticate()
+        batch = self.create_batch(100)
+        for day, hour in [(1, 8), (2, 23), (3, 0)]:
+            movement = StockMovement.objects.create(
+                batch=batch, movement_type="OUT", quantity=1
+            )
+            StockMovement.objects.filter(id=movement.id).update(
+                created_at=at(day, hour)
+            )
+
+        response = self.client.get(
+            movements_url, {"start_date": "2025-01-02", "end_date": "2025-01-02"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(movements_url, {"start_date": "02/01/2025"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_partition_names_round_trip(self):
+        """Test that partition names map back to their month"""
+        self.assertEqual(add_months(date(2025, 11, 1), 3), date(2026, 2, 1))
+        self.assertEqual(add_months(date(2025, 1, 1), -1), date(2024, 12, 1))
+        name = partition_name(date(2025, 3, 1))
+        self.assertEqual(month_of_partition(name), date(2025, 3, 1))
+        self.assertIsNone(month_of_partition(f"{StockMovement._meta.db_table}_default"))
+
+    def test_partitioning_requires_postgresql(self):
+        """Test that partition management refuses other databases"""
+        if connection.vendor == "postgresql":
+            self.skipTest("Runs on PostgreSQL")
+        with self.assertRaises(PartitioningError):
+            ensure_partitions()
+
+
+class KeysetPaginationTestCase(InventoryTestMixin, TestCase):
+    """Test cursor pagination on (created_at, id)"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        batch = self.create_batch(100)
+        for i in range(12):
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=1)
+        # Shared timestamps force the id tie-breaker
+        for i, movement in enumerate(StockMovement.objects.all()):
+            StockMovement.objects.filter(id=movement.id).update(
+                created_at=at(1 + i // 4)
+            )
+        self.expected = list(
+            StockMovement.objects.order_by("-created_at", "-id").values_list(
+                "id", flat=True
+            )
+        )
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", response.data)
+            ids.extend(row["id"] for row in response.data["results"])
+            url = response.data["next"]
+        return ids
+
+    def test_cursor_pages_cover_every_row_once(self):
+        """Test that following next links returns every movement in order"""
+        ids = self.walk(f"{movements_url}?pagination=cursor&page_size=5")
+        self.assertEqual([str(pk) for pk in ids], [str(pk) for pk in self.expected])
+
+    def test_previous_link_returns_prior_page(self):
+        """Test that the previous cursor walks back to the first page"""
+        first = self.client.get(movements_url, {"pagination": "cursor", "page_size": 5})
+        second = self.client.get(first.data["next"])
+        back = self.client.get(second.data["previous"])
+        self.assertEqual(back.data["results"], first.data["results"])
+        self.assertIsNone(back.data["previous"])
+
+    def test_ascending_order_and_filters(self):
+        """Test that cursor pages follow created_at ordering and filters"""
+        ids = self.walk(
+            f"{movements_url}?pagination=cursor&page_size=5&ordering=created_at"
+            f"&start_date=2025-01-02"
+        )
+        self.assertEqual(
+            [str(pk) for pk in ids],
+            [str(pk) for pk in reversed(self.expected[:8])],
+        )
+
+    def test_cursor_filter_bounds_created_at(self):
+        """Test that the cursor filter carries a plain created_at range bound"""
+        first = self.client.get(movements_url, {"pagination": "cursor", "page_size": 5})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(first.data["next"])
+        page_sql = [
+            query["sql"]
+            for query in queries.captured_queries
+            if '"inventory_stockmovement"."id" <' in query["sql"]
+        ]
+        self.assertTrue(page_sql)
+        for sql in page_sql:
+            self.assertIn('"inventory_stockmovement"."created_at" <=', sql)
+
+    def test_page_numbers_stay_default(self):
+        """Test that requests without a cursor keep page number responses"""
+        response = self.client.get(movements_url)
+        self.assertEqual(response.data["count"], 12)
+
+    def test_unsupported_ordering_rejected(self):
+        """Test that ordering on other fields is refused in cursor mode"""
+        response = self.client.get(
+            movements_url, {"pagination": "cursor", "ordering": "quantity"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ExpandTestCase(InventoryTestMixin, TestCase):
+    """Test ?expand= nested summaries and their query cost"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        for i in range(5):
+            warehouse = Warehouse.objects.create(
+                company=self.company, name=f"Outlet {i}"
+            )
+            batch = Batch.objects.create(
+                product=self.product, warehouse=warehouse, quantity=50
+            )
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=1)
+            ProductReorderPolicy.objects.create(
+                product=self.product, warehouse=warehouse, min_stock_level=60
+            )
+            InventoryAlert.objects.create(
+                product=self.product,
+                warehouse=warehouse,
+                alert_type="LOW_STOCK",
+                current_quantity=49,
+                triggered_by="STOCK_MOVEMENT",
+            )
+
+    def count_queries(self, url, expand, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {"expand": expand, "page_size": page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return count_app_queries(queries), response.data["results"]
+
+    def assert_constant_queries(self, url, expand):
+        single, _ = self.count_queries(url, expand, 1)
+        many, results = self.count_queries(url, expand, 5)
+        self.assertEqual(len(results), 5)
+        self.assertEqual(single, many)
+        return results
+
+    def test_stocks_expand(self):
+        """Test that expanded stocks cost constant queries"""
+        results = self.assert_constant_queries(stocks_url, "product,warehouse")
+        self.assertEqual(results[0]["product"]["name"], "Bread Flour")
+        self.assertIn("name", results[0]["warehouse"])
+
+    def test_batches_expand(self):
+        """Test that expanded batches cost constant queries"""
+        results = self.assert_constant_queries(batches_url, "product,warehouse")
+        self.assertEqual(results[0]["product"]["sku"], self.product.sku)
+
+    def test_movements_expand(self):
+        """Test that expanded movements cost constant queries"""
+        results = self.assert_constant_queries(
+            movements_url, "batch,product,warehouse"
+        )
+        self.assertIn("batch_number", results[0]["batch"])
+        self.assertEqual(results[0]["product"]["name"], "Bread Flour")
+
+    def test_alerts_expand(self):
+        """Test that expanded alerts cost constant queries"""
+        self.assert_constant_queries(alerts_url, "product,warehouse")
+
+    def test_reorder_policies_expand(self):
+        """Test that expanded reorder policies cost constant queries"""
+        self.assert_constant_queries(reorder_policies_url, "product,warehouse")
+
+    def count_action_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return count_app_queries(queries), response.data
+
+    def test_by_product_sku_expand(self):
+        """Test that by_product_sku joins expanded relations like the list does"""
+        other = Product.objects.create(
+            name="Rye Flour", company=self.company, category="flour"
+        )
+        Batch.objects.create(product=other, warehouse=self.warehouse, quantity=5)
+        url = f"{stocks_url}/by_product_sku"
+        single, _ = self.count_action_queries(
+            url, {"sku": other.sku, "expand": "product,warehouse"}
+        )
+        many, results = self.count_action_queries(
+            url, {"sku": self.product.sku, "expand": "product,warehouse"}
+        )
+        self.assertEqual(len(results), 5)
+        self.assertEqual(single, many)
+        self.assertEqual(results[0]["product"]["name"], "Bread Flour")
+
+    def test_expand_with_narrowing_fieldset(self):
+        """Test that ?expand= combines with ?fields= / ?omit= that drop it"""
+        cases = [
+            (stocks_url, ["product", "warehouse"]),
+            (batches_url, ["product", "warehouse"]),
+            (movements_url, ["batch", "product", "warehouse"]),
+            (alerts_url, ["product", "warehouse"]),
+            (reorder_policies_url, ["product", "warehouse"]),
+        ]
+        for url, expandable in cases:
+            for name in expandable:
+                for params in ({"fields": "id"}, {"omit": name}):
+                    with self.subTest(url=url, expand=name, **params):
+                        response = self.client.get(url, {"expand": name, **params})
+                        self.assertEqual(response.status_code, status.HTTP_200_OK)
+                        row = response.data["results"][0]
+                        self.assertNotIn(name, row)
+                        self.assertIn("id", row)
+
+    def test_unknown_expand_rejected(self):
+        """Test that unknown relations are rejected with 400"""
+        response = self.client.get(stocks_url, {"expand": "batch"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ids_returned_without_expand(self):
+        """Test that plain requests keep returning FK ids"""
+        response = self.client.get(stocks_url)
+        self.assertEqual(response.data["results"][0]["product"], self.product.id)
+
+
+class AlertQueueTestCase(InventoryTestMixin, TestCase):
+    """Test the paginated alert queue endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.other = Warehouse.objects.create(company=self.company, name="Outlet")
+        for warehouse, alert_type, alert_status in [
+            (self.warehouse, "LOW_STOCK", "OPEN"),
+            (self.warehouse, "LOW_STOCK", "RESOLVED"),
+            (self.other, "LOW_STOCK", "OPEN"),
+            (self.other, "EXPIRY", "ACKNOWLEDGED"),
+        ]:
+            InventoryAlert.objects.create(
+                product=self.product,
+                warehouse=warehouse,
+                alert_type=alert_type,
+                status=alert_status,
+                current_quantity=5,
+                triggered_by="SCHEDULED_CHECK",
+            )
+
+    def test_queues_are_paginated(self):
+        """Test that queue actions return pages instead of the whole table"""
+        response = self.client.get(f"{alerts_url}/low_stock", {"page_size": 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 3)
+        self.assertEqual(len(response.data["results"]), 2)
+
+    def test_queues_filter_by_warehouse_and_status(self):
+        """Test that queue actions honour warehouse_id and status"""
+        response = self.client.get(
+            f"{alerts_url}/low_stock",
+            {"warehouse_id": str(self.warehouse.id), "status": "OPEN"},
+        )
+        self.assertEqual(response.data["count"], 1)
+
+        response = self.client.get(
+            f"{alerts_url}/open", {"warehouse_id": str(self.other.id)}
+        )
+        self.assertEqual(response.data["count"], 1)
+        self.assertEqual(response.data["results"][0]["alert_type"], "LOW_STOCK")
+
+        response = self.client.get(f"{alerts_url}/acknowledged")
+        self.assertEqual(response.data["count"], 1)
+
+
+class InventorySummaryTestCase(InventoryTestMixin, TestCase):
+    """Test the cached dashboard summary"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authenticate()
+        # Run the commit hooks now so later writes queue hooks of their own
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch = self.create_batch(5, expiry_date=timezone.localdate())
+            Batch.objects.create(
+                product=self.product,
+                warehouse=self.warehouse,
+                quantity=1,
+                expiry_date=date(2020, 1, 1),
+            )
+        InventoryAlert.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            alert_type="LOW_STOCK",
+            current_quantity=5,
+            triggered_by="STOCK_MOVEMENT",
+        )
+
+    def get_summary(self, **params):
+        response = self.client.get(summary_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_grouped_by_warehouse(self):
+        """Test that the summary counts stock, alerts and expiry per warehouse"""
+        Warehouse.objects.create(company=self.company, name="Empty Depot")
+        summary = self.get_summary()
+        self.assertEqual(len(summary["warehouses"]), 2)
+        row = next(
+            row for row in summary["warehouses"] if row["warehouse"] == self.warehouse.id
+        )
+        self.assertEqual(row["stock_status"]["ALMOST_OUT"], 1)
+        self.assertEqual(row["alerts"]["OPEN"]["LOW_STOCK"], 1)
+        self.assertEqual(row["expiring_batches"], 1)
+        self.assertEqual(row["expired_batches"], 1)
+        self.assertEqual(summary["totals"]["alerts"]["OPEN"]["LOW_STOCK"], 1)
+
+    def test_summary_is_cached(self):
+        """Test that a repeated summary is served without queries"""
+        self.get_summary()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_summary()
+        self.assertEqual(count_app_queries(queries), 0)
+
+    def test_writes_invalidate_summary(self):
+        """Test that movements and alert changes refresh the summary"""
+        self.get_summary()
+        with self.captureOnCommitCallbacks(execute=True):
+            StockMovement.objects.create(
+                batch=self.batch, movement_type="IN", quantity=50
+            )
+        summary = self.get_summary()
+        self.assertEqual(summary["totals"]["stock_status"]["GOOD"], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            InventoryAlert.objects.update(status="ACKNOWLEDGED")
+            InventoryAlert.objects.get().save()
+        summary = self.get_summary()
+        self.assertEqual(summary["totals"]["alerts"]["ACKNOWLEDGED"]["LOW_STOCK"], 1)
+
+    def test_resolve_action_refreshes_summary(self):
+        """Test that an alert resolved through the API leaves the cached summary"""
+        alert = InventoryAlert.objects.get()
+        self.assertEqual(self.get_summary()["totals"]["alerts"]["OPEN"]["LOW_STOCK"], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(f"{alerts_url}/{alert.id}/resolve")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        alerts = self.get_summary()["totals"]["alerts"]
+        self.assertEqual(alerts["OPEN"]["LOW_STOCK"], 0)
+        self.assertEqual(alerts["ACKNOWLEDGED"]["LOW_STOCK"], 0)
+
+    def test_invalid_parameters_rejected(self):
+        """Test that malformed filters return 400"""
+        response = self.client.get(summary_url, {"warehouse_id": "main"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(INVENTORY_EXPIRY_HORIZON_DAYS={"default": 7, "Pastries": 1})
+class ExpiryScanTestCase(InventoryTestMixin, TestCase):
+    """Test the expiring batch scanner"""
+
+    def setUp(self):
+        super().setUp()
+        self.today = date(2030, 6, 1)
+        self.pastry = Product.objects.create(
+            name="Croissant",
+            company=self.company,
+            category="pastries",
+            unit_of_measure="pcs",
+        )
+
+    def expire_in(self, days, product=None, quantity=10):
+        return Batch.objects.create(
+            product=product or self.product,
+            warehouse=self.warehouse,
+            quantity=quantity,
+            expiry_date=self.today + timedelta(days=days),
+        )
+
+    def test_horizon_depends_on_category(self):
+        """Test that each category uses its own expiry horizon"""
+        self.expire_in(5)
+        self.expire_in(3, product=self.pastry)
+        self.assertEqual(check_expiring_batches(today=self.today), 1)
+        self.assertEqual(InventoryAlert.objects.get().product, self.product)
+
+        self.expire_in(1, product=self.pastry)
+        self.assertEqual(check_expiring_batches(today=self.today), 1)
+
+    def test_one_alert_per_pair_and_no_duplicates(self):
+        """Test that an open expiry alert suppresses new ones for the pair"""
+        self.expire_in(6)
+        earliest = self.expire_in(2)
+        self.assertEqual(check_expiring_batches(today=self.today), 1)
+        self.assertIn(earliest.batch_number, InventoryAlert.objects.get().message)
+        self.assertEqual(check_expiring_batches(today=self.today), 0)
+
+    def test_expired_and_empty_batches_ignored(self):
+        """Test that past and empty batches do not raise alerts"""
+        self.expire_in(-1)
+        self.expire_in(2, quantity=0)
+        self.assertEqual(check_expiring_batches(today=self.today), 0)
+
+
+class GuardedDecrementTestCase(InventoryTestMixin, TestCase):
+    """Test that decrementing movements cannot oversell a batch"""
+
+    def test_out_beyond_batch_is_rejected(self):
+        """Test that an OUT larger than the batch fails and changes nothing"""
+        batch = self.create_batch(10)
+        with self.assertRaises(ValidationError):
+            StockMovement.objects.create(batch=batch, movement_type="OUT", quantity=11)
+        batch.refresh_from_db()
+        self.assertEqual(batch.quantity, Decimal("10"))
+        self.assertEqual(StockMovement.objects.count(), 0)
+
+    def test_negative_adjustment_is_guarded(self):
+        """Test that a negative adjustment cannot take a batch below zero"""
+        batch = self.create_batch(5)
+        with self.assertRaises(ValidationError):
+            StockMovement.objects.create(
+                batch=batch, movement_type="ADJUSTMENT", quantity=-6
+            )
+        StockMovement.objects.create(batch=batch, movement_type="RETURN", quantity=5)
+        batch.refresh_from_db()
+        self.assertEqual(batch.quantity, Decimal("0"))
+
+    def test_api_oversell_returns_400(self):
+        """Test that oversells through the API are rejected with 400, not 500"""
+        self.authenticate()
+        batch = self.create_batch(10)
+        for movement_type, quantity in (
+            ("OUT", "11"),
+            ("RETURN", "11"),
+            ("ADJUSTMENT", "-11"),
+        ):
+            with self.subTest(movement_type=movement_type):
+                response = self.client.post(
+                    movements_url,
+                    {
+                        "batch": str(batch.id),
+                        "movement_type": movement_type,
+                        "quantity": quantity,
+                    },
+                    format="json",
+                )
+                self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+                self.assertIn("quantity", response.data)
+
+        response = self.client.post(
+            bulk_movements_url,
+            {
+                "movements": [
+                    {"batch": str(batch.id), "movement_type": "RETURN", "quantity": "11"}
+                ]
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        batch.refresh_from_db()
+        self.assertEqual(batch.quantity, Decimal("10"))
+        self.assertEqual(StockMovement.objects.count(), 0)
+
+    def test_check_constraint_blocks_negative_batch(self):
+        """Test that the database refuses negative batch quantities"""
+        batch = self.create_batch(5)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Batch.objects.filter(id=batch.id).update(quantity=-1)
+
+
+class BulkStockMovementTestCase(InventoryTestMixin, TestCase):
+    """Test bulk stock movement ingestion"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.batch_a = self.create_batch(50)
+        self.batch_b = self.create_batch(30)
+
+    def test_bulk_create_applies_all_rows(self):
+        """Test that a valid upload creates every movement and updates totals"""
+        payload = {
+            "movements": [
+                {
+                    "batch": str(self.batch_a.id),
+                    "movement_type": "OUT",
+                    "quantity": "20",
+                },
+                {
+                    "batch": str(self.batch_a.id),
+                    "movement_type": "OUT",
+                    "quantity": "25",
+                },
+                {
+                    "batch": str(self.batch_b.id),
+                    "movement_type": "IN",
+                    "quantity": "10",
+                },
+            ]
+        }
+        response = self.client.post(bulk_movements_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 3)
+        self.assertEqual(StockMovement.objects.count(), 3)
+
+        self.batch_a.refresh_from_db()
+        self.batch_b.refresh_from_db()
+        self.assertEqual(self.batch_a.quantity, Decimal("5"))
+        self.assertEqual(self.batch_b.quantity, Decimal("40"))
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("45"))
+
+    def test_all_or_nothing_rejects_whole_upload(self):
+        """Test that one failing row blocks the whole upload by default"""
+        payload = {
+            "movements": [
+                {
+                    "batch": str(self.batch_a.id),
+                    "movement_type": "OUT",
+                    "quantity": "40",
+                },
+                {
+                    "batch": str(self.batch_a.id),
+                    "movement_type": "OUT",
+                    "quantity": "40",
+                },
+            ]
+        }
+        response = self.client.post(bulk_movements_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertEqual(response.data["results"][0]["index"], 1)
+        self.assertIn("quantity", response.data["results"][0]["errors"])
+        self.assertEqual(StockMovement.objects.count(), 0)
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("80"))
+
+    def test_best_effort_keeps_valid_rows(self):
+        """Test that best effort mode writes the valid rows and reports the rest"""
+        payload = {
+            "mode": "best_effort",
+            "movements": [
+                {
+                    "batch": str(self.batch_a.id),
+                    "movement_type": "OUT",
+                    "quantity": "50",
+                },
+                {
+                    "batch": str(self.batch_b.id),
+                    "movement_type": "BOGUS",
+                    "quantity": "1",
+                },
+            ],
+        }
+        response = self.client.post(bulk_movements_url, payload, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(response.data["failed"], 1)
+        self.assertIn("movement_type", response.data["results"][1]["errors"])
+        self.assertFalse(
+            InventoryAlert.objects.filter(alert_type="OUT_OF_STOCK").exists()
+        )
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("30"))
+
+
+class FefoAllocationTestCase(InventoryTestMixin, TestCase):
+    """Test first-expired-first-out allocation"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.late = self.create_batch(40, expiry_date=date(2030, 3, 1))
+        self.undated = self.create_batch(40)
+        self.early = self.create_batch(10, expiry_date=date(2030, 1, 1))
+
+    def allocate(self, quantity):
+        return self.client.post(
+            allocate_url,
+            {
+                "product": str(self.product.id),
+                "warehouse": str(self.warehouse.id),
+                "quantity": quantity,
+                "reference_number": "PICK-1",
+            },
+            format="json",
+        )
+
+    def test_allocation_consumes_earliest_expiry_first(self):
+        """Test that allocation splits across batches in expiry order"""
+        response = self.allocate("30")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        allocations = response.data["allocations"]
+        self.assertEqual(
+            [a["batch"] for a in allocations], [self.early.id, self.late.id]
+        )
+        self.assertEqual(
+            [a["quantity"] for a in allocations], [Decimal("10"), Decimal("20")]
+        )
+
+        self.early.refresh_from_db()
+        self.late.refresh_from_db()
+        self.assertEqual(self.early.quantity, Decimal("0"))
+        self.assertEqual(self.late.quantity, Decimal("20"))
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("60"))
+        self.assertEqual(
+            StockMovement.objects.filter(reference_number="PICK-1").count(), 2
+        )
+
+    def test_allocation_uses_undated_batches_last(self):
+        """Test that batches without an expiry date are consumed last"""
+        response = self.allocate("60")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["allocations"][-1]["batch"], self.undated.id)
+
+    def test_insufficient_stock_writes_nothing(self):
+        """Test that allocating more than the warehouse holds fails cleanly"""
+        response = self.allocate("91")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(StockMovement.objects.count(), 0)
+        self.assertEqual(self.get_stock().quantity_on_hand, Decimal("90"))
+
+
+class InventorySearchTestCase(InventoryTestMixin, TestCase):
+    """Test the global inventory search"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        Product.objects.create(
+            name="Flour Sifter", company=self.company, category="equipment"
+        )
+        self.batch = Batch.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            quantity=10,
+            batch_number="FLOUR-2025-01",
+        )
+        StockMovement.objects.create(
+            batch=self.batch,
+            movement_type="OUT",
+            quantity=1,
+            reference_number="SO-FLOUR-77",
+        )
+
+    def search(self, **params):
+        return self.client.get(search_url, params)
+
+    def test_hits_are_typed_across_models(self):
+        """Test that one query finds products, batches and movements"""
+        response = self.search(q="flour")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        types = {result["type"] for result in response.data["results"]}
+        self.assertEqual(types, {"product", "batch", "movement"})
+        batch = next(r for r in response.data["results"] if r["type"] == "batch")
+        self.assertEqual(batch["id"], self.batch.id)
+        self.assertEqual(batch["detail"]["warehouse"], "Main Store")
+
+    def test_exact_match_ranks_first(self):
+        """Test that an exact match outranks partial matches"""
+        response = self.search(q="bread flour", types="product")
+        results = response.data["results"]
+        self.assertEqual(results[0]["id"], self.product.id)
+
+        response = self.search(q="Flour Sifter", types="product,batch")
+        self.assertEqual(response.data["results"][0]["label"], "Flour Sifter")
+
+    def test_invalid_parameters_rejected(self):
+        """Test that short queries, unknown types and bad limits are rejected"""
+        for params in (
+            {"q": "f"},
+            {"q": "flour", "types": "invoice"},
+            {"q": "flour", "limit": "500"},
+        ):
+            response = self.search(**params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MovementExportTestCase(InventoryTestMixin, TestCase):
+    """Test the streaming stock movement export"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.batch = self.create_batch(100)
+        for quantity, movement_type in ((5, "OUT"), (10, "IN"), (3, "OUT")):
+            StockMovement.objects.create(
+                batch=self.batch,
+                movement_type=movement_type,
+                quantity=quantity,
+                reference_number=f"REF-{quantity}",
+            )
+
+    def export(self, **params):
+        response = self.client.get(export_movements_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv_export_joins_related_columns(self):
+        """Test that the CSV export has a header and joined batch/product/warehouse columns"""
+        rows = list(csv.DictReader(io.StringIO(self.export())))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            [row["reference_number"] for row in rows], ["REF-5", "REF-10", "REF-3"]
+        )
+        self.assertEqual(rows[0]["batch_number"], self.batch.batch_number)
+        self.assertEqual(rows[0]["product_name"], "Bread Flour")
+        self.assertEqual(rows[0]["warehouse_name"], "Main Store")
+
+    def test_ndjson_export_applies_filters(self):
+        """Test that the export takes the same filters as the movement list"""
+        lines = self.export(file_format="ndjson", movement_type="OUT").splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record["quantity"] for record in records], ["5.00", "3.00"])
+
+    def test_export_is_one_query(self):
+        """Test that the export reads every row in a single query"""
+        with CaptureQueriesContext(connection) as queries:
+            self.export()
+        self.assertEqual(count_app_queries(queries.captured_queries), 1)
+
+    def test_unknown_format_rejected(self):
+        """Test that an unknown export format is rejected"""
+        response = self.client.get(export_movements_url, {"file_format": "xlsx"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class StockMatrixTestCase(InventoryTestMixin, TestCase):
+    """Test the product x warehouse stock matrix"""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.authenticate()
+        self.depot = Warehouse.objects.create(company=self.company, name="Depot")
+        self.sugar = Product.objects.create(
+            name="Sugar", company=self.company, category="sweeteners"
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch = self.create_batch(40)
+            Batch.objects.create(product=self.sugar, warehouse=self.depot, quantity=7)
+
+    def get_matrix(self, **params):
+        response = self.client.get(matrix_url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_sparse_matrix(self):
+        """Test that the sparse layout lists non-empty cells by index"""
+        matrix = self.get_matrix()
+        self.assertEqual(matrix["products"]["name"], ["Bread Flour", "Sugar"])
+        self.assertEqual(matrix["warehouses"]["name"], ["Main Store", "Depot"])
+        self.assertEqual(
+            matrix["cells"],
+            {"product": [0, 1], "warehouse": [0, 1], "quantity": [40, 7]},
+        )
+
+    def test_dense_matrix_with_category_filter(self):
+        """Test that the dense layout fills missing cells and filters by category"""
+        matrix = self.get_matrix(layout="dense")
+        self.assertEqual(matrix["quantities"], [[40, 0], [0, 7]])
+
+        matrix = self.get_matrix(layout="dense", category="Sweeteners")
+        self.assertEqual(matrix["products"]["id"], [self.sugar.id])
+        self.assertEqual(matrix["quantities"], [[7]])
+
+    def test_matrix_cached_until_stock_changes(self):
+        """Test that the matrix is cached and rebuilt after a movement"""
+        self.get_matrix()
+        with CaptureQueriesContext(connection) as queries:
+            self.get_matrix()
+        self.assertEqual(count_app_queries(queries.captured_queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            StockMovement.objects.create(
+                batch=self.batch, movement_type="OUT", quantity=15
+            )
+        self.assertEqual(self.get_matrix()["cells"]["quantity"], [25, 7])
+
+    def test_invalid_parameters_rejected(self):
+        """Test that a malformed company_id or unknown layout is rejected"""
+        for params in ({"company_id": "nope"}, {"layout": "cube"}):
+            response = self.client.get(matrix_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ConditionalGetTestCase(InventoryTestMixin, TestCase):
+    """Test ETag / Last-Modified on the stock and alert lists"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.batch = self.create_batch(40)
+        self.alert = InventoryAlert.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            alert_type="LOW_STOCK",
+            current_quantity=40,
+            triggered_by="STOCK_MOVEMENT",
+        )
+
+    def poll(self, url, etag):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        return response, count_app_queries(queries.captured_queries)
+
+    def test_unchanged_polls_return_304(self):
+        """Test that stock and alert polls with a current ETag get 304 after one query"""
+        for url in (stocks_url, alerts_url, f"{alerts_url}/low_stock"):
+            etag = self.client.get(url)["ETag"]
+            response, queries = self.poll(url, etag)
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response["ETag"], etag)
+            self.assertEqual(queries, 1)
+
+    def test_stock_change_invalidates_etag(self):
+        """Test that a movement changes the stock list ETag"""
+        etag = self.client.get(stocks_url)["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            StockMovement.objects.create(
+                batch=self.batch, movement_type="OUT", quantity=5
+            )
+        response, _ = self.poll(stocks_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_alert_status_change_invalidates_etag(self):
+        """Test that acknowledging an alert changes the alert list ETag"""
+        etag = self.client.get(alerts_url)["ETag"]
+        self.alert.status = "ACKNOWLEDGED"
+        self.alert.acknowledged_at = timezone.now()
+        self.alert.save()
+        response, _ = self.poll(alerts_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_expanded_rename_invalidates_etag(self):
+        """Test that renaming an expanded product or warehouse changes the ETag"""
+        for url in (stocks_url, alerts_url):
+            url = f"{url}?expand=product,warehouse"
+            for row in (self.product, self.warehouse):
+                with self.subTest(url=url, model=type(row).__name__):
+                    etag = self.client.get(url)["ETag"]
+                    row.name = f"{row.name} (renamed)"
+                    row.save()
+                    response, _ = self.poll(url, etag)
+                    self.assertEqual(response.status_code, status.HTTP_200_OK)
+                    self.assertEqual(
+                        response.data["results"][0][row._meta.model_name]["name"],
+                        row.name,
+                    )
+
+    def test_delete_invalidates_conditional_get(self):
+        """Test that deleting a row defeats both ETag and If-Modified-Since"""
+        InventoryAlert.objects.create(
+            product=self.product,
+            warehouse=self.warehouse,
+            alert_type="OUT_OF_STOCK",
+            current_quantity=0,
+            triggered_by="STOCK_MOVEMENT",
+        )
+        response = self.client.get(alerts_url)
+        etag, last_modified = response["ETag"], response["Last-Modified"]
+        self.alert.delete()
+
+        response, _ = self.poll(alerts_url, etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(alerts_url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["count"], 1)
+
+
+class SparseFieldsetTestCase(InventoryTestMixin, TestCase):
+    """Test ?fields= / ?omit= on inventory endpoints"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.batch = self.create_batch(40)
+        StockMovement.objects.create(
+            batch=self.batch, movement_type="OUT", quantity=5, reference_number="A1"
+        )
+
+    def get_with_queries(self, url, params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        sql = [
+            query["sql"]
+            for query in queries.captured_queries
+            if "silk_" not in query["sql"]
+            and not query["sql"].startswith(("EXPLAIN", "SAVEPOINT", "RELEASE"))
+        ]
+        return response, sql
+
+    def test_fields_narrow_payload_and_columns(self):
+        """Test that ?fields= limits both the payload and the selected columns"""
+        response, sql = self.get_with_queries(
+            stocks_url, {"fields": "id,quantity_on_hand,status"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        row = response.data["results"][0]
+        self.assertEqual(set(row), {"id", "quantity_on_hand", "status"})
+        select = sql[-1]
+        self.assertIn("quantity_on_hand", select)
+        self.assertNotIn("last_updated", select.split("FROM")[0])
+
+    def test_omit_drops_fields(self):
+        """Test that ?omit= removes the named fields"""
+        response = self.client.get(movements_url, {"omit": "notes,created_at"})
+        row = response.data["results"][0]
+        self.assertNotIn("notes", row)
+        self.assertNotIn("created_at", row)
+        self.assertIn("reference_number", row)
+
+    def test_fields_with_expansion(self):
+        """Test that selected expanded summaries are joined in the same query"""
+        response, sql = self.get_with_queries(
+            movements_url, {"fields": "id,product", "expand": "product"}
+        )
+        row = response.data["results"][0]
+        self.assertEqual(set(row), {"id", "product"})
+        self.assertEqual(row["product"]["name"], "Bread Flour")
+        self.assertEqual(len(sql), 2)  # count + page
+
+    def test_unknown_fields_rejected(self):
+        """Test that unknown field names are rejected"""
+        for params in ({"fields": "id,colour"}, {"omit": "colour"}):
+            response = self.client.get(stocks_url, params)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class RendererTestCase(InventoryTestMixin, TestCase):
+    """Test the orjson and MessagePack formats"""
+
+    def setUp(self):
+        super().setUp()
+        self.authenticate()
+        self.batch = self.create_batch(40)
+
+    def test_json_is_default(self):
+        """Test that JSON responses are rendered and parse back"""
+        response = self.client.get(stocks_url)
+        self.assertEqual(response["Content-Type"], "application/json")
+        row = json.loads(response.content)["results"][0]
+        self.assertEqual(row["product"], str(self.product.id))
+        self.assertEqual(row["quantity_on_hand"], "40.00")
+
+    def test_msgpack_response(self):
+        """Test that Accept: application/msgpack gets MessagePack"""
+        response = self.client.get(stocks_url, HTTP_ACCEPT="application/msgpack")
+        self.assertEqual(response["Content-Type"], "application/msgpack")
+        row = msgpack.unpackb(response.content)["results"][0]
+        self.assertEqual(row["warehouse"], str(self.warehouse.id))
+
+    def test_msgpack_request_body(self):
+        """Test that movements can be posted as MessagePack"""
+        body = msgpack.packb(
+            {"batch": str(self.batch.id), "movement_type": "OUT", "quantity": "5"}
+        )
+        response = self.client.post(
+            movements_url, body, content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(StockMovement.objects.get().quantity, Decimal("5"))
+
+        response = self.client.post(
+            movements_url, b"\xc1", content_type="application/msgpack"
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
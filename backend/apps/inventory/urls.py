@@ -4,6 +4,8 @@ from .views.stock_views import StockViewSet
 from .views.stock_movement_views import StockMovementViewSet
 from .views.batch_views import BatchViewSet
 from .views.stock_alerts_views import InventoryAlertViewSet, ProductReorderPolicyViewSet
+from .views.summary_views import InventorySummaryView
+from .views.search_views import InventorySearchView
 
 router = DefaultRouter(trailing_slash=False)
 router.register(r"stocks", StockViewSet, basename="stock")
@@ -13,5 +15,7 @@ router.register(r"alerts", InventoryAlertViewSet, basename="inventory_alert")
 
 
 urlpatterns = [
+    path("summary", InventorySummaryView.as_view(), name="inventory_summary"),
+    path("search", InventorySearchView.as_view(), name="inventory_search"),
     path("", include(router.urls)),
 ]
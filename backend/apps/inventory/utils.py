@@ -1,7 +1,7 @@
-from django.db.models import Sum
+from django.conf import settings
+from django.db.models import Sum, F, Case, When, Value
 from django.db import transaction
 from django.utils import timezone
-from datetime import timedelta
 
 
 def calculate_stock_status(quantity):
@@ -49,6 +49,135 @@ def recalculate_stock_for_product_warehouse(product, warehouse):
             return None
 
 
+def get_stock_ledger_mode():
+    """
+    Return how stock totals are maintained on writes.
+
+    "delta" applies each change to the Stock row in place, "aggregate" re-sums
+    every batch of the product/warehouse on every write.
+    """
+    return getattr(settings, "STOCK_LEDGER_MODE", "delta")
+
+
+def get_movement_delta(movement_type, quantity):
+    """Signed quantity change a movement applies to its batch and stock"""
+    if movement_type in ("OUT", "RETURN"):
+        return -quantity
+    return quantity
+
+
+def stock_status_case(delta):
+    """
+    Status of quantity_on_hand + delta as a CASE over the pre-update value,
+    so status and quantity can be set in the same UPDATE statement.
+    """
+    return Case(
+        When(quantity_on_hand__lte=0 - delta, then=Value("EMPTY")),
+        When(quantity_on_hand__lte=10 - delta, then=Value("ALMOST_OUT")),
+        When(quantity_on_hand__lte=100 - delta, then=Value("GOOD")),
+        default=Value("FULL"),
+    )
+
+
+def apply_stock_delta(product_id, warehouse_id, delta):
+    """
+    Apply a quantity change to the stock ledger row with one conditional UPDATE.
+    The row is seeded from the batch totals the first time a pair is touched.
+    """
+    from .models import Stock
+
+    if not delta:
+        return
+
+    updated = Stock.objects.filter(
+        product_id=product_id, warehouse_id=warehouse_id
+    ).update(
+        quantity_on_hand=F("quantity_on_hand") + delta,
+        status=stock_status_case(delta),
+        last_updated=timezone.now(),
+    )
+
+    if not updated:
+        reconcile_stock(product_id=product_id, warehouse_id=warehouse_id)
+
+
+def reconcile_stock(product_id=None, warehouse_id=None):
+    """
+    Rebuild stock rows from batch totals and fix any that drifted.
+
+    This is the explicit full re-aggregation path for the delta ledger. Rows whose
+    batches are all gone are kept at zero so they stay visible as EMPTY.
+    Returns a dict with the number of rows created, updated and checked.
+    """
+    from .models import Stock, Batch
+
+    batches = Batch.objects.all()
+    stocks = Stock.objects.all()
+    if product_id is not None:
+        batches = batches.filter(product_id=product_id)
+        stocks = stocks.filter(product_id=product_id)
+    if warehouse_id is not None:
+        batches = batches.filter(warehouse_id=warehouse_id)
+        stocks = stocks.filter(warehouse_id=warehouse_id)
+
+    with transaction.atomic():
+        totals = {
+            (row["product_id"], row["warehouse_id"]): row["total"] or 0
+            for row in batches.values("product_id", "warehouse_id")
+            .order_by()
+            .annotate(total=Sum("quantity"))
+        }
+        existing = {
+            (stock.product_id, stock.warehouse_id): stock
+            for stock in stocks.select_for_update()
+        }
+
+        to_update = []
+        for key, stock in existing.items():
+            total = totals.pop(key, 0)
+            status = calculate_stock_status(total)
+            if stock.quantity_on_hand != total or stock.status != status:
+                stock.quantity_on_hand = total
+                stock.status = status
+                stock.last_updated = timezone.now()
+                to_update.append(stock)
+
+        to_create = [
+            Stock(
+                product_id=key[0],
+                warehouse_id=key[1],
+                quantity_on_hand=total,
+                status=calculate_stock_status(total),
+            )
+            for key, total in totals.items()
+        ]
+
+        Stock.objects.bulk_update(
+            to_update, ["quantity_on_hand", "status", "last_updated"], batch_size=500
+        )
+        Stock.objects.bulk_create(to_create, batch_size=500)
+
+    return {
+        "checked": len(existing) + len(to_create),
+        "created": len(to_create),
+        "updated": len(to_update),
+    }
+
+
+def decrement_batch_quantity(batch_id, quantity):
+    """
+    Take quantity out of a batch with a single guarded UPDATE.
+    Returns False, without changing anything, if the batch holds less than quantity.
+    """
+    from .models import Batch
+
+    return bool(
+        Batch.objects.filter(id=batch_id, quantity__gte=quantity).update(
+            quantity=F("quantity") - quantity
+        )
+    )
+
+
 def get_current_batch_quantity(product, warehouse):
     """Get current total quantity from batches for validation purposes"""
     from .models import Batch
@@ -57,35 +186,3 @@ def get_current_batch_quantity(product, warehouse):
         product=product,
         warehouse=warehouse
     ).aggregate(total=Sum('quantity'))['total'] or 0
-
-
-def check_expiring_batches():
-    """Check for batches expiring within 7 days and create alerts"""
-    from .models import Batch, InventoryAlert
-    
-    expiry_threshold = timezone.now().date() + timedelta(days=7)
-    
-    expiring_batches = Batch.objects.filter(
-        expiry_date__lte=expiry_threshold,
-        expiry_date__gte=timezone.now().date(),
-        quantity__gt=0
-    )
-    
-    for batch in expiring_batches:
-        # Check if alert already exists
-        existing_alert = InventoryAlert.objects.filter(
-            product=batch.product,
-            warehouse=batch.warehouse,
-            alert_type="EXPIRY",
-            status="OPEN"
-        ).first()
-        
-        if not existing_alert:
-            InventoryAlert.objects.create(
-                product=batch.product,
-                warehouse=batch.warehouse,
-                alert_type="EXPIRY",
-                message=f"Batch {batch.batch_number} of {batch.product.name} expires on {batch.expiry_date}",
-                current_quantity=batch.quantity,
-                triggered_by="SCHEDULED_CHECK"
-            )
\ No newline at end of file
@@ -4,14 +4,20 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from core.fieldsets import SparseFieldsetMixin
 from ..models import Stock, StockMovement, Batch
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from ..filters import StockFilter, StockMovementFilter, BatchFilter
 from ..serializers import StockSerializer, StockMovementSerializer, BatchSerializer
-from .utils import CustomPagination, InventoryPermission, filter_backends
+from .utils import (
+    SelectablePagination,
+    ExpandMixin,
+    InventoryPermission,
+    filter_backends,
+)
 
 
-class BatchViewSet(viewsets.ModelViewSet):
+class BatchViewSet(SparseFieldsetMixin, ExpandMixin, viewsets.ModelViewSet):
     """
     ViewSet for managing batches of products in inventory's warehouses.
 
@@ -19,12 +25,15 @@ class BatchViewSet(viewsets.ModelViewSet):
 
     Query parameters:\n
         - product_id: Filter batches by product ID\n
-        - warehouse_id: Filter batches by warehouse ID
+        - warehouse_id: Filter batches by warehouse ID\n
+        - pagination: 'cursor' for keyset pages on (created_at, id) with next/previous cursors instead of page numbers\n
+        - expand: Comma separated relations to nest as summaries (product, warehouse)\n
+        - fields / omit: Comma separated fields to return / to leave out
     """
 
     queryset = Batch.objects.all()
     serializer_class = BatchSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAuthenticated, InventoryPermission]
     filterset_class = BatchFilter
     filter_backends = filter_backends
@@ -0,0 +1,91 @@
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from ..services.search import (
+    search_inventory,
+    search_mode,
+    SEARCH_TARGETS,
+    MIN_QUERY_LENGTH,
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+)
+from .utils import InventoryPermission
+
+
+class InventorySearchView(APIView):
+    """
+    Search products (name, SKU, category), batches (batch number) and stock
+    movements (reference number) at once. Hits are typed and ranked, best
+    first; on PostgreSQL the ranking uses trigram similarity.
+
+    Query parameters:\n
+        - q: Search text, at least 2 characters\n
+        - types: Comma separated subset of product, batch, movement\n
+        - limit: Maximum number of hits (default 20, at most 50)
+    """
+
+    permission_classes = [IsAuthenticated, InventoryPermission]
+
+    @extend_schema(
+        tags=["Inventory Search"],
+        parameters=[
+            OpenApiParameter(
+                name="q",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=True,
+                description="Search text, at least 2 characters",
+            ),
+            OpenApiParameter(
+                name="types",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Comma separated subset of product, batch, movement",
+            ),
+            OpenApiParameter(
+                name="limit",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Maximum number of hits (default 20, at most 50)",
+            ),
+        ],
+    )
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        if len(query) < MIN_QUERY_LENGTH:
+            return Response(
+                {"detail": f"q must be at least {MIN_QUERY_LENGTH} characters."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        types = request.query_params.get("types")
+        if types:
+            types = [name.strip() for name in types.split(",") if name.strip()]
+            unknown = sorted(set(types) - set(SEARCH_TARGETS))
+            if unknown:
+                return Response(
+                    {"detail": f"Unknown search types: {', '.join(unknown)}."},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+            if not 1 <= limit <= MAX_LIMIT:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"detail": f"limit must be between 1 and {MAX_LIMIT}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(
+            {
+                "query": query,
+                "mode": search_mode(),
+                "results": search_inventory(query, types=types, limit=limit),
+            }
+        )
@@ -5,26 +5,50 @@ from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from django.utils import timezone
+from core.conditional import ConditionalListMixin
+from core.fieldsets import SparseFieldsetMixin
 from ..models import InventoryAlert, ProductReorderPolicy
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from ..filters import StockFilter, StockMovementFilter, BatchFilter
 from ..serializers import InventoryAlertSerializer, ProductReorderPolicySerializer
-from .utils import CustomPagination, InventoryPermission, filter_backends
-
-
-class InventoryAlertViewSet(viewsets.ReadOnlyModelViewSet):
+from .utils import (
+    CustomPagination,
+    SelectablePagination,
+    ExpandMixin,
+    InventoryPermission,
+    filter_backends,
+)
+
+
+class InventoryAlertViewSet(
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    ExpandMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     ViewSet for viewing inventory alerts.
 
-    Read-only access to inventory alerts.
+    Read-only access to inventory alerts. The list and the alert queues carry
+    ETag and Last-Modified, and unchanged polls get 304 Not Modified.
+
+    Query parameters:\n
+        - warehouse_id: Filter alerts by warehouse ID\n
+        - pagination: 'cursor' for keyset pages on (created_at, id) with next/previous cursors instead of page numbers\n
+        - expand: Comma separated relations to nest as summaries (product, warehouse)\n
+        - fields / omit: Comma separated fields to return / to leave out\n
+    Custom actions (paginated, newest first, accept the parameters above):\n
+        - low_stock, out_of_stock, expiry: Alerts of one type (optional 'status' filter)\n
+        - open, acknowledged: Alerts in one status
     """
 
     serializer_class = InventoryAlertSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAuthenticated, InventoryPermission]
     filter_backends = filter_backends
     ordering_fields = ["created_at", "alert_type", "status"]
     search_fields = ["product__name", "product__sku"]
+    conditional_fields = ["created_at", "acknowledged_at", "resolved_at"]
     tags = ["Inventory Alerts"]
 
     def get_queryset(self):
@@ -37,40 +61,51 @@ class InventoryAlertViewSet(viewsets.ReadOnlyModelViewSet):
 
         return queryset
 
+    def alert_queue(self, **filters):
+        """
+        Paginated alerts matching filters, newest first, with the usual
+        warehouse, status, search and expand parameters applied
+        """
+        queryset = self.get_queryset().filter(**filters).order_by("-created_at")
+        alert_status = self.request.query_params.get("status")
+        if alert_status is not None and "status" not in filters:
+            queryset = queryset.filter(status=alert_status)
+        queryset = self.filter_queryset(queryset)
+
+        def build_response():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            serializer = self.get_serializer(queryset, many=True)
+            return Response(serializer.data)
+
+        return self.conditional_response(queryset, build_response)
+
     @action(detail=False, methods=["get"])
     def low_stock(self, request):
-        """Retrieve all low stock alerts"""
-        alerts = InventoryAlert.objects.filter(alert_type="LOW_STOCK")
-        serializer = self.get_serializer(alerts, many=True)
-        return Response(serializer.data)
+        """Retrieve low stock alerts"""
+        return self.alert_queue(alert_type="LOW_STOCK")
 
     @action(detail=False, methods=["get"])
     def out_of_stock(self, request):
-        """Retrieve all out of stock alerts"""
-        alerts = InventoryAlert.objects.filter(alert_type="OUT_OF_STOCK")
-        serializer = self.get_serializer(alerts, many=True)
-        return Response(serializer.data)
+        """Retrieve out of stock alerts"""
+        return self.alert_queue(alert_type="OUT_OF_STOCK")
 
     @action(detail=False, methods=["get"])
     def expiry(self, request):
-        """Retrieve all expiry alerts"""
-        alerts = InventoryAlert.objects.filter(alert_type="EXPIRY")
-        serializer = self.get_serializer(alerts, many=True)
-        return Response(serializer.data)
+        """Retrieve expiry alerts"""
+        return self.alert_queue(alert_type="EXPIRY")
 
     @action(detail=False, methods=["get"])
     def open(self, request):
-        """Retrieve all open alerts"""
-        alerts = InventoryAlert.objects.filter(status="OPEN")
-        serializer = self.get_serializer(alerts, many=True)
-        return Response(serializer.data)
+        """Retrieve open alerts"""
+        return self.alert_queue(status="OPEN")
 
     @action(detail=False, methods=["get"])
     def acknowledged(self, request):
-        """Retrieve all acknowledged alerts"""
-        alerts = InventoryAlert.objects.filter(status="ACKNOWLEDGED")
-        serializer = self.get_serializer(alerts, many=True)
-        return Response(serializer.data)
+        """Retrieve acknowledged alerts"""
+        return self.alert_queue(status="ACKNOWLEDGED")
 
     @action(detail=True, methods=["patch"])
     def acknowledge(self, request, pk=None):
@@ -101,11 +136,17 @@ class InventoryAlertViewSet(viewsets.ReadOnlyModelViewSet):
         )
 
 
-class ProductReorderPolicyViewSet(viewsets.ModelViewSet):
+class ProductReorderPolicyViewSet(
+    SparseFieldsetMixin, ExpandMixin, viewsets.ModelViewSet
+):
     """
     Docstring for ProductReorderPolicyViewSet
 
     ViewSet for managing product reorder policies.
+
+    Query parameters:\n
+        - expand: Comma separated relations to nest as summaries (product, warehouse)\n
+        - fields / omit: Comma separated fields to return / to leave out
     """
 
     queryset = ProductReorderPolicy.objects.all()
@@ -1,17 +1,51 @@
 from django.shortcuts import render
+from django.http import StreamingHttpResponse
+from django.core.exceptions import ValidationError as DjangoValidationError
 from rest_framework import viewsets, status, generics
 from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from core.fieldsets import SparseFieldsetMixin
+from core.renderers import MessagePackParser
 from ..models import Stock, StockMovement, Batch
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from ..filters import StockFilter, StockMovementFilter, BatchFilter
-from ..serializers import StockSerializer, StockMovementSerializer, BatchSerializer
-from .utils import CustomPagination, InventoryPermission, filter_backends
+from ..serializers import (
+    StockSerializer,
+    StockMovementSerializer,
+    BatchSerializer,
+    StockMovementBulkSerializer,
+    StockMovementBulkRowSerializer,
+    StockAllocationSerializer,
+)
+from ..services.stock_movements import apply_stock_movements
+from ..services.allocation import allocate_fefo
+from ..services.exports import export_movements, EXPORT_FORMATS
+from .utils import (
+    SelectablePagination,
+    ExpandMixin,
+    InventoryPermission,
+    filter_backends,
+)
+from datetime import date, datetime, time, timedelta
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
 
 
-class StockMovementViewSet(viewsets.ModelViewSet):
+def day_start(value):
+    """Start of a YYYY-MM-DD day as an aware datetime, 400 when malformed"""
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        raise ValidationError({"detail": f"Invalid date '{value}', use YYYY-MM-DD."})
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+class StockMovementViewSet(
+    SparseFieldsetMixin, ExpandMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for managing stock movements and inventory transactions.
 
@@ -21,13 +55,21 @@ class StockMovementViewSet(viewsets.ModelViewSet):
         - warehouse_id: Filter movements by warehouse ID\n
         - start_date: Filter movements from this date (YYYY-MM-DD)\n
         - end_date: Filter movements until this date (YYYY-MM-DD)\n
+        - pagination: 'cursor' for keyset pages on (created_at, id) with next/previous cursors instead of page numbers\n
+        - expand: Comma separated relations to nest as summaries (batch, product, warehouse)\n
+        - fields / omit: Comma separated fields to return / to leave out\n
     Custom actions:\n
-        - by_stock: Get movements for specific stock item (requires 'stock_id' parameter)
+        - by_stock: Get movements for specific stock item (requires 'stock_id' parameter)\n
+        - export: Stream every matching movement as CSV or NDJSON ('file_format' parameter)\n
+        - bulk: Create many movements in one transaction (POST)\n
+        - allocate: Take a product quantity out of a warehouse, earliest expiry first (POST)
     """
 
     serializer_class = StockMovementSerializer
-    pagination_class = CustomPagination
+    pagination_class = SelectablePagination
     permission_classes = [IsAuthenticated, InventoryPermission]
+    # Scanners upload movements (single, bulk, allocate) as MessagePack too
+    parser_classes = [*api_settings.DEFAULT_PARSER_CLASSES, MessagePackParser]
     filterset_class = StockMovementFilter
     filter_backends = filter_backends
     ordering_fields = ["created_at", "quantity"]
@@ -44,20 +86,172 @@ class StockMovementViewSet(viewsets.ModelViewSet):
         if warehouse_id is not None:
             queryset = queryset.filter(batch__warehouse_id=warehouse_id)
 
-        if start_date is not None and end_date is not None:
-            queryset = queryset.filter(created_at__range=[start_date, end_date])
+        # Compare created_at with plain bounds (no date casts) so PostgreSQL can
+        # prune the monthly partitions; end_date includes the whole day
+        if start_date is not None:
+            queryset = queryset.filter(created_at__gte=day_start(start_date))
+        if end_date is not None:
+            queryset = queryset.filter(
+                created_at__lt=day_start(end_date) + timedelta(days=1)
+            )
 
         return queryset
 
+    def perform_create(self, serializer):
+        # validate_stock_movement refuses oversells (OUT, RETURN, negative
+        # ADJUSTMENT) with Django's ValidationError; report them as a 400
+        try:
+            serializer.save()
+        except DjangoValidationError as e:
+            raise ValidationError({"quantity": e.messages})
+
     @action(detail=False, methods=["get"])
     def by_stock(self, request):
         """Retrieve stock movements for a specific stock item"""
         stock_id = request.query_params.get("stock_id", None)
         if stock_id is not None:
-            movements = StockMovement.objects.filter(stock_id=stock_id)
+            movements = self.expand_queryset(
+                StockMovement.objects.filter(stock_id=stock_id)
+            )
             serializer = self.get_serializer(movements, many=True)
             return Response(serializer.data)
         return Response(
             {"detail": "stock_id parameter is required."},
             status=status.HTTP_400_BAD_REQUEST,
         )
+
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="file_format",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=list(EXPORT_FORMATS),
+                description="csv (default) or ndjson",
+            ),
+        ],
+        responses={(200, "text/csv"): str, (200, "application/x-ndjson"): str},
+    )
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """
+        Stream all movements matching the list filters, unpaginated, with the
+        batch, product and warehouse columns joined in. Oldest first unless
+        'ordering' is given.
+        """
+        file_format = request.query_params.get("file_format", "csv")
+        if file_format not in EXPORT_FORMATS:
+            return Response(
+                {"detail": f"file_format must be one of: {', '.join(EXPORT_FORMATS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = self.filter_queryset(self.get_queryset())
+        if not request.query_params.get("ordering"):
+            queryset = queryset.order_by("created_at", "id")
+
+        response = StreamingHttpResponse(
+            export_movements(queryset, file_format),
+            content_type=EXPORT_FORMATS[file_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="stock_movements.{file_format}"'
+        )
+        return response
+
+    @extend_schema(request=StockMovementBulkSerializer)
+    @action(detail=False, methods=["post"])
+    def bulk(self, request):
+        """
+        Create many stock movements in one transaction.
+
+        Request body:\n
+            - movements: List of movements (batch, movement_type, quantity, reference_number, notes)\n
+            - mode: "all_or_nothing" (default) writes nothing if any row fails,
+              "best_effort" writes every valid row\n
+        Response:\n
+            - created / failed: Row counts\n
+            - results: Per-row id or errors, keyed by the row index
+        """
+        envelope = StockMovementBulkSerializer(data=request.data)
+        envelope.is_valid(raise_exception=True)
+        mode = envelope.validated_data["mode"]
+        best_effort = mode == "best_effort"
+
+        entries = []
+        errors = {}
+        for index, row in enumerate(envelope.validated_data["movements"]):
+            row_serializer = StockMovementBulkRowSerializer(data=row)
+            if row_serializer.is_valid():
+                entries.append((index, row_serializer.validated_data))
+            else:
+                errors[index] = row_serializer.errors
+
+        created = []
+        if entries and (best_effort or not errors):
+            created, apply_errors = apply_stock_movements(entries, best_effort)
+            errors.update(apply_errors)
+
+        results = [{"index": index, "id": str(movement.id)} for index, movement in created]
+        results += [{"index": index, "errors": error} for index, error in errors.items()]
+        results.sort(key=lambda result: result["index"])
+
+        return Response(
+            {
+                "mode": mode,
+                "created": len(created),
+                "failed": len(errors),
+                "results": results,
+            },
+            status=status.HTTP_201_CREATED if created else status.HTTP_400_BAD_REQUEST,
+        )
+
+    @extend_schema(request=StockAllocationSerializer)
+    @action(detail=False, methods=["post"])
+    def allocate(self, request):
+        """
+        Allocate an OUT quantity across batches, first-expired-first-out.
+
+        Request body:\n
+            - product / warehouse: IDs to take stock from\n
+            - quantity: Total quantity to take out\n
+            - reference_number, notes: Copied onto every movement\n
+        Response:\n
+            - allocations: One entry per batch used, earliest expiry first
+        """
+        serializer = StockAllocationSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
+
+        try:
+            movements = allocate_fefo(
+                data["product"],
+                data["warehouse"],
+                data["quantity"],
+                reference_number=data.get("reference_number"),
+                notes=data.get("notes"),
+            )
+        except DjangoValidationError as e:
+            return Response(
+                {"detail": e.messages[0]}, status=status.HTTP_400_BAD_REQUEST
+            )
+
+        return Response(
+            {
+                "product": data["product"],
+                "warehouse": data["warehouse"],
+                "quantity": data["quantity"],
+                "allocations": [
+                    {
+                        "movement": movement.id,
+                        "batch": movement.batch_id,
+                        "batch_number": movement.batch.batch_number,
+                        "expiry_date": movement.batch.expiry_date,
+                        "quantity": movement.quantity,
+                    }
+                    for movement in movements
+                ],
+            },
+            status=status.HTTP_201_CREATED,
+        )
@@ -4,25 +4,47 @@ from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
+from core.conditional import ConditionalListMixin
+from core.fieldsets import SparseFieldsetMixin
 from ..models import Stock, StockMovement, Batch
 from drf_spectacular.utils import extend_schema, OpenApiParameter
 from ..filters import StockFilter, StockMovementFilter, BatchFilter
 from ..serializers import StockSerializer, StockMovementSerializer, BatchSerializer
-from .utils import CustomPagination, InventoryPermission, filter_backends
+from ..utils import calculate_stock_status
+from ..services.snapshots import annotate_stock_as_of
+from ..services.matrix import get_stock_matrix, MATRIX_LAYOUTS
+from .utils import (
+    CustomPagination,
+    ExpandMixin,
+    InventoryPermission,
+    filter_backends,
+)
+import uuid
+from datetime import date
 
 
 
 
-class StockViewSet(viewsets.ReadOnlyModelViewSet):
+class StockViewSet(
+    ConditionalListMixin,
+    SparseFieldsetMixin,
+    ExpandMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     ViewSet for viewing stock levels of products in warehouses.
 
-    Read-only access to current inventory levels.
+    Read-only access to current inventory levels. Lists carry ETag and
+    Last-Modified, and unchanged polls get 304 Not Modified.
 
     Query parameters:\n
         - warehouse_id: Filter stocks by warehouse ID\n
+        - as_of: Stock held at the end of this date (YYYY-MM-DD), from the nearest snapshot plus later movements\n
+        - expand: Comma separated relations to nest as summaries (product, warehouse)\n
+        - fields / omit: Comma separated fields to return / to leave out\n
     Custom actions:\n
-        - by_product_sku: Get stock for specific product SKU (requires 'sku' parameter)
+        - by_product_sku: Get stock for specific product SKU (requires 'sku' parameter)\n
+        - matrix: Product x warehouse quantity pivot in a columnar payload
     """
 
     queryset = Stock.objects.all()
@@ -33,14 +55,54 @@ class StockViewSet(viewsets.ReadOnlyModelViewSet):
     filter_backends = filter_backends
     ordering_fields = ["quantity", "product__name"]
     search_fields = ["product__name", "product__sku"]
+    conditional_fields = ["last_updated"]
     tags = ["Stocks"]
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="as_of",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Return stock held at the end of this date (YYYY-MM-DD)",
+            )
+        ]
+    )
+    def list(self, request, *args, **kwargs):
+        """List stock levels, optionally as they were at the end of a past date"""
+        as_of = request.query_params.get("as_of")
+        if as_of is None:
+            return super().list(request, *args, **kwargs)
+
+        try:
+            as_of = date.fromisoformat(as_of)
+        except ValueError:
+            return Response(
+                {"detail": "as_of must be a date in YYYY-MM-DD format."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        queryset = annotate_stock_as_of(
+            self.filter_queryset(self.get_queryset()), as_of
+        )
+        page = self.paginate_queryset(queryset)
+        stocks = page if page is not None else list(queryset)
+        for stock in stocks:
+            stock.quantity_on_hand = stock.as_of_quantity
+            stock.status = calculate_stock_status(stock.as_of_quantity)
+
+        serializer = self.get_serializer(stocks, many=True)
+        if page is not None:
+            return self.get_paginated_response(serializer.data)
+        return Response(serializer.data)
+
     @action(detail=False, methods=["get"])
     def by_product_sku(self, request):
         """Retrieve stock items for a specific product SKU"""
         sku = request.query_params.get("sku", None)
         if sku is not None:
-            stocks = Stock.objects.filter(product__sku=sku)
+            stocks = self.expand_queryset(Stock.objects.filter(product__sku=sku))
             serializer = self.get_serializer(stocks, many=True)
             return Response(serializer.data)
         return Response(
@@ -48,4 +110,58 @@ class StockViewSet(viewsets.ReadOnlyModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @extend_schema(
+        parameters=[
+            OpenApiParameter(
+                name="category",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only products of this category",
+            ),
+            OpenApiParameter(
+                name="company_id",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only products of this company",
+            ),
+            OpenApiParameter(
+                name="layout",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                enum=MATRIX_LAYOUTS,
+                description="sparse (default): parallel product index, warehouse "
+                "index and quantity arrays; dense: one quantity row per product",
+            ),
+        ]
+    )
+    @action(detail=False, methods=["get"])
+    def matrix(self, request):
+        """
+        Quantity on hand pivoted into products (rows) by warehouses (columns),
+        computed in one aggregate query and cached until the next stock change
+        """
+        company_id = request.query_params.get("company_id")
+        layout = request.query_params.get("layout", "sparse")
+        try:
+            company_id = uuid.UUID(company_id) if company_id else None
+        except ValueError:
+            return Response(
+                {"detail": "company_id must be a UUID."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if layout not in MATRIX_LAYOUTS:
+            return Response(
+                {"detail": f"layout must be one of: {', '.join(MATRIX_LAYOUTS)}."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
+        return Response(
+            get_stock_matrix(
+                category=request.query_params.get("category"),
+                company_id=company_id,
+                layout=layout,
+            )
+        )
@@ -0,0 +1,58 @@
+import uuid
+from rest_framework import status
+from rest_framework.views import APIView
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_spectacular.utils import extend_schema, OpenApiParameter
+from ..services.summary import get_summary, DEFAULT_EXPIRY_DAYS
+from .utils import InventoryPermission
+
+
+class InventorySummaryView(APIView):
+    """
+    Dashboard counts grouped by warehouse: stock rows per status, open and
+    acknowledged alerts per type, and batches expiring soon or already expired.
+
+    Cached for a few seconds and refreshed after any stock or alert change.
+
+    Query parameters:\n
+        - warehouse_id: Only count this warehouse\n
+        - expiry_days: Horizon for expiring batches in days (default 7)
+    """
+
+    permission_classes = [IsAuthenticated, InventoryPermission]
+
+    @extend_schema(
+        tags=["Inventory Summary"],
+        parameters=[
+            OpenApiParameter(
+                name="warehouse_id",
+                type=str,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Only count this warehouse",
+            ),
+            OpenApiParameter(
+                name="expiry_days",
+                type=int,
+                location=OpenApiParameter.QUERY,
+                required=False,
+                description="Horizon for expiring batches in days (default 7)",
+            ),
+        ],
+    )
+    def get(self, request):
+        warehouse_id = request.query_params.get("warehouse_id")
+        expiry_days = request.query_params.get("expiry_days", DEFAULT_EXPIRY_DAYS)
+        try:
+            warehouse_id = uuid.UUID(warehouse_id) if warehouse_id else None
+            expiry_days = int(expiry_days)
+            if not 0 <= expiry_days <= 365:
+                raise ValueError
+        except ValueError:
+            return Response(
+                {"detail": "warehouse_id must be a UUID and expiry_days 0-365."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        return Response(get_summary(warehouse_id, expiry_days))
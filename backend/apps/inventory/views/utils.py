@@ -1,7 +1,17 @@
+import base64
+import uuid
+from datetime import datetime
 from apps.accounts.permissions import ModulePermission
 from rest_framework import filters
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.exceptions import NotFound, ValidationError
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from django.db.models import Q
+from central.cache import model_generation
+from ..cache import STOCK_GENERATION
 
 
 class CustomPagination(PageNumberPagination):
@@ -10,6 +20,197 @@ class CustomPagination(PageNumberPagination):
     max_page_size = 100
 
 
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on (created_at, id), newest first unless the request
+    orders by created_at ascending.
+
+    Each page is one indexed range query with no COUNT and no OFFSET, so deep
+    pages cost the same as the first one. The id tie-breaker keeps pages stable
+    when rows share a timestamp. Other filters apply as usual; ordering on any
+    other field is rejected because the cursor could not follow it.
+    """
+
+    page_size = CustomPagination.page_size
+    page_size_query_param = CustomPagination.page_size_query_param
+    max_page_size = CustomPagination.max_page_size
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.descending = self.get_descending(queryset)
+        cursor = self.decode_cursor(request)
+        self.has_cursor = cursor is not None
+        self.reverse = cursor is not None and cursor[2]
+
+        # Walking backwards flips the direction of both the filter and the sort
+        backwards = self.descending != self.reverse
+        if cursor is not None:
+            created_at, pk, _ = cursor
+            lookup = "lt" if backwards else "gt"
+            # The redundant inclusive bound gives PostgreSQL a range to scan on
+            # the (created_at, id) index; the OR alone is not sargable
+            queryset = queryset.filter(
+                Q(**{f"created_at__{lookup}e": created_at}),
+                Q(**{f"created_at__{lookup}": created_at})
+                | Q(created_at=created_at, **{f"id__{lookup}": pk}),
+            )
+        sign = "-" if backwards else ""
+        rows = list(
+            queryset.order_by(f"{sign}created_at", f"{sign}id")[: self.page_size + 1]
+        )
+
+        self.has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+        self.page = rows
+        return rows
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(size, 1), self.max_page_size)
+
+    def get_descending(self, queryset):
+        ordering = queryset.query.order_by or queryset.model._meta.ordering
+        if not ordering:
+            return True
+        if ordering[0] not in ("created_at", "-created_at"):
+            raise ValidationError(
+                {"detail": "Cursor pagination only supports ordering by created_at."}
+            )
+        return ordering[0] == "-created_at"
+
+    def encode_cursor(self, row, reverse):
+        raw = f"{row.created_at.isoformat()}|{row.pk}|{int(reverse)}"
+        token = base64.urlsafe_b64encode(raw.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(), self.cursor_query_param, token
+        )
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token.encode()).decode()
+            created_at, pk, reverse = raw.split("|")
+            return datetime.fromisoformat(created_at), uuid.UUID(pk), reverse == "1"
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        more = self.has_cursor if self.reverse else self.has_more
+        if not self.page or not more:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        more = self.has_more if self.reverse else self.has_cursor
+        if not self.page or not more:
+            return None
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class SelectablePagination(CustomPagination):
+    """
+    Page number pagination by default; keyset cursor pagination when the
+    request asks for it with ?pagination=cursor or carries a cursor.
+    """
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get("pagination") == "cursor"
+            or KeysetPagination.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = KeysetPagination() if self.use_cursor(request) else None
+        if self.keyset is not None:
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class ExpandMixin:
+    """
+    ?expand=product,warehouse,batch on read requests: the serializer nests
+    summaries for the named relations and the queryset joins them with
+    select_related, so a page costs the same number of queries at any size.
+    """
+
+    def get_expand(self):
+        request = getattr(self, "request", None)
+        if request is None or request.method not in SAFE_METHODS:
+            return []
+        names = [
+            name.strip()
+            for name in request.query_params.get("expand", "").split(",")
+            if name.strip()
+        ]
+        allowed = self.get_serializer_class().expandable_fields
+        unknown = [name for name in names if name not in allowed]
+        if unknown:
+            raise ValidationError(
+                {
+                    "expand": f"Unknown field(s): {', '.join(unknown)}. "
+                    f"Choose from: {', '.join(allowed)}."
+                }
+            )
+        return list(dict.fromkeys(names))
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["expand"] = self.get_expand()
+        return context
+
+    def expand_queryset(self, queryset):
+        """
+        Join the expanded relations; actions that serialize a queryset they
+        built themselves, instead of one from filter_queryset, must call this
+        """
+        expandable = self.get_serializer_class().expandable_fields
+        paths = [expandable[name][2] for name in self.get_expand()]
+        return queryset.select_related(*paths) if paths else queryset
+
+    def filter_queryset(self, queryset):
+        return self.expand_queryset(super().filter_queryset(queryset))
+
+    def get_expand_generations(self):
+        """
+        Generations of the expanded rows, so conditional list ETags change
+        when a nested product or warehouse is renamed. Catalog models have
+        their own generation; inventory rows move with the stock generation.
+        """
+        expandable = self.get_serializer_class().expandable_fields
+        generations = []
+        for name in self.get_expand():
+            model = expandable[name][0].Meta.model
+            if model._meta.app_label == "central":
+                generations.append(model_generation(model))
+            else:
+                generations.append(STOCK_GENERATION)
+        return generations
+
+
 class InventoryPermission(ModulePermission):
     module = "inventory"
 
@@ -0,0 +1,109 @@
+"""
+Read-through response cache for the catalog viewsets.
+
+GET responses are cached by viewset, normalized URL and user role. Keys embed
+the generation of every model the responses are built from, and detail routes
+also the generation of the one object they show, so a save or delete drops the
+lists of that model and the detail responses of that object only. Writes made
+with queryset.update() or bulk_create() send no signals and are picked up when
+the entries expire (CATALOG_CACHE_TTL).
+"""
+
+import hashlib
+import uuid
+from urllib.parse import urlencode
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework.response import Response
+from core.cache import get_generation, bump_generation
+
+DEFAULT_CATALOG_CACHE_TTL = 600
+
+
+def model_generation(model):
+    return f"central:{model._meta.model_name}"
+
+
+def object_generation(model, pk):
+    return f"central:{model._meta.model_name}:{pk}"
+
+
+def invalidate_catalog(model, pk):
+    """
+    Drop cached responses built from a model and from one of its objects.
+
+    Bumped straight away so reads later in the same transaction miss, and again
+    after the commit so a response cached by a concurrent read of the old rows
+    is dropped too.
+    """
+
+    def bump():
+        bump_generation(model_generation(model))
+        bump_generation(object_generation(model, pk))
+
+    bump()
+    transaction.on_commit(bump)
+
+
+class CachedResponseMixin:
+    """
+    Serve list and retrieve (and actions that go through cached_response) from
+    the cache. cache_models lists the models whose changes affect the
+    responses, the viewset's own model first; cache_generations names further
+    core.cache generations the responses depend on.
+    """
+
+    cache_models = []
+    cache_generations = []
+
+    def get_response_cache_key(self, request, pk=None):
+        own_model, *related_models = self.cache_models
+        if pk is None:
+            names = [model_generation(own_model)]
+        else:
+            # Same spelling of the id as the signal handlers use
+            try:
+                pk = uuid.UUID(str(pk))
+            except ValueError:
+                pass
+            names = [object_generation(own_model, pk)]
+        names += [model_generation(model) for model in related_models]
+        names += self.cache_generations
+        versions = ".".join(str(get_generation(name)) for name in names)
+
+        role = getattr(request.user, "role", None) or "anonymous"
+        query = urlencode(sorted(request.query_params.lists()), doseq=True)
+        url = f"{request.build_absolute_uri(request.path)}?{query}"
+        digest = hashlib.md5(url.encode()).hexdigest()
+        return f"central:response:{self.basename}:{versions}:{role}:{digest}"
+
+    def cached_response(self, request, build_response, pk=None):
+        """
+        Cached data of build_response() for this request; pk keys the entry to
+        one object of the viewset's model instead of the whole table
+        """
+        key = self.get_response_cache_key(request, pk)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+
+        response = build_response()
+        if response.status_code == 200:
+            ttl = getattr(settings, "CATALOG_CACHE_TTL", DEFAULT_CATALOG_CACHE_TTL)
+            cache.set(key, response.data, timeout=ttl)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        build_list = super().list
+        return self.cached_response(
+            request, lambda: build_list(request, *args, **kwargs)
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        build_detail = super().retrieve
+        return self.cached_response(
+            request,
+            lambda: build_detail(request, *args, **kwargs),
+            pk=kwargs[self.lookup_url_kwarg or self.lookup_field],
+        )
@@ -50,6 +50,7 @@ class Warehouse(models.Model):
         choices=WAREHOUSE_TYPE_CHOICES, max_length=50, null=True, blank=True
     )
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Warehouse"
@@ -59,6 +60,7 @@ class Warehouse(models.Model):
                 fields=["company", "status"], name="warehouse_company_status_idx"
             ),
             models.Index(fields=["wh_type"], name="warehouse_type_idx"),
+            models.Index(fields=["updated_at"], name="warehouse_updated_idx"),
         ]
 
     def __str__(self):
@@ -90,6 +92,7 @@ class Product(models.Model):
     )
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         verbose_name = "Product"
@@ -100,6 +103,7 @@ class Product(models.Model):
             ),
             models.Index(fields=["category"], name="product_category_idx"),
             models.Index(fields=["sku"], name="product_sku_idx"),
+            models.Index(fields=["updated_at"], name="product_updated_idx"),
         ]
 
     def save(self, *args, **kwargs):
@@ -1,11 +1,28 @@
 from rest_framework import serializers
+from core.fieldsets import SparseFieldsetSerializerMixin
+from apps.inventory.models import Stock, InventoryAlert
 from .models import Company, Warehouse, Product
 
 
-class CompanySerializer(serializers.ModelSerializer):
-    """Serializer for Company model"""
+class CompanySerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    """
+    Serializer for Company model. The counts come from queryset annotations
+    (central.services.counts) and are computed per object only when missing.
+    """
 
     warehouses_count = serializers.SerializerMethodField()
+    products_count = serializers.SerializerMethodField()
+    stock_lines = serializers.SerializerMethodField()
+    open_alerts = serializers.SerializerMethodField()
+
+    column_sources = {
+        "warehouses_count": [],
+        "products_count": [],
+        "stock_lines": [],
+        "open_alerts": [],
+    }
 
     class Meta:
         model = Company
@@ -15,21 +32,56 @@ class CompanySerializer(serializers.ModelSerializer):
             "status",
             "created_at",
             "warehouses_count",
+            "products_count",
+            "stock_lines",
+            "open_alerts",
         ]
         read_only_fields = [
             "id",
             "created_at",
             "warehouses_count",
+            "products_count",
+            "stock_lines",
+            "open_alerts",
         ]
 
     def get_warehouses_count(self, obj):
+        if hasattr(obj, "warehouses_count"):
+            return obj.warehouses_count
         return obj.warehouses.count()
 
+    def get_products_count(self, obj):
+        if hasattr(obj, "products_count"):
+            return obj.products_count
+        return obj.products.count()
+
+    def get_stock_lines(self, obj):
+        if hasattr(obj, "stock_lines"):
+            return obj.stock_lines
+        return Stock.objects.filter(warehouse__company=obj).count()
+
+    def get_open_alerts(self, obj):
+        if hasattr(obj, "open_alerts"):
+            return obj.open_alerts
+        return InventoryAlert.objects.filter(
+            warehouse__company=obj, status="OPEN"
+        ).count()
 
-class WarehouseSerializer(serializers.ModelSerializer):
-    """Serializer for Warehouse model"""
+
+class WarehouseSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
+    """
+    Serializer for Warehouse model. The counts come from queryset annotations
+    (central.services.counts) and are computed per object only when missing.
+    """
 
     company_name = serializers.CharField(source="company.name", read_only=True)
+    products_count = serializers.SerializerMethodField()
+    stock_lines = serializers.SerializerMethodField()
+    open_alerts = serializers.SerializerMethodField()
+
+    column_sources = {"products_count": [], "stock_lines": [], "open_alerts": []}
 
     class Meta:
         model = Warehouse
@@ -41,17 +93,39 @@ class WarehouseSerializer(serializers.ModelSerializer):
             "status",
             "wh_type",
             "created_at",
+            "products_count",
+            "stock_lines",
+            "open_alerts",
         ]
         read_only_fields = ["id", "created_at"]
 
+    def get_products_count(self, obj):
+        if hasattr(obj, "products_count"):
+            return obj.products_count
+        return obj.stocks.filter(quantity_on_hand__gt=0).count()
 
-class ProductSerializer(serializers.ModelSerializer):
+    def get_stock_lines(self, obj):
+        if hasattr(obj, "stock_lines"):
+            return obj.stock_lines
+        return obj.stocks.count()
+
+    def get_open_alerts(self, obj):
+        if hasattr(obj, "open_alerts"):
+            return obj.open_alerts
+        return obj.inventory_alerts.filter(status="OPEN").count()
+
+
+class ProductSerializer(
+    SparseFieldsetSerializerMixin, serializers.ModelSerializer
+):
     """Serializer for Product model"""
 
     unit_of_measure_display = serializers.CharField(
         source="get_unit_of_measure_display", read_only=True
     )
 
+    column_sources = {"unit_of_measure_display": ["unit_of_measure"]}
+
     class Meta:
         model = Product
         fields = [
@@ -0,0 +1,46 @@
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from apps.inventory.models import Stock, InventoryAlert
+from ..models import Warehouse, Product
+
+
+def count_by(queryset, field):
+    """
+    Correlated COUNT(*) of queryset rows whose field matches the outer row.
+    One subquery per count keeps the counts independent of each other, where
+    several Count() joins in one query would multiply the rows.
+    """
+    counts = (
+        queryset.filter(**{field: OuterRef("pk")})
+        .order_by()
+        .values(field)
+        .annotate(count=Count("*"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def annotate_company_counts(queryset):
+    """Companies with warehouses_count, products_count, stock_lines and open_alerts"""
+    return queryset.annotate(
+        warehouses_count=count_by(Warehouse.objects.all(), "company"),
+        products_count=count_by(Product.objects.all(), "company"),
+        stock_lines=count_by(Stock.objects.all(), "warehouse__company"),
+        open_alerts=count_by(
+            InventoryAlert.objects.filter(status="OPEN"), "warehouse__company"
+        ),
+    )
+
+
+def annotate_warehouse_counts(queryset):
+    """
+    Warehouses joined to their company, with products_count (products in
+    stock), stock_lines and open_alerts
+    """
+    return queryset.select_related("company").annotate(
+        products_count=count_by(
+            Stock.objects.filter(quantity_on_hand__gt=0), "warehouse"
+        ),
+        stock_lines=count_by(Stock.objects.all(), "warehouse"),
+        open_alerts=count_by(InventoryAlert.objects.filter(status="OPEN"), "warehouse"),
+    )
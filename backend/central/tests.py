@@ -1,3 +1,269 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient
+from apps.inventory.models import Stock, InventoryAlert
+from apps.inventory.tests import count_app_queries
+from .models import Company, Warehouse, Product
 
-# Create your tests here.
+User = get_user_model()
+
+products_url = "/products"
+warehouses_url = "/warehouses"
+companies_url = "/companies"
+categories_url = "/products/by_category"
+
+
+class CatalogConditionalGetTestCase(TestCase):
+    """Test ETag / Last-Modified on the product and warehouse lists"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Test Bakery")
+        self.product = Product.objects.create(
+            name="Bread Flour", company=self.company, category="flour"
+        )
+        Warehouse.objects.create(company=self.company, name="Main Store")
+
+    def test_unchanged_list_returns_304(self):
+        """Test that a poll with the previous ETag gets 304 after one query"""
+        for url in (products_url, warehouses_url):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("Last-Modified", response)
+
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+            self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(response.content, b"")
+            self.assertEqual(count_app_queries(queries.captured_queries), 1)
+
+    def test_update_changes_etag(self):
+        """Test that editing or deleting a product invalidates the ETag"""
+        etag = self.client.get(products_url)["ETag"]
+        self.product.name = "Cake Flour"
+        self.product.save()
+        response = self.client.get(products_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response["ETag"]
+        self.product.delete()
+        response = self.client.get(products_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_company_rename_changes_warehouse_etag(self):
+        """Test that renaming a company invalidates the warehouse list ETag"""
+        etag = self.client.get(warehouses_url)["ETag"]
+        self.company.name = "Renamed Bakery"
+        self.company.save()
+        response = self.client.get(warehouses_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["results"][0]["company_name"], "Renamed Bakery")
+
+    def test_etag_varies_with_query(self):
+        """Test that different filters or pages get different ETags"""
+        first = self.client.get(products_url)["ETag"]
+        second = self.client.get(products_url, {"category": "flour"})["ETag"]
+        self.assertNotEqual(first, second)
+
+
+class CatalogCacheTestCase(TestCase):
+    """Test the read-through cache of the catalog viewsets"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.company = Company.objects.create(name="Test Bakery")
+        self.product = Product.objects.create(
+            name="Bread Flour", company=self.company, category="flour"
+        )
+        self.other = Product.objects.create(
+            name="Caster Sugar", company=self.company, category="sugar"
+        )
+        self.warehouse = Warehouse.objects.create(
+            company=self.company, name="Main Store"
+        )
+
+    def get_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, count_app_queries(queries.captured_queries)
+
+    def test_repeat_reads_skip_database(self):
+        """Test that cached list, detail and action responses run no queries"""
+        for url in (
+            companies_url,
+            f"{companies_url}/{self.company.id}",
+            f"{companies_url}/{self.company.id}/warehouses",
+            f"{products_url}/{self.product.id}",
+            categories_url,
+        ):
+            first, _ = self.get_queries(url)
+            second, queries = self.get_queries(url)
+            self.assertEqual(queries, 0, url)
+            self.assertEqual(first.data, second.data)
+
+    def test_save_invalidates_only_affected_entries(self):
+        """Test that a product save drops the lists and its own detail only"""
+        self.get_queries(categories_url)
+        self.get_queries(f"{products_url}/{self.other.id}")
+
+        self.product.category = "bread"
+        self.product.save()
+
+        response, _ = self.get_queries(categories_url)
+        self.assertIn("bread", response.data["categories"])
+        _, queries = self.get_queries(f"{products_url}/{self.other.id}")
+        self.assertEqual(queries, 0)
+
+    def test_related_change_invalidates(self):
+        """Test that renaming a company refreshes cached warehouse responses"""
+        url = f"{warehouses_url}/{self.warehouse.id}"
+        self.get_queries(url)
+        self.company.name = "Renamed Bakery"
+        self.company.save()
+        response, _ = self.get_queries(url)
+        self.assertEqual(response.data["company_name"], "Renamed Bakery")
+
+    def test_delete_invalidates_detail(self):
+        """Test that a deleted product is no longer served from the cache"""
+        url = f"{products_url}/{self.product.id}"
+        self.get_queries(url)
+        self.product.delete()
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CatalogCountsTestCase(TestCase):
+    """Test the annotated counts on company and warehouse listings"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def create_company(self, index):
+        company = Company.objects.create(name=f"Bakery {index}")
+        product = Product.objects.create(
+            name=f"Flour {index}", company=company, category="flour"
+        )
+        warehouse = Warehouse.objects.create(company=company, name=f"Store {index}")
+        Stock.objects.create(product=product, warehouse=warehouse, quantity_on_hand=5)
+        InventoryAlert.objects.create(
+            product=product,
+            warehouse=warehouse,
+            alert_type="LOW_STOCK",
+            current_quantity=5,
+            triggered_by="STOCK_MOVEMENT",
+        )
+        return company
+
+    def list_queries(self, url):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, count_app_queries(queries.captured_queries)
+
+    def test_company_counts(self):
+        """Test that company rows carry warehouse, product, stock and alert counts"""
+        company = self.create_company(0)
+        Warehouse.objects.create(company=company, name="Empty Store")
+        response, _ = self.list_queries(companies_url)
+        row = next(
+            row for row in response.data["results"] if row["id"] == str(company.id)
+        )
+        self.assertEqual(row["warehouses_count"], 2)
+        self.assertEqual(row["products_count"], 1)
+        self.assertEqual(row["stock_lines"], 1)
+        self.assertEqual(row["open_alerts"], 1)
+
+    def test_fixed_query_count(self):
+        """Test that the company and warehouse lists cost the same at any size"""
+        self.create_company(0)
+        _, companies_few = self.list_queries(companies_url)
+        _, warehouses_few = self.list_queries(warehouses_url)
+        for index in range(1, 6):
+            self.create_company(index)
+        _, companies_many = self.list_queries(companies_url)
+        response, warehouses_many = self.list_queries(warehouses_url)
+
+        self.assertEqual(companies_few, companies_many)
+        self.assertEqual(warehouses_few, warehouses_many)
+        self.assertEqual(len(response.data["results"]), 6)
+        self.assertEqual(response.data["results"][0]["stock_lines"], 1)
+
+    def test_alert_status_changes_refresh_cached_counts(self):
+        """Test that acknowledging or resolving an alert refreshes cached counts"""
+        company = self.create_company(0)
+        alert = InventoryAlert.objects.get()
+        other = InventoryAlert.objects.create(
+            product=alert.product,
+            warehouse=alert.warehouse,
+            alert_type="OUT_OF_STOCK",
+            current_quantity=0,
+            triggered_by="STOCK_MOVEMENT",
+        )
+        staff = APIClient()
+        staff.force_authenticate(
+            User.objects.create_user(
+                username="storeman",
+                email="storeman@example.com",
+                password="SecurePassword123!",
+                role="warehouse_staff",
+            )
+        )
+
+        def open_alerts():
+            counts = []
+            for url, pk in [
+                (companies_url, company.id),
+                (warehouses_url, alert.warehouse_id),
+            ]:
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                row = next(
+                    row for row in response.data["results"] if row["id"] == str(pk)
+                )
+                counts.append(row["open_alerts"])
+            return counts
+
+        self.assertEqual(open_alerts(), [2, 2])
+        for alert_id, action, expected in [
+            (alert.id, "acknowledge", 1),
+            (other.id, "resolve", 0),
+        ]:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = staff.patch(f"/inventory/alerts/{alert_id}/{action}")
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(open_alerts(), [expected, expected])
+
+
+class CatalogFieldsetTestCase(TestCase):
+    """Test ?fields= on the catalog endpoints"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        company = Company.objects.create(name="Test Bakery")
+        self.product = Product.objects.create(
+            name="Bread Flour", company=company, category="flour", unit_of_measure="kg"
+        )
+
+    def test_fields_with_derived_field(self):
+        """Test that a display field can be selected and reads its source column"""
+        response = self.client.get(
+            f"{products_url}/{self.product.id}",
+            {"fields": "id,unit_of_measure_display"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {"id", "unit_of_measure_display"})
+        self.assertEqual(response.data["unit_of_measure_display"], "Kilogram")
+
+    def test_unknown_field_rejected(self):
+        """Test that unknown field names are rejected"""
+        response = self.client.get(companies_url, {"fields": "id,revenue"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -4,6 +4,11 @@ from rest_framework.response import Response
 from .models import Company, Warehouse, Product
 from .serializers import CompanySerializer, WarehouseSerializer, ProductSerializer
 from .filters import WarehouseFilter, ProductFilter
+from core.conditional import ConditionalListMixin
+from core.fieldsets import SparseFieldsetMixin
+from .cache import CachedResponseMixin, model_generation
+from .services.counts import annotate_company_counts, annotate_warehouse_counts
+from apps.inventory.cache import STOCK_GENERATION
 from rest_framework import filters
 from django_filters.rest_framework import DjangoFilterBackend
 
@@ -13,12 +18,18 @@ filter_backends = [
         filters.SearchFilter,
     ]
 
-class CompanyViewSet(viewsets.ModelViewSet):
+class CompanyViewSet(
+    CachedResponseMixin, SparseFieldsetMixin, viewsets.ModelViewSet
+):
     """
     ViewSet for managing companies in the ERP system.
 
-    Supports full CRUD operations for company entities.
+    Supports full CRUD operations for company entities. Lists carry
+    warehouse, product, stock line and open alert counts. Reads are cached
+    until a company, warehouse, product or stock level changes.
 
+    Query parameters:\n
+        - fields / omit: Comma separated fields to return / to leave out\n
     Custom actions:\n
         - warehouses: Get all warehouses for a specific company\n
         - active: Get all active companies (status=True)
@@ -29,31 +40,54 @@ class CompanyViewSet(viewsets.ModelViewSet):
     filter_backends = filter_backends
     ordering_fields = ["name", "created_at"]
     search_fields = ["name", "address", "email"]
+    cache_models = [Company, Warehouse, Product]
+    cache_generations = [STOCK_GENERATION]
+
+    def get_queryset(self):
+        """Companies with their counts annotated in the same query"""
+        return annotate_company_counts(Company.objects.all())
 
     @action(detail=True, methods=["get"])
     def warehouses(self, request, pk=None):
         """Get all warehouses for a company"""
-        company = self.get_object()
-        warehouses = company.warehouses.all()
-        serializer = WarehouseSerializer(warehouses, many=True)
-        return Response(serializer.data)
+
+        def build_response():
+            company = self.get_object()
+            warehouses = annotate_warehouse_counts(company.warehouses.all())
+            serializer = WarehouseSerializer(warehouses, many=True)
+            return Response(serializer.data)
+
+        return self.cached_response(request, build_response, pk=pk)
 
     @action(detail=False, methods=["get"])
     def active(self, request):
         """Get all active companies"""
-        companies = Company.objects.filter(status=True)
-        serializer = self.get_serializer(companies, many=True)
-        return Response(serializer.data)
+
+        def build_response():
+            companies = self.get_queryset().filter(status=True)
+            serializer = self.get_serializer(companies, many=True)
+            return Response(serializer.data)
+
+        return self.cached_response(request, build_response)
 
 
-class WarehouseViewSet(viewsets.ModelViewSet):
+class WarehouseViewSet(
+    ConditionalListMixin,
+    CachedResponseMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for managing warehouses within companies.
 
-    Supports full CRUD operations for warehouse entities.
+    Supports full CRUD operations for warehouse entities. The list carries
+    ETag and Last-Modified, and unchanged polls get 304 Not Modified. Rows
+    carry product, stock line and open alert counts. Reads are cached until
+    a warehouse, company or stock level changes.
 
     Query parameters:\n
         - company_id: Filter warehouses by company ID\n
+        - fields / omit: Comma separated fields to return / to leave out\n
     Custom actions:\n
         - active: Get all active warehouses (status=True)
     """
@@ -64,10 +98,15 @@ class WarehouseViewSet(viewsets.ModelViewSet):
     filter_backends = filter_backends
     ordering_fields = ["name", "location"]
     search_fields = ["name", "location", "wh_type"]
+    conditional_fields = ["updated_at"]
+    # Rows show their company's name
+    conditional_generations = [model_generation(Company), STOCK_GENERATION]
+    cache_models = [Warehouse, Company]
+    cache_generations = [STOCK_GENERATION]
 
     def get_queryset(self):
-        """Filter warehouses by company if provided"""
-        queryset = Warehouse.objects.all()
+        """Filter warehouses by company if provided, with counts annotated"""
+        queryset = annotate_warehouse_counts(Warehouse.objects.all())
         company_id = self.request.query_params.get("company_id", None)
         if company_id is not None:
             queryset = queryset.filter(company_id=company_id)
@@ -76,20 +115,34 @@ class WarehouseViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def active(self, request):
         """Get all active warehouses"""
-        warehouses = Warehouse.objects.filter(status=True)
-        serializer = self.get_serializer(warehouses, many=True)
-        return Response(serializer.data)
 
+        def build_response():
+            warehouses = annotate_warehouse_counts(
+                Warehouse.objects.filter(status=True)
+            )
+            serializer = self.get_serializer(warehouses, many=True)
+            return Response(serializer.data)
+
+        return self.cached_response(request, build_response)
 
-class ProductViewSet(viewsets.ModelViewSet):
+
+class ProductViewSet(
+    ConditionalListMixin,
+    CachedResponseMixin,
+    SparseFieldsetMixin,
+    viewsets.ModelViewSet,
+):
     """
     ViewSet for managing products in the inventory system.
 
-    Supports full CRUD operations for product entities.
+    Supports full CRUD operations for product entities. The list carries
+    ETag and Last-Modified, and unchanged polls get 304 Not Modified. Reads
+    are cached until a product changes.
 
     Query parameters:\n
         - category: Filter products by category\n
         - company_id: Associate product with company (used in create)\n
+        - fields / omit: Comma separated fields to return / to leave out\n
     Custom actions:\n
         - by_category: Get all unique product categories\n
         - by_sku: Get product by SKU (use SKU as pk parameter)
@@ -101,6 +154,8 @@ class ProductViewSet(viewsets.ModelViewSet):
     filter_backends = filter_backends
     ordering_fields = ["name", "sku", "created_at"]
     search_fields = ["name", "sku", "category"]
+    conditional_fields = ["updated_at"]
+    cache_models = [Product]
 
     def get_queryset(self):
         """Filter products by category if provided"""
@@ -126,18 +181,27 @@ class ProductViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def by_category(self, request):
         """Get all unique product categories"""
-        categories = Product.objects.values_list("category", flat=True).distinct()
-        return Response({"categories": list(categories)})
+
+        def build_response():
+            categories = Product.objects.values_list("category", flat=True).distinct()
+            return Response({"categories": list(categories)})
+
+        return self.cached_response(request, build_response)
 
     @action(detail=True, methods=["get"])
     def by_sku(self, request, pk=None):
         """Get product by SKU"""
-        try:
-            product = Product.objects.get(sku=pk)
-            serializer = self.get_serializer(product)
-            return Response(serializer.data)
-        except Product.DoesNotExist:
-            return Response(
-                {"error": "Product with this SKU not found"},
-                status=status.HTTP_404_NOT_FOUND,
-            )
+
+        def build_response():
+            try:
+                product = Product.objects.get(sku=pk)
+                serializer = self.get_serializer(product)
+                return Response(serializer.data)
+            except Product.DoesNotExist:
+                return Response(
+                    {"error": "Product with this SKU not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+        # Keyed on the whole product table: the SKU is not the primary key
+        return self.cached_response(request, build_response)
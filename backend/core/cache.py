@@ -0,0 +1,26 @@
+"""
+Generation counters for cached data sets.
+
+Cache keys embed the current generation of the data they were built from;
+bumping the generation orphans all of them at once (they expire on their own
+TTL), which works the same on locmem and Redis without key scans.
+"""
+
+from django.core.cache import cache
+
+
+def generation_key(name):
+    return f"generation:{name}"
+
+
+def get_generation(name):
+    """Current generation of a data set, starting at 1"""
+    return cache.get_or_set(generation_key(name), 1, timeout=None)
+
+
+def bump_generation(name):
+    """Invalidate every cache entry built from the data set"""
+    try:
+        cache.incr(generation_key(name))
+    except ValueError:
+        cache.set(generation_key(name), 2, timeout=None)
@@ -0,0 +1,94 @@
+"""
+Conditional GET for list endpoints.
+
+The validators come from one aggregate query over the filtered queryset: the
+row count plus the latest value of each timestamp field that moves when a row
+changes. Count catches deletes, the timestamps catch inserts and updates. A
+matching If-None-Match gets a 304 before anything is paginated or serialized.
+
+Last-Modified is sent for information only. The latest timestamp does not move
+when a row is deleted, so If-Modified-Since on its own never produces a 304.
+"""
+
+import hashlib
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from .cache import get_generation
+
+
+class ConditionalListMixin:
+    """
+    ETag / Last-Modified on list responses. conditional_fields names the
+    timestamp fields whose maximum marks the last change of the queryset;
+    conditional_generations names core.cache generations of related data the
+    responses include (their changes alter the ETag only). Viewsets that nest
+    related rows on request add the generations of those rows through
+    get_expand_generations().
+    """
+
+    conditional_fields = ["created_at"]
+    conditional_generations = []
+
+    def get_list_validators(self, queryset):
+        """(etag, last_modified timestamp or None) for a filtered queryset"""
+        state = queryset.order_by().aggregate(
+            row_count=Count("*"),
+            **{f"max_{field}": Max(field) for field in self.conditional_fields},
+        )
+        changed = [
+            state[f"max_{field}"]
+            for field in self.conditional_fields
+            if state[f"max_{field}"] is not None
+        ]
+        last_modified = max(changed) if changed else None
+        generations = [
+            get_generation(name) for name in self.get_conditional_generations()
+        ]
+
+        # The same rows render differently per page, filter and media type
+        request = self.request
+        params = sorted(request.query_params.lists())
+        fingerprint = "|".join(
+            [
+                request.path,
+                repr(params),
+                getattr(request, "accepted_media_type", "") or "",
+                str(state["row_count"]),
+                *(value.isoformat() for value in changed),
+                *(str(generation) for generation in generations),
+            ]
+        )
+        etag = f'"{hashlib.md5(fingerprint.encode()).hexdigest()}"'
+        # HTTP dates have whole seconds
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def get_conditional_generations(self):
+        names = list(self.conditional_generations)
+        get_expand_generations = getattr(self, "get_expand_generations", None)
+        if get_expand_generations is not None:
+            names += get_expand_generations()
+        return list(dict.fromkeys(names))
+
+    def conditional_response(self, queryset, build_response):
+        """
+        304 when the client's ETag matches the queryset, otherwise the
+        response of build_response() with ETag and Last-Modified set
+        """
+        etag, last_modified = self.get_list_validators(queryset)
+        # Only the ETag is validated (see the module docstring)
+        response = get_conditional_response(self.request._request, etag=etag)
+        if response is None:
+            response = build_response()
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        build_list = super().list
+        return self.conditional_response(
+            queryset, lambda: build_list(request, *args, **kwargs)
+        )
@@ -0,0 +1,168 @@
+"""
+Sparse fieldsets: ?fields=id,status keeps only the named serializer fields and
+?omit=created_at drops fields, on read requests. The kept fields are mapped back
+to model columns and pushed into the queryset with .only(), so the SELECT list
+shrinks with the payload.
+"""
+
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def split_names(value):
+    return list(
+        dict.fromkeys(name.strip() for name in value.split(",") if name.strip())
+    )
+
+
+class SparseFieldsetSerializerMixin:
+    """
+    Filters the top-level serializer's fields by the "fields" / "omit" serializer
+    context (set by SparseFieldsetMixin). Nested summaries are left whole.
+
+    column_sources maps fields whose columns cannot be read from their source
+    (method fields, annotations) to the model field paths they need; an empty
+    list means none.
+    """
+
+    column_sources = {}
+
+    def is_top_level(self):
+        parent = self.parent
+        return parent is None or (
+            isinstance(parent, serializers.ListSerializer) and parent.parent is None
+        )
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if not self.is_top_level():
+            return fields
+        selected = self.context.get("fields")
+        omitted = self.context.get("omit") or ()
+        return {
+            name: field
+            for name, field in fields.items()
+            if (selected is None or name in selected) and name not in omitted
+        }
+
+    def get_query_columns(self):
+        """
+        (field paths for .only(), relation paths for select_related) covering
+        the current fields, or None when some field's columns are unknown
+        """
+        columns = []
+        relations = []
+        for name, field in self.fields.items():
+            if name in self.column_sources:
+                columns.extend(self.column_sources[name])
+                continue
+            paths = field_columns(self.Meta.model, field)
+            if paths is None:
+                return None
+            columns.extend(paths)
+            relations.extend(path.rsplit("__", 1)[0] for path in paths if "__" in path)
+        return columns, list(dict.fromkeys(relations))
+
+
+def field_columns(model, field, prefix=""):
+    """Model field paths a serializer field reads, or None when unknown"""
+    if field.source == "*":
+        return None
+    parts = field.source.split(".")
+    current = model
+    for part in parts[:-1]:
+        try:
+            relation = current._meta.get_field(part)
+        except FieldDoesNotExist:
+            return None
+        if not (relation.many_to_one or relation.one_to_one) or not relation.concrete:
+            return None
+        current = relation.related_model
+    try:
+        leaf = current._meta.get_field(parts[-1])
+    except FieldDoesNotExist:
+        return None
+    path = prefix + "__".join(parts)
+
+    if isinstance(field, serializers.BaseSerializer):
+        # A nested summary reads its own fields through the relation
+        if not leaf.is_relation or not leaf.concrete or leaf.many_to_many:
+            return None
+        nested = []
+        for child in field.fields.values():
+            child_paths = field_columns(leaf.related_model, child, f"{path}__")
+            if child_paths is None:
+                return None
+            nested.extend(child_paths)
+        return nested
+    if not leaf.concrete:
+        return None
+    return [path]
+
+
+def joined_paths(select_related, prefix=""):
+    """Every relation path in a query's select_related tree"""
+    paths = []
+    for name, nested in select_related.items():
+        path = f"{prefix}{name}"
+        paths.append(path)
+        paths.extend(joined_paths(nested, f"{path}__"))
+    return paths
+
+
+class SparseFieldsetMixin:
+    """
+    ?fields= / ?omit= on read requests for viewsets whose serializer uses
+    SparseFieldsetSerializerMixin. Unknown names are rejected with a 400.
+    """
+
+    def get_fieldset(self, context):
+        """Validated (fields or None, omit) for this request"""
+        if hasattr(self, "_fieldset"):
+            return self._fieldset
+        request = getattr(self, "request", None)
+        fieldset = (None, [])
+        if request is not None and request.method in SAFE_METHODS:
+            selected = request.query_params.get("fields")
+            omitted = request.query_params.get("omit")
+            if selected is not None or omitted is not None:
+                available = list(self.get_serializer_class()(context=context).fields)
+                selected = split_names(selected) if selected is not None else None
+                omitted = split_names(omitted or "")
+                for param, names in (("fields", selected or []), ("omit", omitted)):
+                    unknown = [name for name in names if name not in available]
+                    if unknown:
+                        raise ValidationError(
+                            {
+                                param: f"Unknown field(s): {', '.join(unknown)}. "
+                                f"Choose from: {', '.join(available)}."
+                            }
+                        )
+                fieldset = (selected, omitted)
+        self._fieldset = fieldset
+        return fieldset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fields"], context["omit"] = self.get_fieldset(dict(context))
+        return context
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        selected, omitted = self.get_fieldset(super().get_serializer_context())
+        if selected is None and not omitted:
+            return queryset
+        serializer = self.get_serializer_class()(context=self.get_serializer_context())
+        query_columns = serializer.get_query_columns()
+        if query_columns is None:
+            return queryset
+        columns, relations = query_columns
+        if relations:
+            queryset = queryset.select_related(*relations)
+        joined = queryset.query.select_related
+        if joined is True:
+            return queryset
+        # Relations joined elsewhere (?expand=, get_queryset) need their FK loaded
+        return queryset.only(*columns, *joined_paths(joined or {}))
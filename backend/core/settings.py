@@ -193,11 +193,49 @@ STATIC_ROOT = BASE_DIR / "staticfiles"
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "accounts.User"
 
+# emp_code + password logins (LoginView) first, username logins (admin, /api/token/)
+AUTHENTICATION_BACKENDS = [
+    "apps.accounts.backends.EmpCodeBackend",
+    "django.contrib.auth.backends.ModelBackend",
+]
+
+# "default" hashes passwords with Django's PBKDF2 settings. "shop_floor" hashes
+# with SHOP_FLOOR_HASHER_ITERATIONS instead, for PIN-style passwords typed on
+# shared terminals where a whole shift logs in at once; existing hashes are
+# re-hashed with the preferred hasher at their next login either way
+PASSWORD_HASHER_PROFILE = os.environ.get("PASSWORD_HASHER_PROFILE", "default")
+SHOP_FLOOR_HASHER_ITERATIONS = int(
+    os.environ.get("SHOP_FLOOR_HASHER_ITERATIONS", 100_000)
+)
+DJANGO_PASSWORD_HASHERS = [
+    "django.contrib.auth.hashers.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+SHOP_FLOOR_PASSWORD_HASHER = "apps.accounts.hashers.ShopFloorPBKDF2PasswordHasher"
+PASSWORD_HASHER_PROFILES = {
+    "default": [*DJANGO_PASSWORD_HASHERS, SHOP_FLOOR_PASSWORD_HASHER],
+    "shop_floor": [SHOP_FLOOR_PASSWORD_HASHER, *DJANGO_PASSWORD_HASHERS],
+}
+PASSWORD_HASHERS = PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.ClaimsJWTAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
+    "DEFAULT_RENDERER_CLASSES": [
+        "core.renderers.ORJSONRenderer",
+        "core.renderers.MessagePackRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    "DEFAULT_PARSER_CLASSES": [
+        "core.renderers.ORJSONParser",
+        "rest_framework.parsers.FormParser",
+        "rest_framework.parsers.MultiPartParser",
+    ],
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
@@ -221,8 +259,18 @@ SIMPLE_JWT = {
     "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
     "JTI_CLAIM": "jti",
+    "TOKEN_OBTAIN_SERIALIZER": "apps.accounts.serializers.UserTokenObtainPairSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.serializers.UserTokenRefreshSerializer",
 }
 
+# Seconds each process trusts a user's cached role / emp_code / is_active before
+# re-reading them to check access token claims (apps.accounts.authentication)
+AUTH_STATE_TTL = 30
+
+# Blacklisted refresh token JTIs each process remembers, to turn away reused
+# tokens without a query; run prune_tokens to delete expired token rows
+BLACKLIST_CACHE_SIZE = 50000
+
 SPECTACULAR_SETTINGS = {
     "TITLE": "BakeryERP API",
     "DESCRIPTION": "API for BakeryERP Application",
@@ -230,15 +278,52 @@ SPECTACULAR_SETTINGS = {
     "SERVE_INCLUDE_SCHEMA": False,
 }
 
-# CACHES = {
-#     "default": {
-#         "BACKEND": "django_redis.cache.RedisCache",
-#         "LOCATION": "redis://127.0.0.1:6379/1",
-#         "OPTIONS": {
-#             "CLIENT_CLASS": "django_redis.client.DefaultClient",
-#         },
-#     }
-# }
+# Inventory
+# "delta" applies every movement to the Stock row in place, "aggregate" re-sums
+# all batches of the product/warehouse on every write (legacy behaviour)
+STOCK_LEDGER_MODE = os.environ.get("STOCK_LEDGER_MODE", "delta")
+
+# Days before expiry that a batch raises an EXPIRY alert, per product category
+# (matched case-insensitively), e.g. {"default": 7, "pastries": 1, "flour": 60}
+INVENTORY_EXPIRY_HORIZON_DAYS = {"default": 7}
+
+# Seconds the inventory dashboard summary is cached; stock and alert writes
+# invalidate it sooner
+INVENTORY_SUMMARY_CACHE_TTL = 30
+
+# Upper bound in seconds on caching the stock matrix; any stock write
+# invalidates it sooner
+INVENTORY_MATRIX_CACHE_TTL = 300
+
+# Monthly StockMovement partitions (PostgreSQL only, enabled by running the
+# partition_stock_movements command): months created ahead of time, and months
+# kept attached before archive_stock_movements exports and detaches them
+STOCK_MOVEMENT_PARTITIONS_AHEAD = int(
+    os.environ.get("STOCK_MOVEMENT_PARTITIONS_AHEAD", 3)
+)
+STOCK_MOVEMENT_RETENTION_MONTHS = int(
+    os.environ.get("STOCK_MOVEMENT_RETENTION_MONTHS", 24)
+)
+
+# Process-local cache by default; set REDIS_URL to share it between workers
+REDIS_URL = os.environ.get("REDIS_URL")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Upper bound in seconds on caching catalog (company, warehouse, product)
+# responses; saves and deletes invalidate them sooner
+CATALOG_CACHE_TTL = 600
 
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:3000",  # React